@@ -0,0 +1,93 @@
+"""
+Benchmarks of the different ways of running programs.
+
+Compares programs interpreted by `Program.run` against compiled programs, and running the
+programs of many units one at a time against running them as a batch.
+
+Run from the root of the repository with `python -m benchmarks.programmable`.
+"""
+
+import timeit
+from typing import List
+
+from shimmer.programmable.logic.batch import BatchRunner
+from shimmer.programmable.logic.compiler import compile_program
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    Elif,
+    Else,
+    IfElifElse,
+    Program,
+)
+
+
+def make_program(size: int) -> Program:
+    """Create a program with a mix of instructions and nested conditions."""
+    instructions: List[Instruction] = []
+    for index in range(size):
+        body = CodeBlock(
+            instructions=[Instruction(method=max, args=(index, 5)) for _ in range(3)]
+        )
+        instructions.append(Instruction(method=abs, args=(-index,)))
+        instructions.append(If(method=bool, args=(index % 2,), code_block=body))
+        instructions.append(
+            IfElifElse(
+                method=bool,
+                args=(index % 3 == 0,),
+                code_block=body,
+                elifs=[Elif(method=bool, args=(index % 3 == 1,), code_block=body)],
+                else_=Else(code_block=body),
+            )
+        )
+    return Program("benchmark", CodeBlock(instructions=instructions))
+
+
+def benchmark_compiled() -> None:
+    """Print the time taken to run programs of increasing size."""
+    print(f"{'size':>6} {'interpreted':>12} {'compiled':>12} {'speedup':>8}")
+    for size in (1, 10, 100):
+        program = make_program(size)
+        compiled = compile_program(program)
+        number = 10000 // size
+        interpreted_time = min(timeit.repeat(program.run, number=number, repeat=5))
+        compiled_time = min(timeit.repeat(compiled.run, number=number, repeat=5))
+        print(
+            f"{size:>6} {interpreted_time / number * 1e6:>10.1f}us "
+            f"{compiled_time / number * 1e6:>10.1f}us "
+            f"{interpreted_time / compiled_time:>7.1f}x"
+        )
+
+
+def benchmark_batch() -> None:
+    """Print the throughput of running the programs of increasing numbers of units."""
+    print(f"{'units':>6} {'individual':>12} {'batched':>12} {'speedup':>8}")
+    for units in (10, 100, 1000):
+        programs = [make_program(5) for _ in range(units)]
+        runner = BatchRunner()
+        for program in programs:
+            runner.add(program)
+
+        def run_individually() -> None:
+            for program in programs:
+                program.run()
+
+        individual_time = min(timeit.repeat(run_individually, number=10, repeat=5))
+        batched_time = min(timeit.repeat(runner.run, number=10, repeat=5))
+        print(
+            f"{units:>6} {units * 10 / individual_time:>8.0f}/s "
+            f"{units * 10 / batched_time:>10.0f}/s "
+            f"{individual_time / batched_time:>7.1f}x"
+        )
+
+
+def main() -> None:
+    """Run all the benchmarks."""
+    benchmark_compiled()
+    print()
+    benchmark_batch()
+
+
+if __name__ == "__main__":
+    main()
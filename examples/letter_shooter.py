@@ -6,16 +6,18 @@ This shows how to make use of focus-on-hover behaviour and keyboard handling.
 from dataclasses import dataclass, field
 from random import randint, choice
 from string import ascii_lowercase
+from typing import Optional
 
 import cocos
 from shimmer.components.box import Box, BoxDefinition
+from shimmer.components.box_pool import BoxPool
 from shimmer.components.focus import (
     FocusBoxDefinition,
     make_focusable,
     EVENT_HANDLED,
 )
 from shimmer.data_structures import Color
-from shimmer.keyboard import add_simple_keyboard_handler
+from shimmer.keyboard import add_simple_keyboard_handler, KeyboardHandlerDefinition
 from shimmer.widgets.text_box import TextBoxDefinition, TextBox
 
 
@@ -53,13 +55,33 @@ class Target(Box):
         # the box.
         self.focus_box = make_focusable(self, FocusBoxDefinition(focus_on_hover=True))
 
+    def reset(self, definition: Optional[BoxDefinition] = None) -> None:
+        """Update the letter of this Target when it is re-used with a new definition."""
+        super(Target, self).reset(definition)
+        if isinstance(definition, TargetDefinition):
+            self.text_box.set_text(definition.key.upper())
+            self.text_box.align_anchor_with_other_anchor(self)
+            # Match the area that can be focused to the new size of this target.
+            self.focus_box.set_size(self.rect.width, self.rect.height)
+
+            keyboard_handler_definition = KeyboardHandlerDefinition(focus_required=True)
+            keyboard_handler_definition.add_keyboard_action_simple(
+                definition.key, self._on_correct_keypress
+            )
+            self.keyboard_handler.definition = keyboard_handler_definition
+
     def _on_correct_keypress(self) -> bool:
-        """On correct keypress, kill this target and create a new one."""
-        self.kill()
-        self.parent.add(create_random_target())
+        """On correct keypress, return this target to the pool and create a new one."""
+        parent = self.parent
+        target_pool.release(self)
+        parent.add(create_random_target())
         return EVENT_HANDLED
 
 
+# Pool of targets that have been destroyed, which are re-used when creating new targets.
+target_pool: BoxPool[Target, TargetDefinition] = BoxPool(Target, max_idle=5)
+
+
 def create_random_target() -> Target:
     """Create a Target with random size, position, color and letter."""
     window_width, window_height = cocos.director.director.get_window_size()
@@ -75,7 +97,7 @@ def create_random_target() -> Target:
         randint(0, window_height - max_target_height),
     )
 
-    target = Target(target_definition)
+    target = target_pool.acquire(target_definition)
     target.position = x, y
     return target
 
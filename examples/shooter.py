@@ -12,6 +12,7 @@ from cocos.actions.interval_actions import MoveTo
 from cocos.euclid import Vector2
 from shimmer.alignment import LeftTop
 from shimmer.components.box import Box, BoxDefinition, DynamicSizeBehaviourEnum
+from shimmer.components.box_pool import BoxPool
 from shimmer.components.mouse_box import MouseBox, MouseBoxDefinition
 from shimmer.components.sprite_box import SpriteBoxDefinition, SpriteBox
 from shimmer.primitives import Point2d, Color
@@ -40,12 +41,11 @@ class Target(MouseBox):
     a mouse event happens within its boundaries.
     """
 
-    def __init__(self, on_shot: Callable):
+    def __init__(self, on_shot: Callable[["Target"], None]):
         """
         Constructor for Target.
 
-        :param on_shot: Function taking no arguments that is called when this target is
-            clicked on.
+        :param on_shot: Function that is called with this target when it is clicked on.
         """
         definition = MouseBoxDefinition(width=30, height=30, on_press=self.when_shot,)
         super(Target, self).__init__(definition)
@@ -59,8 +59,7 @@ class Target(MouseBox):
 
     def when_shot(self, *_, **__):
         """Callback when the target is shot."""
-        self.on_shot()
-        self.kill()
+        self.on_shot(self)
 
 
 class RandomMotionAction(Action):
@@ -296,13 +295,19 @@ class Manager(Box):
         self.add(self.scoreboard)
         self.scoreboard.align_anchor_with_other_anchor(self, LeftTop)
 
+        # Targets that have been shot are returned to this pool and re-used when creating new
+        # targets, rather than building a new target each time.
+        self.target_pool: BoxPool[Target, None] = BoxPool(
+            lambda _: Target(self.target_shot), max_idle=num_targets
+        )
+
         # Create the initial number of targets.
         for num in range(num_targets):
             self.create_target()
 
     def create_target(self):
         """Create a new target and choose a random movement type for it."""
-        target = Target(self.target_shot)
+        target = self.target_pool.acquire(None)
         self.add(target)
 
         # Randomise starting position of the target.
@@ -313,8 +318,9 @@ class Manager(Box):
         action = random.choice((RandomJumpingAction(1.5), RandomMotionAction(150)))
         target.do(action)
 
-    def target_shot(self):
-        """Callback when a target is shot."""
+    def target_shot(self, target: Target) -> None:
+        """Callback when a target is shot. Replaces the target with a new one."""
+        self.target_pool.release(target)
         self.scoreboard.increment()
         self.create_target()
 
@@ -0,0 +1,216 @@
+"""
+Definition of a Box that draws the graphics of its descendants in a single pyglet Batch.
+
+Normally every graphical element in a cocos scene draws itself individually as the scene is
+visited, which results in a large number of OpenGL calls and state changes when there are many
+elements. Descendants of a BatchBox can instead put their pyglet graphics into the shared Batch
+of the BatchBox, which is drawn in as few calls as possible once all the children of the
+BatchBox have been drawn.
+
+Members are only repositioned after they, or one of their ancestors up to the BatchBox, move or
+change visibility. Boxes report these changes themselves; other nodes must be reported with
+`BatchBox.mark_moved`.
+
+Because the Batch is drawn after the children, batched graphics are always drawn on top of
+non-batched descendants of the BatchBox. Use a separate BatchBox for each group of overlapping
+content (e.g. one per Window) to keep the drawing order correct.
+"""
+
+from typing import Optional, Dict, Protocol, Tuple, List
+
+import pyglet
+from pyglet import gl
+
+import cocos
+from cocos.euclid import Matrix3
+from .box import Box, BoxDefinition
+from ..primitives import UpdatingNode
+
+
+class BatchMember(Protocol):
+    """Protocol defining a node whose graphics are drawn by a BatchBox."""
+
+    parent: Optional[cocos.cocosnode.CocosNode]
+    visible: bool
+
+    def get_local_transform(self) -> Matrix3:
+        """Transform of the node relative to its parent. Provided by CocosNode."""
+        pass  # pragma: no cover
+
+    def on_batch_transform_change(self, transform: Matrix3, visible: bool) -> None:
+        """
+        Called when the position of the node relative to the BatchBox changes.
+
+        The member should update the position of its batched graphics to match.
+
+        :param transform: Transform from the local space of the member to the local space of
+            the BatchBox.
+        :param visible: True if the member and all its ancestors up to the BatchBox are visible.
+        """
+        pass  # pragma: no cover
+
+
+class BatchBox(Box, UpdatingNode):
+    """
+    A Box that draws the pyglet graphics of its descendants in a single Batch.
+
+    Descendants register with their nearest BatchBox using `find_batch_box` when they enter the
+    scene, and add their graphics to `batch` using the group from `group_for`.
+
+    When a descendant moves or changes visibility the BatchBox is marked dirty, and on the next
+    update by the `UpdateScheduler` (or before drawing, whichever is first) the members in the
+    subtree of that descendant are told if their position relative to the BatchBox has changed.
+    Members that haven't moved are not visited.
+    """
+
+    tracks_descendant_moves = True
+    # Descendants mark this node dirty when they move, so there's no need to poll.
+    poll_indicator = False
+
+    def __init__(self, definition: Optional[BoxDefinition] = None):
+        """Create a new BatchBox."""
+        super(BatchBox, self).__init__(definition)
+        self.batch = pyglet.graphics.Batch()
+        self._groups: Dict[int, pyglet.graphics.OrderedGroup] = {}
+
+        # Mapping of member to the last transform and visibility it was told about.
+        self._members: Dict[BatchMember, Optional[Tuple]] = {}
+
+        # Descendants that have moved since the members were last updated, in insertion order.
+        self._moved: Dict[cocos.cocosnode.CocosNode, None] = {}
+
+    def group_for(self, z: Optional[int]) -> pyglet.graphics.OrderedGroup:
+        """
+        Get the Group that graphics at the given z-order should be added to.
+
+        Groups are shared between all members at the same z-order, so pyglet can draw all
+        graphics of the same z-order and texture in a single call.
+
+        :param z: The z-order of the graphics. None is treated as 0.
+        """
+        z = z or 0
+        try:
+            return self._groups[z]
+        except KeyError:
+            group = self._groups[z] = pyglet.graphics.OrderedGroup(z)
+            return group
+
+    def register(self, member: BatchMember) -> None:
+        """
+        Start telling the given member about changes to its position relative to this Box.
+
+        The member will be informed of its position before this Box is next drawn.
+        """
+        self._members[member] = None
+        self.mark_moved(member)
+
+    def unregister(self, member: BatchMember) -> None:
+        """Stop telling the given member about changes to its position relative to this Box."""
+        self._members.pop(member, None)
+        self._moved.pop(member, None)
+
+    def mark_moved(self, node: cocos.cocosnode.CocosNode) -> None:
+        """
+        Recalculate the position of the members in the subtree of the given node on the next update.
+
+        Boxes call this automatically when they move or change visibility. It only needs to be
+        called directly when a descendant that isn't a Box changes.
+
+        :param node: The descendant that has changed.
+        """
+        self._moved[node] = None
+        self.dirty = True
+
+    def on_descendant_moved(self, node: cocos.cocosnode.CocosNode) -> None:
+        """Recalculate the position of the members in the subtree of the descendant that moved."""
+        self.mark_moved(node)
+
+    def __contains__(self, member: BatchMember) -> bool:
+        """True if the given member is registered with this BatchBox."""
+        return member in self._members
+
+    def transform_of(self, member: BatchMember) -> Tuple[Matrix3, bool]:
+        """
+        Calculate the transform of a member relative to this BatchBox.
+
+        :param member: A descendant of this BatchBox.
+        :return: Tuple of (transform, visible), where visible is False if the member or any of
+            its ancestors up to this BatchBox is invisible.
+        """
+        transform = member.get_local_transform()
+        visible = member.visible
+        node = member.parent
+        while node is not self:
+            if node is None:
+                raise ValueError(f"{member} is not a descendant of {self}.")
+            transform = node.get_local_transform() * transform
+            visible = visible and node.visible
+            node = node.parent
+        return transform, visible
+
+    def _moved_members(self) -> List[BatchMember]:
+        """Take the members in the subtrees of the descendants that have moved since last time."""
+        moved, self._moved = self._moved, {}
+        members: Dict[BatchMember, None] = {}
+        stack = list(moved)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, BatchBox) and node is not self:
+                # Nested BatchBoxes keep track of their own members.
+                continue
+            if node in self._members:
+                members[node] = None
+            stack.extend(child for _, child in node.children)
+        return list(members)
+
+    def update_members(self) -> None:
+        """Inform each member whose position relative to this Box has changed."""
+        self._dirty = False
+        for member in self._moved_members():
+            last_state = self._members[member]
+            transform, visible = self.transform_of(member)
+            state = (
+                transform.a,
+                transform.b,
+                transform.c,
+                transform.e,
+                transform.f,
+                transform.g,
+                visible,
+            )
+            if state != last_state:
+                self._members[member] = state
+                member.on_batch_transform_change(transform, visible)
+
+    def _update(self, dt: float) -> None:
+        """Reposition the members that have moved."""
+        self.update_members()
+
+    def visit(self):
+        """Draw the children of this Box, and then draw all the batched graphics on top."""
+        super(BatchBox, self).visit()
+        if not self.visible:
+            return
+
+        # Catch any moves made since the last update, such as by other nodes' updates.
+        if self._moved:
+            self.update_members()
+        gl.glPushMatrix()
+        self.transform()
+        self.batch.draw()
+        gl.glPopMatrix()
+
+
+def find_batch_box(node: cocos.cocosnode.CocosNode) -> Optional[BatchBox]:
+    """
+    Find the nearest BatchBox ancestor of the given node.
+
+    :param node: The node to search the ancestors of.
+    :return: The nearest BatchBox, or None if the node is not a descendant of a BatchBox.
+    """
+    parent = node.parent
+    while parent is not None:
+        if isinstance(parent, BatchBox):
+            return parent
+        parent = parent.parent
+    return None
@@ -17,7 +17,7 @@ from ..alignment import (
 )
 from ..data_structures import Color
 from ..log_utils import LTRACE
-from ..primitives import create_color_rect
+from ..primitives import create_color_rect, resize_color_rect
 
 
 class DynamicSizeBehaviourEnum(Enum):
@@ -95,6 +95,10 @@ class Box(cocos.cocosnode.CocosNode):
 
     definition_type: Type[BoxDefinition] = BoxDefinition
 
+    # Set by Boxes, such as the BatchBox, that need to know when a descendant Box moves or
+    # changes visibility while in the scene. See `on_descendant_moved`.
+    tracks_descendant_moves: bool = False
+
     def __init__(self, definition: Optional[BoxDefinition] = None):
         """Creates a new Box."""
         super(Box, self).__init__()
@@ -124,6 +128,73 @@ class Box(cocos.cocosnode.CocosNode):
             f"child of <{repr(self.parent)}>"
         )
 
+    @property
+    def visible(self) -> bool:
+        """True if this Box and its children are drawn."""
+        return self._visible
+
+    @visible.setter
+    def visible(self, value: bool) -> None:
+        """Show or hide this Box and its children."""
+        self._visible = value
+        self._on_moved()
+
+    def _set_x(self, x: float) -> None:
+        """Set the x coordinate, as used by the `x` property of CocosNode."""
+        super(Box, self)._set_x(x)
+        self._on_moved()
+
+    def _set_y(self, y: float) -> None:
+        """Set the y coordinate, as used by the `y` property of CocosNode."""
+        super(Box, self)._set_y(y)
+        self._on_moved()
+
+    def _set_position(self, position: Tuple[float, float]) -> None:
+        """Set the position, as used by the `position` property of CocosNode."""
+        super(Box, self)._set_position(position)
+        self._on_moved()
+
+    def _set_scale(self, scale: float) -> None:
+        """Set the scale, as used by the `scale` property of CocosNode."""
+        super(Box, self)._set_scale(scale)
+        self._on_moved()
+
+    def _set_scale_x(self, scale: float) -> None:
+        """Set the x scale, as used by the `scale_x` property of CocosNode."""
+        super(Box, self)._set_scale_x(scale)
+        self._on_moved()
+
+    def _set_scale_y(self, scale: float) -> None:
+        """Set the y scale, as used by the `scale_y` property of CocosNode."""
+        super(Box, self)._set_scale_y(scale)
+        self._on_moved()
+
+    def _set_rotation(self, rotation: float) -> None:
+        """Set the rotation, as used by the `rotation` property of CocosNode."""
+        super(Box, self)._set_rotation(rotation)
+        self._on_moved()
+
+    def _on_moved(self) -> None:
+        """Tell the nearest ancestor that tracks descendant moves, if any, that this Box moved."""
+        # CocosNode.__init__ sets `visible` before `is_running`.
+        if not getattr(self, "is_running", False):
+            return
+
+        node = self.parent
+        while node is not None:
+            if isinstance(node, Box) and node.tracks_descendant_moves:
+                node.on_descendant_moved(self)
+                return
+            node = node.parent
+
+    def on_descendant_moved(self, node: cocos.cocosnode.CocosNode) -> None:
+        """
+        Called when a descendant Box moves or changes visibility, if `tracks_descendant_moves`.
+
+        :param node: The descendant that changed.
+        """
+        pass
+
     def set_log_level(self, level: int) -> None:
         """Set the logging level of this Box."""
         self.logger.setLevel(level)
@@ -242,6 +313,39 @@ class Box(cocos.cocosnode.CocosNode):
             self._rect.set_size((self._width, self._height))
             self.on_size_change()
 
+    def set_size(self, width: Optional[int], height: Optional[int]) -> None:
+        """
+        Change the defined size of this Box.
+
+        :param width: New width of the Box, or None for dynamic width.
+        :param height: New height of the Box, or None for dynamic height.
+        """
+        self.definition = replace(self.definition, width=width, height=height)
+        self.update_rect()
+
+    def reset(self, definition: Optional[BoxDefinition] = None) -> None:
+        """
+        Reinitialise this Box so that it can be re-used rather than creating a new Box.
+
+        Running actions are stopped, and the Box is moved back to the origin and made visible.
+        Subclasses that build children from their definition should extend this to update those
+        children in place. See `BoxPool`.
+
+        :param definition: The new definition of the Box. Defaults to the current definition.
+        """
+        self.stop()
+        self.position = 0, 0
+        self.rotation = 0
+        self.scale = 1
+        self.visible = True
+        if definition is not None and definition is not self.definition:
+            self.definition = definition
+            self.logger = logging.getLogger(
+                definition.log_id or str(self.__class__.__name__)
+            )
+            self.update_rect()
+            self.update_background()
+
     def on_size_change(self):
         """
         Called when the size of the Box changes.
@@ -373,21 +477,26 @@ class Box(cocos.cocosnode.CocosNode):
 
     def update_background(self) -> None:
         """
-        Re-create the background of this Box to take account of changed size or color.
+        Update the background of this Box to take account of changed size or color.
+
+        The existing background is changed in place if there is one.
 
         If the background color is None, then the background is removed.
         """
-        # Remove the old background
-        if self._background is not None:
-            self.remove(self._background, no_resize=True)
-
-        if self.definition.background_color is None:
+        color = self.definition.background_color
+        if color is None or self._width <= 0 or self._height <= 0:
+            # Remove the old background
+            if self._background is not None:
+                self.remove(self._background, no_resize=True)
+                self._background = None
             return
 
-        if self._width > 0 and self._height > 0:
-            self._background = create_color_rect(
-                self._width, self._height, self.definition.background_color
-            )
+        if self._background is not None:
+            resize_color_rect(self._background, self._width, self._height)
+            self._background.color = color.as_tuple()
+            self._background.opacity = color.a
+        else:
+            self._background = create_color_rect(self._width, self._height, color)
             self._background.position = (0, 0)
             self.add(self._background, z=-100, no_resize=True)
 
@@ -2,7 +2,7 @@
 
 from abc import abstractmethod
 from dataclasses import dataclass
-from typing import List, Union, Optional, Type, Iterable, Tuple
+from typing import List, Union, Optional, Type, Iterable, Tuple, Callable, Iterator
 
 import cocos
 from .box import Box, BoxDefinition
@@ -12,6 +12,7 @@ from ..alignment import (
     HorizontalAlignment,
     VerticalAlignment,
 )
+from ..work_queue import WorkQueue, WorkTask
 
 
 @dataclass(frozen=True)
@@ -145,6 +146,65 @@ class BoxLayoutBase(Box):
                 self._boxes.insert(position, child)
             self.update_layout()
 
+    def set_boxes(self, boxes: Iterable[Box]) -> None:
+        """
+        Replace the boxes in this Layout with the given boxes, in the given order.
+
+        Only boxes that are new to this Layout are added, and only those that are no longer
+        included are removed. The layout is updated once, after all boxes have been changed.
+
+        :param boxes: The boxes to be laid out.
+        """
+        boxes = list(boxes)
+        new_ids = {id(box) for box in boxes}
+        old_ids = {id(box) for box in self._boxes}
+
+        for box in self._boxes:
+            if id(box) not in new_ids:
+                super(BoxLayoutBase, self).remove(box, no_resize=True)
+        for box in boxes:
+            if id(box) not in old_ids:
+                super(BoxLayoutBase, self).add(box, no_resize=True)
+
+        self._boxes = boxes
+        if boxes:
+            self.update_layout()
+        elif self.definition.is_dynamic_sized:
+            self.update_rect()
+
+    def set_boxes_in_background(
+        self,
+        boxes: Iterable[Box],
+        priority: int = 0,
+        on_complete: Optional[Callable[[], None]] = None,
+    ) -> WorkTask:
+        """
+        Replace the boxes in this Layout, creating them in the background using the WorkQueue.
+
+        One box is taken from `boxes` on each step, so a generator that creates the boxes spreads
+        the cost of creating them over several frames. The boxes are only put in the Layout
+        once they have all been created, using `set_boxes`.
+
+        :param boxes: The boxes to be laid out. Typically a generator that creates them.
+        :param priority: Priority of the task in the WorkQueue.
+        :param on_complete: Called once the boxes have been put in the Layout.
+        :return: The task, which can be used to cancel it.
+        """
+        created: List[Box] = []
+
+        def create_boxes() -> Iterator[None]:
+            for box in boxes:
+                created.append(box)
+                yield
+            self.set_boxes(created)
+
+        return WorkQueue.add(
+            create_boxes(),
+            priority=priority,
+            on_complete=on_complete,
+            name=f"set_boxes of {self!r}",
+        )
+
     @abstractmethod
     def update_layout(self) -> None:
         """Update the position of all boxes in this Layout."""
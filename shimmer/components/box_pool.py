@@ -0,0 +1,125 @@
+"""
+Module defining a pool of Boxes that can be re-used.
+
+Games often create and destroy lots of short-lived Boxes of the same type, such as targets or
+projectiles. Building a Box creates its children, event handlers and graphics, so it is cheaper
+to detach Boxes that are no longer needed and re-use them later with a new definition.
+"""
+
+import logging
+from typing import Callable, Generic, List, Optional, Set, TypeVar
+
+from .box import Box, BoxDefinition
+
+log = logging.getLogger(__name__)
+
+_Box = TypeVar("_Box", bound=Box)
+_Definition = TypeVar("_Definition", bound=Optional[BoxDefinition])
+
+
+class BoxPool(Generic[_Box, _Definition]):
+    """
+    Pool of idle Boxes of a single type.
+
+    Boxes are taken from the pool with `acquire`, and returned to it with `release` instead of
+    being killed. Released Boxes are detached from their parent and kept until they are next
+    acquired, when they are reinitialised with the new definition using `Box.reset`.
+
+    Both `acquire` and `release` take constant time.
+
+    Example usage:
+
+        pool = BoxPool(Target, max_idle=10)
+        target = pool.acquire(TargetDefinition(key="a"))
+        parent.add(target)
+        ...
+        pool.release(target)  # Instead of `target.kill()`
+    """
+
+    def __init__(
+        self, factory: Callable[[_Definition], _Box], max_idle: Optional[int] = 16,
+    ):
+        """
+        Create a new BoxPool.
+
+        :param factory: Callable that creates a new Box from a definition when there is no idle
+            Box to re-use. Typically this is the class of Box in the pool.
+        :param max_idle: Maximum number of idle Boxes to keep. Boxes released beyond this are
+            discarded. None means there is no limit.
+        """
+        self.factory = factory
+        self.max_idle = max_idle
+
+        self._idle: List[_Box] = []
+        # IDs of the idle Boxes, to detect Boxes being released twice.
+        self._idle_ids: Set[int] = set()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.discards: int = 0
+
+    def __len__(self) -> int:
+        """Number of idle Boxes in the pool."""
+        return len(self._idle)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of calls to `acquire` that re-used an idle Box. 0 if none have been made."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def acquire(self, definition: _Definition) -> _Box:
+        """
+        Get a Box from the pool, or create a new one if there are none idle.
+
+        :param definition: Definition of the Box. If None then a re-used Box keeps its current
+            definition.
+        :return: A Box with no parent.
+        """
+        if not self._idle:
+            self.misses += 1
+            return self.factory(definition)
+
+        self.hits += 1
+        box = self._idle.pop()
+        self._idle_ids.discard(id(box))
+        box.reset(definition)
+        return box
+
+    def release(self, box: _Box) -> None:
+        """
+        Return a Box to the pool so that it can be re-used.
+
+        The Box is removed from its parent and its actions are stopped. It must not be used
+        again by the caller.
+
+        :param box: The Box to release.
+        """
+        if id(box) in self._idle_ids:
+            log.warning(f"{box!r} has already been released to {self!r}.")
+            return
+
+        if box.parent is not None:
+            box.parent.remove(box)
+            box.parent = None
+        box.stop()
+
+        if self.max_idle is not None and len(self._idle) >= self.max_idle:
+            self.discards += 1
+            return
+
+        self._idle.append(box)
+        self._idle_ids.add(id(box))
+
+    def clear(self) -> None:
+        """Discard all idle Boxes."""
+        self.discards += len(self._idle)
+        self._idle.clear()
+        self._idle_ids.clear()
+
+    def __repr__(self) -> str:
+        """String representation of this pool including its statistics."""
+        return (
+            f"{self.__class__.__name__}(idle={len(self)}, hits={self.hits}, "
+            f"misses={self.misses}, discards={self.discards})"
+        )
@@ -1,10 +1,13 @@
 """Module defining text fonts."""
+import string
+from collections import OrderedDict, deque
 from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Iterable, Callable, Deque, Iterator
 
 from pyglet.font import load as load_font
 
 from shimmer.data_structures import Color, White
+from shimmer.work_queue import WorkQueue, WorkTask
 
 
 @dataclass(frozen=True)
@@ -25,18 +28,281 @@ class FontDefinition:
         _dict["color"] = self.color.as_tuple_alpha()
         return _dict
 
+    @property
+    def metrics(self) -> "FontMetrics":
+        """
+        Get the metrics of this Font.
+
+        Metrics are cached process-wide in `FontMetricsCache`, so this is cheap after the first
+        call for each distinct font.
+        """
+        return FontMetricsCache.get(self)
+
+    @property
+    def height(self) -> int:
+        """Discover the height of a single line of text in this Font."""
+        return self.metrics.height
+
+
+class FontMetrics:
+    """
+    Measurements of a loaded Font.
+
+    The ascent, descent and height are read once on creation. Character advance widths are
+    discovered on demand and remembered, as they require the glyph to be rendered by pyglet.
+    """
+
+    def __init__(self, font: Any):
+        """
+        Create a new FontMetrics.
+
+        :param font: The loaded pyglet Font to measure.
+        """
+        self._font = font
+        self.ascent: int = font.ascent
+        self.descent: int = font.descent
+        self._advances: Dict[str, int] = {}
+
     @property
     def height(self) -> int:
+        """Height of a single line of text in this Font."""
+        return self.ascent - self.descent
+
+    def advance(self, character: str) -> int:
+        """
+        Get the horizontal advance of a single character.
+
+        :param character: The single character to measure.
+        :return: Number of pixels the pen moves after drawing the character.
+        """
+        try:
+            return self._advances[character]
+        except KeyError:
+            self.load_advances(character)
+            return self._advances[character]
+
+    def load_advances(self, characters: str) -> None:
+        """
+        Discover the advance widths of all the given characters that are not already known.
+
+        Unknown characters are measured in a single pyglet call.
+
+        :param characters: String of characters to measure.
+        """
+        # Use a dict rather than a set to de-duplicate so that the order is preserved.
+        missing = "".join(
+            dict.fromkeys(
+                character for character in characters if character not in self._advances
+            )
+        )
+        if not missing:
+            return
+        for character, glyph in zip(missing, self._font.get_glyphs(missing)):
+            self._advances[character] = glyph.advance
+
+    def text_width(self, text: str) -> int:
+        """
+        Get the width of the given text when drawn on a single line.
+
+        :param text: The text to measure.
+        :return: Sum of the advances of every character in the text.
+        """
+        self.load_advances(text)
+        advances = self._advances
+        return sum(advances[character] for character in text)
+
+
+class _FontMetricsCache:
+    """
+    Bounded cache of FontMetrics, keyed by FontDefinition.
+
+    Loading a pyglet Font is expensive, so this cache makes sure that it only happens once for
+    each distinct font. The color of a FontDefinition does not affect its metrics, so fonts that
+    differ only by color share a cache entry.
+
+    The least recently used entry is discarded when the cache is full.
+
+    The global singleton `FontMetricsCache` is available for use as the default cache.
+    """
+
+    def __init__(self, max_size: int = 64):
+        """
+        Create a new FontMetricsCache.
+
+        Typically to be used as a singleton.
+
+        :param max_size: Maximum number of fonts to hold metrics for.
+        """
+        self.max_size = max_size
+        self._metrics: "OrderedDict[Tuple, FontMetrics]" = OrderedDict()
+
+        # Incremented on every invalidation so that anything derived from cached metrics
+        # can tell whether it is out of date.
+        self.generation: int = 0
+
+    @staticmethod
+    def _key(font: FontDefinition) -> Tuple:
+        """Key of the given font in the cache, ignoring attributes that don't affect size."""
+        return font.font_name, font.font_size, font.bold, font.italic, font.dpi
+
+    def get(self, font: FontDefinition) -> FontMetrics:
         """
-        Discover the height of this Font.
+        Get the metrics of the given font, loading the font if it is not already cached.
 
-        This is a relatively expensive call, so cache it if you need to use it often.
+        :param font: The FontDefinition to get the metrics of.
         """
-        font = load_font(
-            self.font_name, self.font_size, self.bold, self.italic, self.dpi
+        key = self._key(font)
+        try:
+            self._metrics.move_to_end(key)
+            return self._metrics[key]
+        except KeyError:
+            pass
+
+        metrics = FontMetrics(
+            load_font(font.font_name, font.font_size, font.bold, font.italic, font.dpi)
         )
-        return font.ascent - font.descent
+        self._metrics[key] = metrics
+        while len(self._metrics) > self.max_size:
+            self._metrics.popitem(last=False)
+        return metrics
+
+    def invalidate(self, font: Optional[FontDefinition] = None) -> None:
+        """
+        Discard cached metrics.
+
+        This should be used if a font is changed, for example by adding a new font file to pyglet.
+
+        :param font: The font to discard metrics for. If None, all metrics are discarded.
+        """
+        self.generation += 1
+        if font is None:
+            self._metrics.clear()
+        else:
+            self._metrics.pop(self._key(font), None)
+
+    def __contains__(self, font: FontDefinition) -> bool:
+        """True if metrics for the given font are currently cached."""
+        return self._key(font) in self._metrics
+
+    def __len__(self) -> int:
+        """Number of fonts currently cached."""
+        return len(self._metrics)
+
+
+# The global font metrics cache.
+FontMetricsCache = _FontMetricsCache()
 
 
 Calibri = FontDefinition("calibri", 16)
 ComicSans = FontDefinition("comic sans", 16)
+
+
+# Characters that are pre-warmed if no other characters are given.
+DEFAULT_PREWARM_CHARACTERS = (
+    string.ascii_letters + string.digits + string.punctuation + " "
+)
+
+
+def prewarm_fonts(
+    fonts: Iterable[FontDefinition], characters: str = DEFAULT_PREWARM_CHARACTERS
+) -> None:
+    """
+    Render the given characters of each of the given fonts into the pyglet glyph texture atlas.
+
+    Pyglet renders glyphs the first time they are used, which causes a noticeable pause when
+    text is first displayed. Calling this during startup or on a loading screen moves that cost
+    out of the game. See `FontPrewarmer` to spread the work out over several frames instead.
+
+    Fonts must be listed separately for each size and bold/italic variant that is used. Fonts
+    that differ only by color share glyphs.
+
+    :param fonts: The fonts to pre-warm.
+    :param characters: The characters to render in every font.
+    """
+    for font in fonts:
+        font.metrics.load_advances(characters)
+
+
+class FontPrewarmer:
+    """
+    Pre-warms fonts in the background, using a small amount of time between each frame.
+
+    See `prewarm_fonts` for details of what pre-warming does.
+
+    Characters are rendered in chunks, each of which is a step of a task in the `WorkQueue`, so
+    pre-warming shares the time budget of each frame with the rest of the background work.
+    """
+
+    def __init__(
+        self,
+        fonts: Iterable[FontDefinition],
+        characters: str = DEFAULT_PREWARM_CHARACTERS,
+        chunk_size: int = 16,
+        priority: int = 0,
+        on_complete: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Create a new FontPrewarmer. Call `start` to begin pre-warming.
+
+        :param fonts: The fonts to pre-warm.
+        :param characters: The characters to render in every font.
+        :param chunk_size: Number of characters to render at a time.
+        :param priority: Priority of the pre-warming task in the WorkQueue.
+        :param on_complete: Called once every font has been pre-warmed.
+        """
+        self.priority = priority
+        self.on_complete = on_complete
+        self._chunks: Deque[Tuple[FontDefinition, str]] = deque(
+            (font, characters[index : index + chunk_size])
+            for font in dict.fromkeys(fonts)
+            for index in range(0, len(characters), chunk_size)
+        )
+        self._total_chunks = len(self._chunks)
+        self._task: Optional[WorkTask] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the work that has been done, between 0 and 1."""
+        if self._total_chunks == 0:
+            return 1.0
+        return 1 - len(self._chunks) / self._total_chunks
+
+    @property
+    def is_complete(self) -> bool:
+        """True if every font has been pre-warmed."""
+        return not self._chunks
+
+    @property
+    def is_running(self) -> bool:
+        """True if pre-warming has been started, and hasn't completed or been cancelled."""
+        return self._task is not None and self._task.is_pending
+
+    def start(self) -> None:
+        """Start pre-warming in the WorkQueue."""
+        if not self.is_running:
+            self._task = WorkQueue.add(
+                self._prewarm_chunks(),
+                priority=self.priority,
+                on_complete=self.on_complete,
+                name="prewarm fonts",
+            )
+
+    def cancel(self) -> None:
+        """
+        Stop pre-warming.
+
+        Fonts that have already been pre-warmed stay warm. Pre-warming can be resumed by calling
+        `start` again.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _prewarm_chunks(self) -> Iterator[None]:
+        """Render each chunk of characters as a separate step."""
+        while self._chunks:
+            font, characters = self._chunks.popleft()
+            font.metrics.load_advances(characters)
+            # Finish straight after the last chunk, so completion isn't delayed by a frame.
+            if self._chunks:
+                yield
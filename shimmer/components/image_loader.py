@@ -0,0 +1,414 @@
+"""
+Module for loading images, optionally in the background.
+
+Decoding image files is slow, so loading lots of images while the game is running causes the
+frame loop to stall. Images can instead be decoded on background threads by the `ImageLoader`,
+and are then uploaded to the graphics card on the main thread once they are ready.
+"""
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from io import IOBase
+from pathlib import Path
+from typing import Union, Optional, Callable, List, Set, Tuple, Dict
+
+import pyglet
+from pyglet.image import AbstractImage, Animation
+
+from .texture_atlas import ImageAtlas
+
+log = logging.getLogger(__name__)
+
+ANIMATION_SUFFIXES = [".gif"]
+
+# Types of image that can be loaded.
+ImageSource = Union[str, Path, IOBase]
+
+# Key of an image in the ImageCache: the resolved path and its modification time.
+_CacheKey = Tuple[str, int]
+
+
+def load_image_from_path(path: Path) -> Union[AbstractImage, Animation]:
+    """
+    Load an image found at path into a pyglet object.
+
+    If the image has a ".gif" extension then it will be loaded as an Animation object.
+
+    :param path: Path to the image file.
+    :return: The pyglet object holding the loaded image or animation.
+    """
+    if path.suffix in ANIMATION_SUFFIXES:
+        load_func = pyglet.image.load_animation
+    else:
+        load_func = pyglet.image.load
+    with open(str(path), "rb") as fi:
+        return load_func(filename=path.name, file=fi)
+
+
+def image_size_in_bytes(image: Union[AbstractImage, Animation]) -> int:
+    """Estimate the texture memory used by an image, or all the frames of an animation."""
+    if isinstance(image, Animation):
+        return sum(image_size_in_bytes(frame.image) for frame in image.frames)
+    # Textures are stored as RGBA, so 4 bytes per pixel.
+    return image.width * image.height * 4
+
+
+class _ImageCache:
+    """
+    Cache of images loaded from files, keyed by the resolved path and modification time.
+
+    Images are shared between everything that loads the same file, as is their texture once
+    uploaded. If the file is modified then it is loaded again.
+
+    The least recently used images are discarded once the estimated texture memory of the
+    cached images exceeds `max_bytes`. Images that are still in use are not freed by this, but
+    will be loaded again if requested after being discarded.
+
+    The cache is thread safe so that it can be used by the `ImageLoader` workers.
+
+    The global singleton `ImageCache` is available for use as the default cache.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Create a new ImageCache.
+
+        Typically to be used as a singleton.
+
+        :param max_bytes: Texture memory budget, in bytes, of the cached images.
+        """
+        self.max_bytes = max_bytes
+        # Mapping of (path, modification time) to the image and its size, oldest first.
+        self._images: "OrderedDict[_CacheKey, Tuple[Union[AbstractImage, Animation], int]]"
+        self._images = OrderedDict()
+        # Mapping of path to the key of its cached image, to discard images of outdated files.
+        self._keys: Dict[str, _CacheKey] = {}
+        self._lock = threading.Lock()
+
+        self.size_in_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        """Number of images in the cache."""
+        return len(self._images)
+
+    def get(self, path: Path) -> Union[AbstractImage, Animation]:
+        """
+        Get the image at the given path, loading it if it is not already cached.
+
+        :param path: Path to the image file. If a relative path is given, then it is relative to
+            the current working directory.
+        """
+        resolved = path.resolve()
+        key = (str(resolved), resolved.stat().st_mtime_ns)
+        with self._lock:
+            try:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key][0]
+            except KeyError:
+                self.misses += 1
+
+        # Load outside the lock so other files can be loaded at the same time.
+        image = load_image_from_path(resolved)
+        size = image_size_in_bytes(image)
+
+        with self._lock:
+            old_key = self._keys.get(key[0])
+            if old_key is not None and old_key != key:
+                self._discard(old_key)
+            if key not in self._images:
+                self._images[key] = (image, size)
+                self._keys[key[0]] = key
+                self.size_in_bytes += size
+
+            # Always keep the newest image, even if it is larger than the budget on its own.
+            while self.size_in_bytes > self.max_bytes and len(self._images) > 1:
+                self._discard(next(iter(self._images)))
+                self.evictions += 1
+        return image
+
+    def _discard(self, key: _CacheKey) -> None:
+        """Remove the image with the given key from the cache. Must hold the lock."""
+        _, size = self._images.pop(key)
+        self.size_in_bytes -= size
+        if self._keys.get(key[0]) == key:
+            del self._keys[key[0]]
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """
+        Discard cached images.
+
+        :param path: Path of the image to discard. If None, all images are discarded.
+        """
+        with self._lock:
+            if path is None:
+                self._images.clear()
+                self._keys.clear()
+                self.size_in_bytes = 0
+            else:
+                key = self._keys.get(str(path.resolve()))
+                if key is not None:
+                    self._discard(key)
+
+
+# The global image cache.
+ImageCache = _ImageCache()
+
+
+def load_image(
+    source: ImageSource, use_cache: bool = True
+) -> Union[AbstractImage, Animation]:
+    """
+    Load an image into a pyglet object.
+
+    :param source: Image to load. Possible types are:
+        - str: name of the image resource loaded into pyglet
+        - Path: path to the image file. If a relative path is given, then it is relative to the
+                current working directory.
+        - IOBase: Binary stream containing image data.
+                  For example, from `open(image_path, "rb")`.
+    :param use_cache: If True, images loaded from a path are shared using the `ImageCache`.
+    :return: The pyglet object holding the loaded image or animation.
+    """
+    if isinstance(source, str):
+        return pyglet.resource.image(source)
+    elif isinstance(source, Path):
+        if use_cache:
+            return ImageCache.get(source)
+        if source.is_absolute():
+            return load_image_from_path(source)
+        return load_image_from_path(Path.cwd() / source)
+    else:
+        # Need a name for the image to be stored in pyglet resource as.
+        # There isn't a useful name associated with a stream object, so just use its ID.
+        return pyglet.image.load(str(id(source)), file=source)
+
+
+def upload_image(image: Union[AbstractImage, Animation]) -> None:
+    """
+    Upload an image, or every frame of an animation, to the graphics card.
+
+    Must be called on the main thread. Images cache their texture, so the image is not uploaded
+    again when it is first drawn.
+    """
+    if isinstance(image, Animation):
+        for frame in image.frames:
+            frame.image.get_texture()
+    else:
+        image.get_texture()
+
+
+class PendingImage:
+    """An image that is being loaded in the background by an ImageLoader."""
+
+    def __init__(self, source: ImageSource, use_atlas: bool = False):
+        """
+        Create a new PendingImage.
+
+        :param source: The image being loaded. See `load_image`.
+        :param use_atlas: If True, the image is packed into the `ImageAtlas` once loaded.
+        """
+        self.source = source
+        self.use_atlas = use_atlas
+        self.image: Optional[Union[AbstractImage, Animation]] = None
+        self.error: Optional[Exception] = None
+        self.is_done: bool = False
+        self._callbacks: List[Callable[["PendingImage"], None]] = []
+
+    def __repr__(self) -> str:
+        """String representation of this PendingImage."""
+        return f"{self.__class__.__name__}({self.source!r})"
+
+    def add_done_callback(self, callback: Callable[["PendingImage"], None]) -> None:
+        """
+        Call the given callback with this PendingImage once it has finished loading.
+
+        The callback is called on the main thread. If loading has already finished then the
+        callback is called immediately.
+
+        :param callback: Called with this PendingImage. Check `image` or `error` for the result.
+        """
+        if self.is_done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(
+        self,
+        image: Optional[Union[AbstractImage, Animation]],
+        error: Optional[Exception],
+    ) -> None:
+        """Record the result of loading and call the callbacks."""
+        self.image = image
+        self.error = error
+        self.is_done = True
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class _ImageLoader:
+    """
+    Loads images in the background.
+
+    Image files are decoded on a pool of worker threads. Once decoded, images are uploaded to
+    the graphics card on the main thread between frames using the pyglet clock, and then the
+    callbacks of the PendingImage are called.
+
+    Named pyglet resources are loaded on the main thread rather than by the workers because pyglet
+    stores them in shared texture atlases.
+
+    The global singleton `ImageLoader` is available for use as the default loader.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Create a new ImageLoader.
+
+        Typically to be used as a singleton.
+
+        :param max_workers: Number of threads to decode images on.
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Futures that are being decoded, and those that have been decoded and are waiting to
+        # be uploaded on the main thread.
+        self._decoding: Set[Future] = set()
+        self._decoded: "queue.SimpleQueue[Tuple[PendingImage, Future]]" = (
+            queue.SimpleQueue()
+        )
+        self._is_upload_scheduled: bool = False
+
+        self._on_idle: List[Callable[[], None]] = []
+        self.total: int = 0
+        self.completed: int = 0
+
+    @property
+    def progress(self) -> float:
+        """Fraction of images that have been loaded since the loader was last idle, from 0 to 1."""
+        if self.total == 0:
+            return 1.0
+        return self.completed / self.total
+
+    @property
+    def is_loading(self) -> bool:
+        """True if there are any images still being loaded."""
+        return self.completed < self.total
+
+    def load(
+        self,
+        source: ImageSource,
+        on_loaded: Optional[Callable[[PendingImage], None]] = None,
+        use_cache: bool = True,
+        use_atlas: bool = False,
+    ) -> PendingImage:
+        """
+        Start loading an image in the background.
+
+        :param source: Image to load. See `load_image`.
+        :param on_loaded: Called with the PendingImage on the main thread once it is loaded.
+        :param use_cache: If True, images loaded from a path are shared using the `ImageCache`.
+        :param use_atlas: If True, the image is packed into the `ImageAtlas` once loaded.
+        :return: PendingImage that will hold the loaded image.
+        """
+        pending = PendingImage(source, use_atlas)
+        if on_loaded is not None:
+            pending.add_done_callback(on_loaded)
+
+        if not self.is_loading:
+            # Start counting progress again for this batch of images.
+            self.total = self.completed = 0
+        self.total += 1
+
+        future: Future
+        if isinstance(source, str):
+            future = Future()
+            future.set_result(None)
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="shimmer-image-loader"
+                )
+            future = self._executor.submit(load_image, source, use_cache)
+            self._decoding.add(future)
+
+        # Called on the worker thread, so only pass the result to the main thread.
+        future.add_done_callback(lambda done: self._decoded.put((pending, done)))
+
+        if not self._is_upload_scheduled:
+            self._is_upload_scheduled = True
+            pyglet.clock.schedule(self._upload_decoded)
+        return pending
+
+    def when_idle(self, callback: Callable[[], None]) -> None:
+        """
+        Call the given callback once all images currently being loaded have finished.
+
+        Useful for ending a loading screen. If no images are being loaded then the callback
+        is called immediately.
+        """
+        if self.is_loading:
+            self._on_idle.append(callback)
+        else:
+            callback()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until all images currently being loaded have finished, then upload them.
+
+        Must be called on the main thread.
+
+        :param timeout: Maximum number of seconds to wait for images to be decoded.
+        """
+        done, _ = wait(list(self._decoding), timeout=timeout)
+        # The callbacks that queue decoded images may run after `wait` returns, so block until
+        # every image that has finished decoding has been queued and uploaded.
+        while not done.isdisjoint(self._decoding):
+            self._upload(*self._decoded.get())
+        self._upload_decoded(0)
+
+    def _upload(self, pending: PendingImage, future: Future) -> None:
+        """Upload a single decoded image, and call its callbacks."""
+        self._decoding.discard(future)
+        image: Optional[Union[AbstractImage, Animation]] = None
+        error: Optional[Exception] = None
+        try:
+            image = future.result()
+            if image is None:
+                image = load_image(pending.source)
+            if pending.use_atlas:
+                image = ImageAtlas.add(image)
+            upload_image(image)
+        except Exception as exc:
+            log.exception(f"Failed to load image {pending.source!r}.")
+            error = exc
+
+        self.completed += 1
+        pending._finish(image, error)
+
+    def _upload_decoded(self, dt: float) -> None:
+        """Upload the images that have been decoded, and call their callbacks."""
+        while True:
+            try:
+                pending, future = self._decoded.get_nowait()
+            except queue.Empty:
+                break
+            self._upload(pending, future)
+
+        if not self.is_loading:
+            self._is_upload_scheduled = False
+            pyglet.clock.unschedule(self._upload_decoded)
+            callbacks, self._on_idle = self._on_idle, []
+            for callback in callbacks:
+                callback()
+
+
+# The global image loader.
+ImageLoader = _ImageLoader()
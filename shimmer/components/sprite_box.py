@@ -4,35 +4,29 @@ Module defining a Box that contains a cocos Sprite.
 This allows display of static images and animated sprites.
 """
 
+import math
 from dataclasses import dataclass
 from io import IOBase
 from pathlib import Path
-from typing import Union, Optional
+from typing import Union, Optional, Tuple
 
 import pyglet
 from pyglet.image import AbstractImage, Animation
 
+import cocos
 from cocos.sprite import Sprite
+from .batch_box import BatchBox, find_batch_box
 from .box import Box, BoxDefinition
+from .image_loader import ImageLoader, PendingImage, load_image, ANIMATION_SUFFIXES
+from .streaming_animation import (
+    StreamingAnimation,
+    is_streaming_available,
+    MISSING_PILLOW_MESSAGE,
+)
+from .texture_atlas import ImageAtlas
 
-ANIMATION_SUFFIXES = [".gif"]
-
-
-def load_image_from_path(path: Path) -> Union[AbstractImage, Animation]:
-    """
-    Load an image found at path into a pyglet object.
-
-    If the image has a ".gif" extension then it will be loaded as an Animation object.
-
-    :param path: Path to the
-    :return: The pyglet object holding the loaded image or animation.
-    """
-    if path.suffix in ANIMATION_SUFFIXES:
-        load_func = pyglet.image.load_animation
-    else:
-        load_func = pyglet.image.load
-    with open(str(path), "rb") as fi:
-        return load_func(filename=path.name, file=fi)
+# Re-exported, as this used to be defined here.
+from .image_loader import load_image_from_path  # noqa: F401
 
 
 @dataclass(frozen=True)
@@ -51,63 +45,230 @@ class SpriteBoxDefinition(BoxDefinition):
                   For example, from `open(image_path, "rb")`.
         - AbstractImage: An instance of a pyglet AbstractImage subclass.
         - Animation: An instance of a pyglet Animation.
+
+    :param load_in_background: If True, images given by name, path or stream are loaded in the
+        background by the `ImageLoader` rather than when the definition is created. Until the
+        image is loaded, `image` is a PendingImage and SpriteBoxes show `placeholder` instead.
+    :param placeholder: Image to show while the image is loading. Defaults to a transparent image.
+    :param use_cache: If True, images loaded from a path are shared with other definitions of the
+        same file using the `ImageCache`, rather than loading the file again.
+    :param use_atlas: If True, the image is packed into a shared texture by the `ImageAtlas`.
+        This is best for small images that are drawn many times.
+    :param stream_animation: If True, GIFs given by path are loaded as a StreamingAnimation, which
+        decodes frames as they are shown rather than all up front. Requires Pillow, from the
+        `streaming` extra. To control the number of frames cached or decoded in advance, pass a
+        StreamingAnimation as `image`.
     """
 
-    image: Optional[Union[str, Path, IOBase, AbstractImage, Animation]] = None
+    image: Optional[
+        Union[str, Path, IOBase, AbstractImage, Animation, PendingImage]
+    ] = None
+    load_in_background: bool = False
+    placeholder: Optional[AbstractImage] = None
+    use_cache: bool = True
+    use_atlas: bool = False
+    stream_animation: bool = False
 
     def __post_init__(self):
         """Handle loading the image as needed upon creation."""
-        actual_image: Union[AbstractImage, Animation]
+        actual_image: Union[AbstractImage, Animation, PendingImage]
 
         if self.image is None:
             raise ValueError(f"`image` cannot be None for {self.__class__.__name__}.")
+        if self.stream_animation and not is_streaming_available():
+            raise ValueError(
+                f"`stream_animation` can't be used: {MISSING_PILLOW_MESSAGE}"
+            )
 
-        if isinstance(self.image, str):
-            actual_image = pyglet.resource.image(self.image)
-        elif isinstance(self.image, Path):
-            if self.image.is_absolute():
-                actual_image = load_image_from_path(self.image)
+        if (
+            self.stream_animation
+            and isinstance(self.image, Path)
+            and self.image.suffix in ANIMATION_SUFFIXES
+        ):
+            # Streaming animations are cheap to create, as frames are decoded when shown.
+            actual_image = StreamingAnimation(Path.cwd() / self.image)
+        elif isinstance(self.image, (str, Path, IOBase)):
+            if self.load_in_background:
+                actual_image = ImageLoader.load(
+                    self.image, self._on_image_loaded, self.use_cache, self.use_atlas
+                )
             else:
-                path = Path.cwd() / self.image
-                actual_image = load_image_from_path(path)
-        elif isinstance(self.image, IOBase):
-            # Need a name for the image to be stored in pyglet resource as.
-            # There isn't a useful name associated with a stream object, so just use its ID.
-            actual_image = pyglet.image.load(str(id(self.image)), file=self.image)
+                actual_image = load_image(self.image, self.use_cache)
         else:
             actual_image = self.image
 
+        if self.use_atlas and not isinstance(
+            actual_image, (PendingImage, StreamingAnimation)
+        ):
+            actual_image = ImageAtlas.add(actual_image)
+
         # Have to use __setattr__ to get around `frozen=True`.
         object.__setattr__(self, "image", actual_image)
 
+    @property
+    def is_loaded(self) -> bool:
+        """True if the image has finished loading."""
+        return not isinstance(self.image, PendingImage)
+
+    def _on_image_loaded(self, pending: PendingImage) -> None:
+        """Replace the PendingImage with the loaded image, so new SpriteBoxes use it directly."""
+        if pending.image is not None:
+            object.__setattr__(self, "image", pending.image)
+
 
 class SpriteBox(Box):
-    """A Box that contains a cocos Sprite."""
+    """
+    A Box that contains a cocos Sprite.
+
+    If the image of the definition is still being loaded in the background, then the placeholder
+    image is shown until it has loaded.
+
+    If the SpriteBox is a descendant of a BatchBox, then the image is drawn by the BatchBox using a
+    pyglet Sprite in its shared Batch rather than by the cocos Sprite. Sprites in the same Batch
+    that share a texture, for example by using the `ImageAtlas`, are drawn together in a single
+    call. Batched sprites follow the position, scale, rotation and visibility of the SpriteBox.
+    """
 
     definition_type = SpriteBoxDefinition
 
     def __init__(self, definition: SpriteBoxDefinition):
         """Creates a new SpriteBox."""
+        self._batch_box: Optional[BatchBox] = None
+        self._batched_sprite: Optional[pyglet.sprite.Sprite] = None
         super(SpriteBox, self).__init__(definition)
         self.definition: SpriteBoxDefinition = self.definition
-        self.sprite = Sprite(self.definition.image, anchor=(0, 0))
+
+        image = self.definition.image
+        if isinstance(image, PendingImage):
+            self.sprite = Sprite(
+                self.definition.placeholder or _transparent_image(), anchor=(0, 0)
+            )
+            image.add_done_callback(self._on_image_loaded)
+        else:
+            self.sprite = Sprite(image, anchor=(0, 0))
         self._update_sprite_scale()
         self.add(self.sprite)
 
+    @property
+    def is_batched(self) -> bool:
+        """True if the image of this SpriteBox is currently drawn by a BatchBox."""
+        return self._batch_box is not None
+
+    @property
+    def opacity(self) -> int:
+        """Opacity of the image, from 0 (transparent) to 255 (opaque)."""
+        return self.sprite.opacity
+
+    @opacity.setter
+    def opacity(self, value: int) -> None:
+        """Set the opacity of the image, including the batched sprite if there is one."""
+        self.sprite.opacity = value
+        if self._batched_sprite is not None:
+            self._batched_sprite.opacity = value
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        """RGB color that the image is multiplied by."""
+        return self.sprite.color
+
+    @color.setter
+    def color(self, value: Tuple[int, int, int]) -> None:
+        """Set the color of the image, including the batched sprite if there is one."""
+        self.sprite.color = value
+        if self._batched_sprite is not None:
+            self._batched_sprite.color = value
+
+    def on_enter(self):
+        """
+        Prepare to display the image just before entering the scene.
+
+        The image is drawn by the nearest BatchBox if there is one, otherwise by the cocos Sprite.
+        """
+        batch_box = find_batch_box(self)
+        if batch_box is not None:
+            if self.sprite in self:
+                self.remove(self.sprite, no_resize=True)
+            self._batch_box = batch_box
+            batch_box.register(self)
+        elif self.sprite not in self:
+            self.add(self.sprite, no_resize=True)
+        super(SpriteBox, self).on_enter()
+
+    def on_exit(self):
+        """Stop being drawn by the BatchBox, if any, just before leaving the scene."""
+        super(SpriteBox, self).on_exit()
+        if self._batch_box is not None:
+            self._batch_box.unregister(self)
+            self._batch_box = None
+        if self._batched_sprite is not None:
+            self._batched_sprite.delete()
+            self._batched_sprite = None
+
+    def on_batch_transform_change(
+        self, transform: cocos.euclid.Matrix3, visible: bool
+    ) -> None:
+        """
+        Called by the BatchBox when the transform of this SpriteBox relative to it changes.
+
+        Moves, scales and rotates the batched sprite to match, creating it if needed.
+        """
+        if self._batched_sprite is None:
+            assert self._batch_box is not None
+            self._batched_sprite = pyglet.sprite.Sprite(
+                self.sprite.image,
+                batch=self._batch_box.batch,
+                group=self._batch_box.group_for(self.get_z_value()),
+            )
+            self._batched_sprite.opacity = self.sprite.opacity
+            self._batched_sprite.color = self.sprite.color
+
+        x, y = transform * cocos.euclid.Point2(0, 0)
+        self._batched_sprite.update(
+            x=x,
+            y=y,
+            # pyglet rotates clockwise, whereas the transform rotates anticlockwise.
+            rotation=-math.degrees(math.atan2(transform.e, transform.a)),
+            scale_x=math.hypot(transform.a, transform.e) * self.sprite.scale_x,
+            scale_y=math.hypot(transform.b, transform.f) * self.sprite.scale_y,
+        )
+        self._batched_sprite.visible = visible
+
+    def _on_image_loaded(self, pending: PendingImage) -> None:
+        """Replace the placeholder with the loaded image."""
+        if pending.image is not None:
+            self.sprite.image = pending.image
+            if self._batched_sprite is not None:
+                self._batched_sprite.image = pending.image
+            self._update_sprite_scale()
+
+    def _image_size(self) -> Tuple[int, int]:
+        """Get the unscaled size of the image being displayed."""
+        image = self.sprite.image
+        if isinstance(image, Animation):
+            image = image.frames[0].image
+        return image.width, image.height
+
     def _update_sprite_scale(self):
         """Scale the underlying Sprite such that it fits the size of this Box."""
+        image_width, image_height = self._image_size()
         if self.rect.width == 0 or self.rect.height == 0:
             self.sprite.scale_x = 1
             self.sprite.scale_y = 1
-            return
-
-        scale_x = self.rect.width / self.sprite.width
-        scale_y = self.rect.height / self.sprite.height
+        else:
+            self.sprite.scale_x = self.rect.width / image_width
+            self.sprite.scale_y = self.rect.height / image_height
 
-        self.sprite.scale_x = scale_x
-        self.sprite.scale_y = scale_y
+        if self._batch_box is not None:
+            # Re-registering makes the BatchBox re-send the transform of this SpriteBox before
+            # the next draw, which applies the new scale to the batched sprite.
+            self._batch_box.register(self)
 
     def on_size_change(self):
         """When the size of this Box changes, update the Sprite to fit the new size."""
         self._update_sprite_scale()
         super(SpriteBox, self).on_size_change()
+
+
+def _transparent_image() -> AbstractImage:
+    """Create a 1x1 transparent image to show while the real image is loading."""
+    return pyglet.image.SolidColorImagePattern((0, 0, 0, 0)).create_image(1, 1)
@@ -0,0 +1,185 @@
+"""
+Module defining animations whose frames are decoded from a GIF file as they are shown.
+
+Loading a GIF with `pyglet.image.load_animation` decodes every frame into memory up front, which
+is slow and uses a lot of memory for large or long animations. A StreamingAnimation instead
+decodes each frame when it is first shown, keeps a limited number of recently shown frames, and
+can decode upcoming frames in the background.
+
+Requires the optional dependency Pillow, installed with `pip install shimmer[streaming]`.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple, Sequence, Union, overload, Optional
+
+import pyglet
+from pyglet.image import Animation, AnimationFrame, ImageData
+
+try:
+    from PIL import Image as PILImage
+except ImportError:  # pragma: no cover
+    PILImage = None
+
+# Frames of GIFs without a duration are shown for this many seconds.
+DEFAULT_FRAME_DURATION = 0.1
+
+MISSING_PILLOW_MESSAGE = (
+    "Pillow is required for streaming animations. "
+    "Install it with `pip install shimmer[streaming]`."
+)
+
+
+def is_streaming_available() -> bool:
+    """True if Pillow is installed, which is required for streaming animations."""
+    return PILImage is not None
+
+
+class _StreamingFrames(Sequence[AnimationFrame]):
+    """Sequence of the frames of a StreamingAnimation that decodes frames when accessed."""
+
+    def __init__(self, animation: "StreamingAnimation"):
+        """Create the frames of the given animation."""
+        self._animation = animation
+
+    def __len__(self) -> int:
+        """Number of frames in the animation."""
+        return self._animation.frame_count
+
+    @overload
+    def __getitem__(self, index: int) -> AnimationFrame:
+        pass  # pragma: no cover
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[AnimationFrame]:
+        pass  # pragma: no cover
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[AnimationFrame, Sequence[AnimationFrame]]:
+        """Get the frame, or frames, at the given index, decoding them if needed."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame {index} out of range for {self._animation!r}.")
+
+        image, duration = self._animation.get_frame(index)
+        return AnimationFrame(image, duration)
+
+
+class StreamingAnimation(Animation):
+    """
+    An Animation that decodes the frames of a GIF file on demand.
+
+    Recently shown frames are kept in a cache of up to `cache_size` frames, and the least recently
+    shown frame is discarded once the cache is full. If `prefetch` is set, then the frames after
+    the one being shown are decoded on a worker thread so they are ready in time.
+
+    This can be used anywhere a pyglet Animation is used, such as the image of a SpriteBox.
+    Avoid methods of Animation that look at every frame, such as `get_max_width`, as they will
+    decode the entire animation.
+    """
+
+    def __init__(self, path: Path, cache_size: int = 16, prefetch: int = 0):
+        """
+        Create a new StreamingAnimation.
+
+        :param path: Path to the GIF file.
+        :param cache_size: Maximum number of decoded frames to keep.
+        :param prefetch: Number of upcoming frames to decode in the background.
+        """
+        if not is_streaming_available():
+            raise ImportError(MISSING_PILLOW_MESSAGE)
+
+        self.path = path
+        self.cache_size = max(cache_size, prefetch + 1)
+        self.prefetch = prefetch
+
+        # The decoder is only used by one thread at a time. It is kept open so that frames can be
+        # decoded in sequence without decoding all the preceding frames again.
+        self._decoder = PILImage.open(str(path))
+        self._decoder_lock = threading.Lock()
+        self.frame_count: int = getattr(self._decoder, "n_frames", 1)
+
+        self._frames: "OrderedDict[int, Tuple[ImageData, float]]" = OrderedDict()
+        self._prefetching: Dict[int, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        super(StreamingAnimation, self).__init__(_StreamingFrames(self))
+
+    def __repr__(self) -> str:
+        """String representation of this StreamingAnimation."""
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def get_frame(self, index: int) -> Tuple[ImageData, float]:
+        """
+        Get the image and duration of a frame, decoding it if it isn't cached.
+
+        Must be called on the main thread.
+
+        :param index: Index of the frame to get.
+        :return: Tuple of (image, duration in seconds).
+        """
+        try:
+            self._frames.move_to_end(index)
+            frame = self._frames[index]
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            future = self._prefetching.pop(index, None)
+            frame = future.result() if future is not None else self._decode(index)
+            self._frames[index] = frame
+            while len(self._frames) > self.cache_size:
+                self._frames.popitem(last=False)
+
+        self._prefetch_after(index)
+        return frame
+
+    def _prefetch_after(self, index: int) -> None:
+        """Start decoding the frames after the given frame in the background."""
+        for offset in range(1, self.prefetch + 1):
+            upcoming = (index + offset) % self.frame_count
+            if upcoming in self._frames or upcoming in self._prefetching:
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    1, thread_name_prefix="shimmer-animation"
+                )
+            self._prefetching[upcoming] = self._executor.submit(self._decode, upcoming)
+
+    def _decode(self, index: int) -> Tuple[ImageData, float]:
+        """Decode a single frame into a pyglet image. Thread safe."""
+        with self._decoder_lock:
+            if index < self._decoder.tell():
+                # GIF frames can only be decoded in order, so start from the beginning again.
+                self._decoder.close()
+                self._decoder = PILImage.open(str(self.path))
+            self._decoder.seek(index)
+            duration_ms = self._decoder.info.get("duration")
+            frame = self._decoder.convert("RGBA")
+
+        width, height = frame.size
+        # Pillow images are stored top row first, so use a negative pitch.
+        image = pyglet.image.ImageData(
+            width, height, "RGBA", frame.tobytes(), pitch=-width * 4
+        )
+        duration = duration_ms / 1000 if duration_ms else DEFAULT_FRAME_DURATION
+        return image, duration
+
+    def close(self) -> None:
+        """Close the GIF file and discard all decoded frames."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._prefetching.clear()
+        self._frames.clear()
+        with self._decoder_lock:
+            self._decoder.close()
@@ -0,0 +1,119 @@
+"""
+Module for packing images into shared textures.
+
+Normally every image is uploaded to the graphics card as its own texture, so drawing lots of
+distinct images requires changing the bound texture for each one. Images added to the
+`ImageAtlas` are instead packed into a small number of large textures (atlas pages), so sprites
+using images on the same page can be drawn together without changing texture.
+"""
+
+import logging
+from typing import Union, Optional, List
+from weakref import WeakKeyDictionary
+
+from pyglet.image import AbstractImage, Animation, AnimationFrame
+from pyglet.image.atlas import AllocatorException, TextureAtlas, TextureBin
+
+log = logging.getLogger(__name__)
+
+_Image = Union[AbstractImage, Animation]
+
+
+class _ImageAtlas:
+    """
+    Packs images, and the frames of animations, into shared atlas textures.
+
+    Adding the same image object again returns the same region of the atlas, so images shared
+    through the `ImageCache` are only packed once.
+
+    Space in the atlas is not reclaimed when images are no longer used, so the atlas is best
+    suited to images that are used throughout the game, such as small sprites and icons.
+
+    Must only be used on the main thread, as images are copied into the atlas textures on
+    the graphics card.
+
+    The global singleton `ImageAtlas` is available for use as the default atlas.
+    """
+
+    def __init__(self, page_width: int = 2048, page_height: int = 2048):
+        """
+        Create a new ImageAtlas.
+
+        Typically to be used as a singleton.
+
+        :param page_width: Width of each atlas texture. Limited to the maximum texture size.
+        :param page_height: Height of each atlas texture. Limited to the maximum texture size.
+        """
+        self.page_width = page_width
+        self.page_height = page_height
+
+        # Created on first use, as it requires a GL context.
+        self._texture_bin: Optional[TextureBin] = None
+
+        # Mapping of the images that have been added to their packed equivalent.
+        self._packed: "WeakKeyDictionary[_Image, _Image]" = WeakKeyDictionary()
+
+    @property
+    def pages(self) -> List[TextureAtlas]:
+        """The atlas textures that images have been packed into."""
+        if self._texture_bin is None:
+            return []
+        return self._texture_bin.atlases
+
+    def add(self, image: _Image) -> _Image:
+        """
+        Pack an image, or every frame of an animation, into the atlas.
+
+        Images that are too large to fit in an atlas page are returned unchanged.
+
+        :param image: The image or animation to pack.
+        :return: The image as a region of an atlas page, or an animation whose frames are
+            regions of atlas pages.
+        """
+        try:
+            return self._packed[image]
+        except KeyError:
+            pass
+
+        packed: _Image
+        if isinstance(image, Animation):
+            packed = Animation(
+                [
+                    AnimationFrame(self._add_image(frame.image), frame.duration)
+                    for frame in image.frames
+                ]
+            )
+        else:
+            packed = self._add_image(image)
+
+        if packed is not image:
+            # Images that don't fit aren't remembered, as they would keep themselves alive.
+            self._packed[image] = packed
+        return packed
+
+    def _add_image(self, image: AbstractImage) -> AbstractImage:
+        """Pack a single image into the atlas, if it fits."""
+        if self._texture_bin is None:
+            self._texture_bin = TextureBin(self.page_width, self.page_height)
+
+        try:
+            return self._texture_bin.add(image)
+        except AllocatorException:
+            log.debug(
+                f"{image!r} is too large for an atlas page of size "
+                f"{self._texture_bin.texture_width}x{self._texture_bin.texture_height}."
+            )
+            return image
+
+    def clear(self) -> None:
+        """
+        Forget all packed images and start new atlas pages for future images.
+
+        Existing pages are freed once they are no longer used by any sprites.
+        """
+        self._texture_bin = None
+        self._packed = WeakKeyDictionary()
+
+
+# The global image atlas.
+ImageAtlas = _ImageAtlas()
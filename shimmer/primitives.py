@@ -2,9 +2,10 @@
 
 import logging
 from abc import abstractmethod
-from typing import Any, Tuple
+from typing import Any, Tuple, Dict, Optional
 
 import cocos
+import pyglet
 from shimmer.data_structures import Color
 from shimmer.log_utils import log_exceptions
 
@@ -19,25 +20,155 @@ def create_color_rect(width: int, height: int, color: Color) -> cocos.layer.Colo
     )
 
 
+def resize_color_rect(
+    color_rect: cocos.layer.ColorLayer, width: int, height: int
+) -> None:
+    """Change the size of a colored rectangle without re-creating it."""
+    log.debug(f"Resizing color rect to size ({width=}, {height=}).")
+    color_rect.width, color_rect.height = int(width), int(height)
+
+    # The vertices only exist while the rectangle is in the scene. If it isn't then they are
+    # created using the new size when it enters the scene.
+    if color_rect._vertex_list is not None:
+        width, height = color_rect.width, color_rect.height
+        color_rect._vertex_list.vertices[:] = [0, 0, 0, height, width, height, width, 0]
+
+
+class _UpdateScheduler:
+    """
+    Updates all dirty UpdatingNodes in a single pass each frame.
+
+    Nodes are only visited if they have been marked as dirty, or if they need to poll their
+    indicator value every frame to find out if they have changed. Nodes that are marked dirty
+    during the pass are updated on the next frame.
+
+    The scheduler is only scheduled on the pyglet clock while there are nodes to visit.
+
+    The global singleton `UpdateScheduler` is used by all UpdatingNodes.
+    """
+
+    def __init__(self):
+        """
+        Create a new UpdateScheduler.
+
+        Typically to be used as a singleton.
+        """
+        # Dicts are used as ordered sets, so nodes are updated in the order they were marked.
+        self._dirty: Dict["UpdatingNode", None] = {}
+        self._polling: Dict["UpdatingNode", None] = {}
+        self._is_scheduled: bool = False
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of nodes waiting to be updated."""
+        return len(self._dirty)
+
+    @property
+    def polling_count(self) -> int:
+        """Number of nodes whose indicator value is checked every frame."""
+        return len(self._polling)
+
+    def mark_dirty(self, node: "UpdatingNode") -> None:
+        """Update the given node on the next frame."""
+        self._dirty[node] = None
+        self._schedule()
+
+    def start_polling(self, node: "UpdatingNode") -> None:
+        """Check the indicator value of the node every frame."""
+        self._polling[node] = None
+        self._schedule()
+
+    def stop(self, node: "UpdatingNode") -> None:
+        """Stop polling the node and discard any pending update of it."""
+        self._polling.pop(node, None)
+        self._dirty.pop(node, None)
+
+    def flush(self, dt: float) -> None:
+        """Poll the indicators of polling nodes and update every dirty node."""
+        for node in list(self._polling):
+            node._check_if_dirty()
+
+        dirty, self._dirty = self._dirty, {}
+        for node in dirty:
+            node._update_if_dirty(dt)
+
+        if not self._dirty and not self._polling:
+            self._is_scheduled = False
+            pyglet.clock.unschedule(self.flush)
+
+    def _schedule(self) -> None:
+        """Start flushing every frame, if not already."""
+        if not self._is_scheduled:
+            self._is_scheduled = True
+            pyglet.clock.schedule(self.flush)
+
+
+# The global update scheduler.
+UpdateScheduler = _UpdateScheduler()
+
+
 class UpdatingNode(cocos.cocosnode.CocosNode):
     """
-    A Node which updates regularly.
+    A Node which updates when it has changed.
 
-    Only performs an update if `self.dirty` is set to True.
+    Only performs an update if `self.dirty` is set to True, which queues the node to be updated
+    on the next frame by the `UpdateScheduler`.
 
     `dirty` can either be set by an third party; or this node will mark itself as dirty
-    if the value returned by `self._current_indicator_value()` changes.
+    if the value returned by `self._current_indicator_value()` changes. The indicator value is
+    checked every frame, unless `poll_indicator` is set to False, in which case the subclass
+    should set `dirty` itself whenever the indicator value changes.
     """
 
+    # Whether to check `_current_indicator_value` every frame. If None, then the indicator
+    # is only polled if `_current_indicator_value` is implemented.
+    poll_indicator: Optional[bool] = None
+
     def __init__(self):
         """Create a new UpdatingNode."""
         super(UpdatingNode, self).__init__()
-        self.schedule(self.update)
-        self.dirty = False
+        # Start dirty so the first update always happens.
+        self._dirty = True
 
         # Set to globally unique value so first update always happens.
         self.__last_indicator_value: Any = object()
 
+    @property
+    def dirty(self) -> bool:
+        """True if this node needs to be updated."""
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, value: bool) -> None:
+        """Mark this node as needing an update on the next frame."""
+        self._dirty = value
+        if value and self.is_running:
+            UpdateScheduler.mark_dirty(self)
+
+    @property
+    def is_polling(self) -> bool:
+        """True if the indicator value of this node needs to be checked every frame."""
+        if self.poll_indicator is not None:
+            return self.poll_indicator
+        return (
+            type(self)._current_indicator_value
+            is not UpdatingNode._current_indicator_value
+        )
+
+    def on_enter(self):
+        """Start updating this node once it is in the scene."""
+        super(UpdatingNode, self).on_enter()
+        if self.is_polling:
+            UpdateScheduler.start_polling(self)
+        if self._dirty:
+            UpdateScheduler.mark_dirty(self)
+
+    def on_exit(self):
+        """Stop updating this node while it isn't in the scene."""
+        super(UpdatingNode, self).on_exit()
+        UpdateScheduler.stop(self)
+
+    @log_exceptions(log)
     def _check_if_dirty(self):
         """Mark this node as dirty if the indicator value has changed."""
         indicator_value = self._current_indicator_value()
@@ -60,13 +191,16 @@ class UpdatingNode(cocos.cocosnode.CocosNode):
         pass
 
     @log_exceptions(log)
+    def _update_if_dirty(self, dt: float) -> None:
+        """Update this node if it is still dirty."""
+        if self._dirty:
+            self._dirty = False
+            self._update(dt)
+
     def update(self, dt: float) -> None:
-        """Called on every frame to determine if this node needs to update itself."""
-        # Only update if the value has changed to save on drawing performance.
+        """Check if this node needs to update itself, and update it immediately if so."""
         self._check_if_dirty()
-        if self.dirty:
-            self.dirty = False
-            self._update(dt)
+        self._update_if_dirty(dt)
 
 
 Point2d = Tuple[int, int]
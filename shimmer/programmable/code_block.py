@@ -1,7 +1,8 @@
 """Graphical display of a set of programmable code instructions."""
 
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, cast
+from typing import List, cast, Dict, Optional
 
 from shimmer.alignment import HorizontalAlignment
 from shimmer.components.box_layout import BoxColumn, BoxColumnDefinition
@@ -10,6 +11,7 @@ from shimmer.programmable.instruction import (
     InstructionDisplayDefinition,
 )
 from shimmer.programmable.logic.definition import CodeBlock
+from shimmer.programmable.logic.profiler import ProgramProfiler
 
 
 @dataclass(frozen=True)
@@ -43,16 +45,43 @@ class CodeBlockDisplay(BoxColumn):
         self.update_instructions()
 
     def update_instructions(self):
-        """Re-create all instruction displays."""
-        # We could enhance this later to only re-create those that have
-        # changed, but keep it simple for starters.
-        for instruction_display in self._boxes:
-            self.remove(instruction_display)
+        """
+        Update the instruction displays to match the instructions in the code block.
+
+        Displays are matched to instructions by identity, so only displays of instructions that
+        have been added are created, and only those of instructions that have been removed are
+        removed. Existing displays are re-used, even if their instruction has moved, and their
+        text is updated if their instruction has been edited.
+        """
+        existing_displays: Dict[int, List[InstructionDisplay]] = defaultdict(list)
+        for display in self._boxes:
+            existing_displays[id(display.instruction)].append(display)
 
+        displays = []
         for instruction in self.code_block.instructions:
-            new_display = InstructionDisplay(
-                instruction, self.definition.instruction_definition
+            matching_displays = existing_displays.get(id(instruction))
+            if matching_displays:
+                display = matching_displays.pop()
+                display.update_text()
+                displays.append(display)
+            else:
+                displays.append(
+                    InstructionDisplay(
+                        instruction, self.definition.instruction_definition
+                    )
+                )
+
+        # Reverse the list so we get a top-to-bottom list, which matches how the code
+        # will be executed.
+        self.set_boxes(reversed(displays))
+
+    def show_profile(self, profiler: Optional[ProgramProfiler]) -> None:
+        """
+        Overlay each instruction with a heat color showing how long it takes to run.
+
+        :param profiler: The profile to show, or None to stop showing a profile.
+        """
+        for display in self._boxes:
+            display.set_heat(
+                profiler.heat(display.instruction) if profiler is not None else None
             )
-            # Insert at start of list so we get a top-to-bottom list, which matches how the code
-            # will be executed.
-            self.add(new_display, position=0)
@@ -18,6 +18,7 @@ from shimmer.programmable.logic.definition import (
     InstructionWithCodeBlock,
     IfElifElse,
 )
+from shimmer.programmable.logic.profiler import ProgramProfiler
 
 
 @dataclass(frozen=True)
@@ -66,21 +67,52 @@ class InstructionWithBlockDisplay(Box):
         self.update_boxes()
 
     def update_boxes(self):
-        """Recreate the child boxes of this display."""
+        """
+        Update the child boxes of this display to match the instruction.
+
+        The existing displays are re-used, with their text updated if the instruction has been
+        edited, and the code block display only updates the displays of instructions that have
+        changed.
+        """
+        if (
+            self.code_block_display is not None
+            and self.code_block_display.code_block is self.instruction.code_block
+        ):
+            self.code_block_display.update_instructions()
+        else:
+            if self.code_block_display is not None:
+                self.remove(self.code_block_display)
+            self.code_block_display = CodeBlockDisplay(
+                self.instruction.code_block, self.definition.code_block_definition
+            )
+            self.code_block_display.position = (
+                self.definition.code_block_indentation,
+                0,
+            )
+            self.add(self.code_block_display)
+
+        if self.instruction_display is None:
+            self.instruction_display = InstructionDisplay(
+                self.instruction, self.definition.instruction_definition
+            )
+            self.add(self.instruction_display)
+        else:
+            self.instruction_display.update_text()
+        self.instruction_display.position = 0, self.code_block_display.rect.height
+        self.update_rect()
+
+    def show_profile(self, profiler: Optional[ProgramProfiler]) -> None:
+        """
+        Overlay the instruction and its code block with heat colors showing how long they take.
+
+        :param profiler: The profile to show, or None to stop showing a profile.
+        """
         if self.instruction_display is not None:
-            self.remove(self.instruction_display)
+            self.instruction_display.set_heat(
+                profiler.heat(self.instruction) if profiler is not None else None
+            )
         if self.code_block_display is not None:
-            self.remove(self.code_block_display)
-        self.code_block_display = CodeBlockDisplay(
-            self.instruction.code_block, self.definition.code_block_definition
-        )
-        self.code_block_display.position = self.definition.code_block_indentation, 0
-        self.instruction_display = InstructionDisplay(
-            self.instruction, self.definition.instruction_definition
-        )
-        self.instruction_display.position = 0, self.code_block_display.rect.height
-        self.add(self.instruction_display)
-        self.add(self.code_block_display)
+            self.code_block_display.show_profile(profiler)
 
 
 class IfElifElseDisplay(BoxColumn):
@@ -116,25 +148,40 @@ class IfElifElseDisplay(BoxColumn):
         self.update_boxes()
 
     def update_boxes(self):
-        """Recreate the child boxes of this display."""
-        for display in self._boxes:
-            self.remove(display)
-
-        for _elif in self.instruction.elifs:
-            elif_display = InstructionWithBlockDisplay(_elif, self.definition)
-            # Insert at start of list so we get a top-to-bottom list, which matches how the code
-            # will be executed.
-            self.add(elif_display, position=0)
+        """
+        Update the child boxes of this display to match the If, Elif and Else instructions.
 
+        Displays are matched to instructions by identity, so only displays of instructions that
+        have been added or removed are created or removed. Existing displays are updated.
+        """
+        existing_displays = {
+            id(display.instruction): display for display in self._boxes
+        }
+
+        instructions: List[InstructionWithCodeBlock] = [
+            self.instruction,
+            *self.instruction.elifs,
+        ]
         if self.instruction.else_ is not None:
-            else_display = InstructionWithBlockDisplay(
-                self.instruction.else_, self.definition
-            )
-            # Insert at start of list so we get Else at the bottom.
-            self.add(else_display, position=0)
-
-        # Add instruction last so it appears at the top.
-        instruction_display = InstructionWithBlockDisplay(
-            self.instruction, self.definition
-        )
-        self.add(instruction_display)
+            instructions.append(self.instruction.else_)
+
+        displays = []
+        for instruction in instructions:
+            display = existing_displays.pop(id(instruction), None)
+            if display is None:
+                display = InstructionWithBlockDisplay(instruction, self.definition)
+            else:
+                display.update_boxes()
+            displays.append(display)
+
+        # Reverse the list so the If is at the top and the Else is at the bottom.
+        self.set_boxes(reversed(displays))
+
+    def show_profile(self, profiler: Optional[ProgramProfiler]) -> None:
+        """
+        Overlay each If, Elif and Else block with heat colors showing how long they take.
+
+        :param profiler: The profile to show, or None to stop showing a profile.
+        """
+        for display in self._boxes:
+            display.show_profile(profiler)
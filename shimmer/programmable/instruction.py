@@ -24,6 +24,9 @@ class InstructionDisplayDefinition(ButtonDefinition):
 
     # Color to display over the Instruction button while the instruction is being executed.
     while_executing_mask: Optional[Color] = replace(ActiveGreen, a=100)
+    # Color to display over the Instruction button when it is the hottest instruction in a
+    # profile. Cooler instructions are shown with proportionally less opacity.
+    heat_mask: Color = Color(255, 60, 0, 160)
     # String format to use. Will be formatted with `instruction.method_str()`.
     text_format: str = "{}"
     # Whether the instruction should be draggable.
@@ -39,7 +42,8 @@ class InstructionDisplay(Button):
     Comprised of 3 Boxes:
       - A Button - e.g. for allowing the user to edit the instruction.
       - A drag anchor aligned on the left of the button.
-      - A color mask that overlays the button while the instruction is being executed.
+      - A color mask that overlays the button while the instruction is being executed, or
+        shows how hot the instruction is when displaying a profile.
     """
 
     def __init__(
@@ -52,6 +56,8 @@ class InstructionDisplay(Button):
         :param definition: Definition of the display of the Instruction.
         """
         button_text = self.get_button_text(instruction, definition)
+        # Whether the text shows the instruction, so needs updating if the instruction changes.
+        self._is_text_from_instruction = definition.text is None
         definition = replace(definition, text=button_text)
         self.instruction = instruction
 
@@ -60,6 +66,8 @@ class InstructionDisplay(Button):
 
         self.drag_anchor: Optional[DraggableBox] = None
         self.executing_mask: Optional[cocos.layer.ColorLayer] = None
+        # How hot the instruction is in the displayed profile, from 0 to 1, if any.
+        self.heat: Optional[float] = None
 
         super(InstructionDisplay, self).__init__(definition)
         self.definition: InstructionDisplayDefinition = self.definition
@@ -85,6 +93,16 @@ class InstructionDisplay(Button):
         else:
             return None
 
+    def update_text(self) -> None:
+        """Update the text of the button if the instruction has changed since it was displayed."""
+        if not self._is_text_from_instruction:
+            return
+
+        button_text = self.definition.text_format.format(self.instruction.method_str())
+        if button_text != self.definition.text:
+            self.definition = replace(self.definition, text=button_text)
+            self.update_label()
+
     def update_draggable_anchor(self):
         """Re-create the draggable anchor."""
         if self.drag_anchor is not None:
@@ -118,6 +136,7 @@ class InstructionDisplay(Button):
             color=replace(self.definition.while_executing_mask, a=0),
         )
         self.add(self.executing_mask, z=1)
+        self.hide_mask()
 
     def show_mask(self):
         """Make the color mask visible."""
@@ -125,9 +144,25 @@ class InstructionDisplay(Button):
             self.executing_mask is not None
             and self.definition.while_executing_mask is not None
         ):
+            self.executing_mask.color = self.definition.while_executing_mask.as_tuple()
             self.executing_mask.opacity = self.definition.while_executing_mask.a
 
     def hide_mask(self):
-        """Make the color mask invisible."""
-        if self.executing_mask is not None:
+        """Make the color mask invisible, or show the heat of the instruction if set."""
+        if self.executing_mask is None:
+            return
+
+        if self.heat is None:
             self.executing_mask.opacity = 0
+        else:
+            self.executing_mask.color = self.definition.heat_mask.as_tuple()
+            self.executing_mask.opacity = int(self.heat * self.definition.heat_mask.a)
+
+    def set_heat(self, heat: Optional[float]) -> None:
+        """
+        Show how hot the instruction is in a profile, using the color mask.
+
+        :param heat: From 0 (cold) to 1 (the hottest instruction). None to stop showing it.
+        """
+        self.heat = heat
+        self.hide_mask()
@@ -1,24 +1,228 @@
 """Common methods for programmable code blocks."""
 
-from dataclasses import dataclass
-from inspect import signature
-from typing import Set, Callable, Generator, Optional
+from dataclasses import dataclass, field
+from inspect import signature, Signature, Parameter
+from typing import (
+    Set,
+    Callable,
+    Generator,
+    Optional,
+    Dict,
+    Any,
+    Iterable,
+    get_type_hints,
+    List,
+)
 
 from .definition import Program
 
+# Kinds of parameter that can be given as positional arguments of an Instruction.
+_POSITIONAL_KINDS = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+
+
+@dataclass(frozen=True)
+class MethodInfo:
+    """
+    Information about a method that can be used in a program.
+
+    Calculated once when the method is added to a MethodRegistry.
+    """
+
+    method: Callable
+    # Name to show to the user when choosing this method.
+    display_name: str
+    signature: Optional[Signature]
+    # The type the method returns, or None if it isn't annotated or can't be determined.
+    return_type: Optional[Any]
+    # Number of positional arguments the method requires.
+    arity: int
+
+    @classmethod
+    def from_method(cls, method: Callable) -> "MethodInfo":
+        """Inspect the given method to get its information."""
+        try:
+            method_signature: Optional[Signature] = signature(method)
+        except (TypeError, ValueError):
+            # Some builtins don't provide a signature.
+            method_signature = None
+
+        try:
+            return_type = get_type_hints(method).get("return")
+        except Exception:
+            # Annotations may refer to names that can't be resolved.
+            return_type = None
+            if method_signature is not None:
+                annotation = method_signature.return_annotation
+                if annotation is not Signature.empty:
+                    return_type = annotation
+
+        arity = 0
+        if method_signature is not None:
+            arity = sum(
+                1
+                for parameter in method_signature.parameters.values()
+                if parameter.kind in _POSITIONAL_KINDS
+                and parameter.default is Parameter.empty
+            )
+
+        return cls(
+            method=method,
+            display_name=getattr(method, "__name__", repr(method)),
+            signature=method_signature,
+            return_type=return_type,
+            arity=arity,
+        )
+
+    @property
+    def returns_bool(self) -> bool:
+        """True if the method is annotated as returning a bool."""
+        return isinstance(self.return_type, type) and issubclass(self.return_type, bool)
+
+
+class MethodRegistry:
+    """
+    Registry of the methods available to a program, with their precomputed MethodInfo.
+
+    Methods are only inspected when they are first added, and the registry is indexed so that
+    methods can be looked up by name, by arity, or by whether they return a bool.
+    """
+
+    def __init__(self, methods: Iterable[Callable] = ()):
+        """
+        Create a new MethodRegistry.
+
+        :param methods: The methods to include in the registry.
+        """
+        self._infos: Dict[Callable, MethodInfo] = {}
+        self._by_name: Dict[str, Dict[Callable, MethodInfo]] = {}
+        self._by_arity: Dict[int, Dict[Callable, MethodInfo]] = {}
+        self._bool_methods: Dict[Callable, MethodInfo] = {}
+        self.update(methods)
+
+    def __len__(self) -> int:
+        """Number of methods in the registry."""
+        return len(self._infos)
+
+    def __contains__(self, method: Callable) -> bool:
+        """True if the method is in the registry."""
+        return method in self._infos
+
+    def __getitem__(self, method: Callable) -> MethodInfo:
+        """Get the information about the given method."""
+        return self._infos[method]
+
+    @property
+    def methods(self) -> List[MethodInfo]:
+        """Information about all methods in the registry."""
+        return list(self._infos.values())
+
+    @property
+    def bool_methods(self) -> List[MethodInfo]:
+        """Information about the methods that return a bool value."""
+        return list(self._bool_methods.values())
+
+    def by_arity(self, arity: int) -> List[MethodInfo]:
+        """Information about the methods that require the given number of arguments."""
+        return list(self._by_arity.get(arity, {}).values())
+
+    def by_name(self, name: str) -> Optional[MethodInfo]:
+        """
+        Information about the method with the given display name, or None if there isn't one.
+
+        If several methods have the same name, the last one to be added is returned.
+        """
+        infos = self._by_name.get(name)
+        return next(reversed(infos.values())) if infos else None
+
+    def all_by_name(self, name: str) -> List[MethodInfo]:
+        """Information about every method with the given display name."""
+        return list(self._by_name.get(name, {}).values())
+
+    def add(self, method: Callable) -> MethodInfo:
+        """Add a method to the registry. Does nothing if it is already registered."""
+        try:
+            return self._infos[method]
+        except KeyError:
+            pass
+
+        info = MethodInfo.from_method(method)
+        self._infos[method] = info
+        self._by_name.setdefault(info.display_name, {})[method] = info
+        self._by_arity.setdefault(info.arity, {})[method] = info
+        if info.returns_bool:
+            self._bool_methods[method] = info
+        return info
+
+    def remove(self, method: Callable) -> None:
+        """Remove a method from the registry. Does nothing if it isn't registered."""
+        info = self._infos.pop(method, None)
+        if info is None:
+            return
+
+        del self._by_name[info.display_name][method]
+        if not self._by_name[info.display_name]:
+            del self._by_name[info.display_name]
+        del self._by_arity[info.arity][method]
+        if not self._by_arity[info.arity]:
+            del self._by_arity[info.arity]
+        self._bool_methods.pop(method, None)
+
+    def update(self, methods: Iterable[Callable]) -> None:
+        """
+        Update the registry to contain exactly the given methods.
+
+        Only methods that have been added are inspected, and only methods that have been removed
+        are removed.
+        """
+        methods = set(methods)
+        for method in [method for method in self._infos if method not in methods]:
+            self.remove(method)
+        for method in methods:
+            self.add(method)
+
 
 @dataclass
 class Programmable:
     """
     Definition of a user-editable program.
 
-    The `methods` are the valid methods that the user can choose to use.
+    The `methods` are the valid methods that the user can choose to use. Replacing `methods`,
+    including with `|=` or `-=`, updates the `registry`. If the set is changed in place, such as
+    with `methods.add`, then `invalidate_registry` must be called.
 
     The `program` contains the actual program definition.
     """
 
     methods: Set[Callable]
     program: Optional[Program] = None
+    _registry: MethodRegistry = field(
+        default_factory=MethodRegistry, init=False, repr=False, compare=False
+    )
+    _is_registry_stale: bool = field(
+        default=True, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute, marking the registry as out of date if `methods` is replaced."""
+        super(Programmable, self).__setattr__(name, value)
+        if name == "methods":
+            super(Programmable, self).__setattr__("_is_registry_stale", True)
+
+    @property
+    def registry(self) -> MethodRegistry:
+        """
+        Registry of information about the `methods`.
+
+        The registry is only updated when it is accessed after `methods` has changed.
+        """
+        if self._is_registry_stale:
+            self._registry.update(self.methods)
+            self._is_registry_stale = False
+        return self._registry
+
+    def invalidate_registry(self) -> None:
+        """Update the registry when it is next accessed, after `methods` is changed in place."""
+        self._is_registry_stale = True
 
     @property
     def bool_methods(self) -> Generator[Callable, None, None]:
@@ -27,6 +231,5 @@ class Programmable:
 
         This is used to only present boolean methods to users for use in If/Elif/While statements.
         """
-        for method in self.methods:
-            if issubclass(signature(method).return_annotation, bool):
-                yield method
+        for info in self.registry.bool_methods:
+            yield info.method
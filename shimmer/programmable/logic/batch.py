@@ -0,0 +1,538 @@
+"""
+Runner of many Programs at once, such as the programs of every unit in a game.
+
+Programs with the same structure - the same types of instruction nested in the same way - are
+grouped together, and each group is compiled into a single Python function. The function runs
+each instruction for every program in the group in one loop before moving on to the next. Each
+condition is evaluated for every program in one pass, and its code block is then run for just
+the programs whose condition was true. The cost of walking the program, and of dispatching each
+instruction, is then paid once per group rather than once per program.
+
+The instructions of each program are run in the same order as `Program.run`, but instructions
+from different programs are interleaved. Methods must not rely on another program in the batch
+having run to completion first.
+
+If an instruction raises an exception, only the program it belongs to is stopped. The rest of its
+instructions are skipped, and the other programs in the batch carry on running.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from textwrap import indent
+from typing import Dict, List, Hashable, Sequence, cast, Any, Optional, Callable, Tuple
+
+from .cache import cache_mode
+from .definition import (
+    Program,
+    CodeBlock,
+    Instruction,
+    InstructionWithCodeBlock,
+    If,
+    Elif,
+    Else,
+    IfElifElse,
+)
+
+log = logging.getLogger(__name__)
+
+# Instruction types whose `execute` is implemented by the batch runner.
+_KNOWN_TYPES = (Instruction, InstructionWithCodeBlock, If, Elif, Else, IfElifElse)
+# Instruction types whose `execute` is exactly `Instruction.execute`.
+_PLAIN_TYPES = (Instruction, InstructionWithCodeBlock)
+# Instruction types whose `execute` is exactly `If.execute`.
+_IF_TYPES = (If, Elif, Else)
+
+
+def instruction_shape(instruction: Instruction) -> Hashable:
+    """
+    Get the structure of an instruction, which is the same for instructions that can be batched.
+
+    The methods, arguments and callbacks of the instructions may differ.
+    """
+    shape: List[object] = [type(instruction)]
+    if isinstance(instruction, InstructionWithCodeBlock):
+        shape.append(code_block_shape(instruction.code_block))
+    if isinstance(instruction, IfElifElse):
+        shape.append(tuple(instruction_shape(elif_) for elif_ in instruction.elifs))
+        shape.append(instruction_shape(instruction.else_))
+    return tuple(shape)
+
+
+def code_block_shape(code_block: CodeBlock) -> Hashable:
+    """Get the structure of a code block, which is the same for code blocks that can be batched."""
+    return tuple(instruction_shape(ins) for ins in code_block.instructions)
+
+
+def _run_callbacks(instructions: Sequence[Instruction], start: bool) -> None:
+    """Call the execute start, or complete, callback of each instruction that has one."""
+    for instruction in instructions:
+        callback = (
+            instruction.on_execute_start if start else instruction.on_execute_complete
+        )
+        if callback is not None:
+            callback()
+
+
+def run_code_blocks(code_blocks: Sequence[CodeBlock]) -> None:
+    """
+    Run code blocks that all have the same shape together, without compiling them.
+
+    Useful for code blocks that are only run once. See `compile_batch` for code blocks that
+    are run repeatedly.
+
+    :param code_blocks: Code blocks that all have the same `code_block_shape`.
+    """
+    if not code_blocks:
+        return
+
+    for index in range(len(code_blocks[0].instructions)):
+        run_instructions([code_block.instructions[index] for code_block in code_blocks])
+
+
+def run_instructions(instructions: Sequence[Instruction]) -> None:
+    """
+    Run instructions that all have the same shape together.
+
+    Equivalent to calling `execute` on each instruction.
+
+    :param instructions: Instructions that all have the same `instruction_shape`.
+    """
+    if not instructions:
+        return
+
+    template = instructions[0]
+    if type(template) not in _KNOWN_TYPES:
+        # Unknown subclasses may do anything in `execute`, so just call it.
+        for instruction in instructions:
+            instruction.execute()
+        return
+
+    for instruction in instructions:
+        if instruction.on_execute_start is not None:
+            instruction.on_execute_start()
+        instruction.result = instruction.call_method()
+        if instruction.on_execute_complete is not None:
+            instruction.on_execute_complete()
+
+    if not isinstance(template, If):
+        return
+
+    true_ifs = [cast(If, ins) for ins in instructions if ins.result]
+    _run_callbacks(true_ifs, start=True)
+    run_code_blocks([if_.code_block for if_ in true_ifs])
+    _run_callbacks(true_ifs, start=False)
+
+    if not isinstance(template, IfElifElse):
+        return
+
+    # The IfElifElse instructions that haven't found a true condition yet.
+    remaining = [cast(IfElifElse, ins) for ins in instructions if not ins.result]
+    for index in range(len(template.elifs)):
+        elifs = [if_elif_else.elifs[index] for if_elif_else in remaining]
+        run_instructions(elifs)
+        remaining = [
+            if_elif_else
+            for if_elif_else, elif_ in zip(remaining, elifs)
+            if not elif_.result
+        ]
+    run_instructions([if_elif_else.else_ for if_elif_else in remaining])
+
+
+def _skip() -> None:
+    """Method of the instructions that replace those of a failed code block."""
+    return None
+
+
+class CompiledBatch:
+    """
+    Code blocks that all have the same shape, compiled into a single Python function.
+
+    Call `run` to run every code block. `source` contains the generated code, for debugging.
+
+    The methods, arguments and callbacks of the instructions are read when the batch is
+    compiled, so the batch must be compiled again if any of them change.
+
+    If an instruction or callback raises an exception, the exception is stored in `errors`
+    under the index of its code block, and the rest of that code block is skipped, in this run
+    and every later run. The other code blocks are unaffected.
+    """
+
+    def __init__(self, code_blocks: Sequence[CodeBlock]):
+        """
+        Compile the given code blocks.
+
+        :param code_blocks: Code blocks that all have the same `code_block_shape`.
+        """
+        self.code_blocks = list(code_blocks)
+        compiler = _BatchCompiler()
+        body = compiler.compile_code_blocks(self.code_blocks, None)
+        self.source = "def run():\n" + indent(body, "    ")
+
+        exec(compile(self.source, "<batch>", "exec"), compiler.names)
+        self.run: Callable[[], None] = compiler.names["run"]
+        # Mapping of the index of each failed code block to the exception it raised.
+        self.errors: Dict[int, Exception] = compiler.errors
+
+    def __str__(self) -> str:
+        """The generated source code of the batch."""
+        return self.source
+
+
+def compile_batch(code_blocks: Sequence[CodeBlock]) -> CompiledBatch:
+    """
+    Compile code blocks that all have the same shape into a single Python function.
+
+    :param code_blocks: Code blocks that all have the same `code_block_shape`.
+    :return: The CompiledBatch. Call its `run` method to run every code block.
+    """
+    return CompiledBatch(code_blocks)
+
+
+class _BatchCompiler:
+    """
+    Generates the source code to run a batch of code blocks, and the names that it refers to.
+
+    Each instruction of the code blocks is compiled into a loop over a column of that
+    instruction from every code block. Within nested code blocks, the loop is only over the
+    indexes of the code blocks whose condition was true, held in a list named by `selection`.
+    A `selection` of None means every code block.
+
+    When a code block fails, its entry in every column is replaced by one that does nothing and
+    has a false result, so the generated code needs no extra checks for failed code blocks.
+    """
+
+    def __init__(self):
+        """Create a new _BatchCompiler."""
+        self.names: Dict[str, Any] = {"fail": self.fail}
+        self.errors: Dict[int, Exception] = {}
+        self._counter = 0
+        # Each column used by the generated code, with the entry to skip a failed code block.
+        self._columns: List[Tuple[List[Any], Any]] = []
+        self._skipped = Instruction(method=_skip)
+
+    def _new_name(self, prefix: str) -> str:
+        """Create a unique name for use in the generated code."""
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _bind_column(self, column: List[Any], skipped: Any) -> str:
+        """
+        Make a column available to the generated code with a unique name.
+
+        :param column: The entry of each code block, indexed by the code block's index.
+        :param skipped: The entry that replaces the entry of a code block that has failed.
+        """
+        name = self._new_name("col")
+        self.names[name] = column
+        self._columns.append((column, skipped))
+        return name
+
+    def fail(self, index: int, error: Exception) -> None:
+        """Record that the code block with the given index failed, and skip the rest of it."""
+        self.errors.setdefault(index, error)
+        for column, skipped in self._columns:
+            column[index] = skipped
+
+    def compile_code_blocks(
+        self, code_blocks: List[CodeBlock], selection: Optional[str]
+    ) -> str:
+        """Generate the code to run every instruction of the selected code blocks in order."""
+        if not code_blocks:
+            return "pass"
+        lines = [
+            self.compile_column(
+                [code_block.instructions[index] for code_block in code_blocks],
+                selection,
+            )
+            for index in range(len(code_blocks[0].instructions))
+        ]
+        return "\n".join(lines) if lines else "pass"
+
+    def compile_column(
+        self, column: List[Instruction], selection: Optional[str]
+    ) -> str:
+        """Generate the code to run the selected instructions, equivalent to `execute`."""
+        instruction_type = type(column[0])
+        if instruction_type in _PLAIN_TYPES:
+            return self._compile_execute(column, selection)
+        if instruction_type in _IF_TYPES:
+            return self._compile_if(column, selection)
+        if instruction_type is IfElifElse:
+            return self._compile_if_elif_else(cast(List[IfElifElse], column), selection)
+
+        # Unknown subclasses may do anything in `execute`, so just call it.
+        loop = self._loop(self._bind_column(column, self._skipped), "ins", selection)
+        return "\n".join([loop, *self._guard(["ins.execute()"])])
+
+    @staticmethod
+    def _loop(column: str, target: str, selection: Optional[str]) -> str:
+        """Generate the header of a loop over the index `i` and selected entries of a column."""
+        if selection is not None:
+            return f"for i in {selection}:\n    {target} = {column}[i]"
+        return f"for i, ({target}) in enumerate({column}):"
+
+    @staticmethod
+    def _guard(body: List[str]) -> List[str]:
+        """
+        Generate the body of a loop, which fails the code block `i` if it raises an exception.
+
+        The rest of the loop body is skipped for a code block that fails.
+        """
+        return [
+            "    try:",
+            *(indent(line, "        ") for line in body),
+            "    except Exception as e:",
+            "        fail(i, e)",
+            "        continue",
+        ]
+
+    def _compile_execute(
+        self,
+        column: List[Instruction],
+        selection: Optional[str],
+        true: Optional[str] = None,
+        false: Optional[str] = None,
+    ) -> str:
+        """
+        Generate the code equivalent to `Instruction.execute` for the selected instructions.
+
+        :param true: Name of a list to collect the indexes of instructions with a true result.
+        :param false: Name of a list to collect the indexes of instructions with a false result.
+        """
+        is_simple = all(
+            ins.on_execute_start is None
+            and ins.on_execute_complete is None
+            and cache_mode(ins.method) is None
+            for ins in column
+        )
+        if is_simple:
+            # The method and arguments are unpacked once, when compiling.
+            entries = [(ins, ins.method, ins.args) for ins in column]
+            skipped = (self._skipped, _skip, ())
+            loop = self._loop(
+                self._bind_column(entries, skipped), "ins, m, a", selection
+            )
+            body = self._guard(["ins.result = r = m(*a)"])
+        else:
+            loop = self._loop(
+                self._bind_column(column, self._skipped), "ins", selection
+            )
+            body = self._guard(
+                [
+                    "if ins.on_execute_start is not None:",
+                    "    ins.on_execute_start()",
+                    "ins.result = r = ins.call_method()",
+                    "if ins.on_execute_complete is not None:",
+                    "    ins.on_execute_complete()",
+                ]
+            )
+
+        if true is not None and false is not None:
+            body += [
+                "    if r:",
+                f"        {true}.append(i)",
+                "    else:",
+                f"        {false}.append(i)",
+            ]
+        elif true is not None:
+            body += ["    if r:", f"        {true}.append(i)"]
+
+        lines = [f"{name} = []" for name in (true, false) if name is not None]
+        lines.append(loop)
+        lines.extend(body)
+        return "\n".join(lines)
+
+    def _compile_if(
+        self,
+        column: List[Instruction],
+        selection: Optional[str],
+        false: Optional[str] = None,
+    ) -> str:
+        """
+        Generate the code equivalent to `If.execute` for the selected instructions.
+
+        :param false: Name of a list to collect the indexes of instructions with a false result.
+        """
+        ifs = cast(List[If], column)
+        true = self._new_name("true")
+        lines = [self._compile_execute(column, selection, true, false)]
+
+        body = []
+        has_callbacks = any(
+            if_.on_execute_start is not None or if_.on_execute_complete is not None
+            for if_ in ifs
+        )
+        callback_loop = ""
+        if has_callbacks:
+            callback_loop = self._loop(
+                self._bind_column(list(ifs), self._skipped), "ins", true
+            )
+            body += [callback_loop]
+            body += self._guard(
+                ["if ins.on_execute_start is not None:", "    ins.on_execute_start()"]
+            )
+        body.append(self.compile_code_blocks([if_.code_block for if_ in ifs], true))
+        if has_callbacks:
+            body += [callback_loop]
+            body += self._guard(
+                [
+                    "if ins.on_execute_complete is not None:",
+                    "    ins.on_execute_complete()",
+                ]
+            )
+
+        lines.append(f"if {true}:\n" + indent("\n".join(body), "    "))
+        return "\n".join(lines)
+
+    def _compile_if_elif_else(
+        self, column: List[IfElifElse], selection: Optional[str]
+    ) -> str:
+        """Generate the code equivalent to `IfElifElse.execute` for the selected instructions."""
+        # Indexes of the instructions that haven't found a true condition yet.
+        remaining = self._new_name("remaining")
+        lines = [self._compile_if(list(column), selection, remaining)]
+        for index in range(len(column[0].elifs)):
+            elifs: List[Instruction] = [ins.elifs[index] for ins in column]
+            next_remaining = self._new_name("remaining")
+            code = self._compile_if(elifs, remaining, next_remaining)
+            lines.append(f"{next_remaining} = []")
+            lines.append(f"if {remaining}:\n" + indent(code, "    "))
+            remaining = next_remaining
+
+        else_code = self.compile_column([ins.else_ for ins in column], remaining)
+        lines.append(f"if {remaining}:\n" + indent(else_code, "    "))
+        return "\n".join(lines)
+
+
+class BatchRunner:
+    """
+    Runs many Programs together, grouping programs with the same structure.
+
+    Programs are grouped when they are added, and each group is compiled when it is next run.
+    If a program is changed, including the methods, arguments or callbacks of its instructions,
+    then it must be added again, or `regroup` called, so that it is grouped and compiled
+    correctly.
+
+    If an instruction of a program raises an exception, that program stops and the exception is
+    logged and available from `error_of`. The other programs, including those in the same group,
+    carry on running. The failed program isn't run again until it is added again.
+
+    The throughput of the most recent run is available as `units_per_second`.
+    """
+
+    def __init__(self):
+        """Create a new, empty, BatchRunner."""
+        self._groups: Dict[Hashable, List[Program]] = defaultdict(list)
+        self._shapes: Dict[int, Hashable] = {}
+        # Mapping of shape to the programs that were compiled, and the compiled batch.
+        self._compiled: Dict[Hashable, Tuple[List[Program], CompiledBatch]] = {}
+        # Mapping of the id of each failed program to the exception it raised.
+        self._errors: Dict[int, Exception] = {}
+
+        self.units_run: int = 0
+        self.run_time: float = 0
+
+    def __len__(self) -> int:
+        """Number of programs in the batch."""
+        return len(self._shapes)
+
+    @property
+    def group_count(self) -> int:
+        """Number of distinct program structures in the batch."""
+        return len(self._groups)
+
+    @property
+    def units_per_second(self) -> float:
+        """Number of programs run per second during the most recent run."""
+        if self.run_time == 0:
+            return 0.0
+        return self.units_run / self.run_time
+
+    @property
+    def failed_count(self) -> int:
+        """Number of programs in the batch that have been stopped by an exception."""
+        return len(self._errors)
+
+    def error_of(self, program: Program) -> Optional[Exception]:
+        """The exception that stopped the given program, or None if it hasn't failed."""
+        return self._errors.get(id(program))
+
+    def has_failed(self, program: Program) -> bool:
+        """True if the given program was stopped by an instruction raising an exception."""
+        return id(program) in self._errors
+
+    def add(self, program: Program) -> None:
+        """
+        Add a program to be run, or update the grouping of a program that has changed.
+
+        A program that has failed is run again from the start once it is added again.
+        """
+        self.remove(program)
+        shape = code_block_shape(program.code_block)
+        self._shapes[id(program)] = shape
+        self._groups[shape].append(program)
+        self._compiled.pop(shape, None)
+
+    def remove(self, program: Program) -> None:
+        """Stop running the given program. Does nothing if it isn't in the batch."""
+        shape = self._shapes.pop(id(program), None)
+        if shape is None:
+            return
+
+        self._errors.pop(id(program), None)
+        self._compiled.pop(shape, None)
+        # Programs are compared by identity, as different programs may be equal.
+        group = [other for other in self._groups[shape] if other is not program]
+        self._groups[shape] = group
+        if not group:
+            del self._groups[shape]
+
+    def regroup(self) -> None:
+        """Group all the programs again, to account for programs that have been changed."""
+        programs = [program for group in self._groups.values() for program in group]
+        errors = self._errors.copy()
+        self.clear()
+        for program in programs:
+            self.add(program)
+        # Failed programs stay stopped until they are added again.
+        self._errors.update(errors)
+
+    def clear(self) -> None:
+        """Remove all programs from the batch."""
+        self._groups.clear()
+        self._shapes.clear()
+        self._compiled.clear()
+        self._errors.clear()
+
+    def _record_errors(self, programs: List[Program], batch: CompiledBatch) -> None:
+        """Record and log the programs of the batch that have newly failed."""
+        for index, error in batch.errors.items():
+            program = programs[index]
+            if not self.has_failed(program):
+                self._errors[id(program)] = error
+                log.error(
+                    f"Program {program.name!r} failed and was stopped.", exc_info=error
+                )
+
+    def run(self) -> None:
+        """Run every program in the batch once, apart from programs that have failed."""
+        start = time.perf_counter()
+        units_run = 0
+        for shape, programs in self._groups.items():
+            try:
+                programs, batch = self._compiled[shape]
+            except KeyError:
+                programs = [
+                    program for program in programs if not self.has_failed(program)
+                ]
+                batch = compile_batch([program.code_block for program in programs])
+                self._compiled[shape] = programs, batch
+
+            units_run += len(programs) - len(batch.errors)
+            batch.run()
+            if len(batch.errors) > 0:
+                self._record_errors(programs, batch)
+
+        self.run_time = time.perf_counter() - start
+        self.units_run = units_run
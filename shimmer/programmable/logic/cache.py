@@ -0,0 +1,225 @@
+"""
+Caching of the results of methods used by programs.
+
+Methods that are pure queries, such as `is_enemy_near(range)`, are often called by several
+conditions of a program, and by the programs of many units, in the same tick. Marking them with
+`tick_cached` means they are only called once per tick for each set of arguments, with the
+result re-used until the next tick of the pyglet clock. Methods marked with `pure` only depend
+on their arguments, so their results are re-used until they are invalidated, up to a limited
+number of results for each method.
+
+For example:
+
+    class Unit:
+        @tick_cached
+        def is_enemy_near(self, distance: int) -> bool:
+            ...
+"""
+
+import weakref
+from collections import OrderedDict
+from enum import Enum
+from functools import partial
+from typing import Callable, Dict, Tuple, Any, Optional, TypeVar, Hashable, cast
+
+import pyglet
+
+_Callable = TypeVar("_Callable", bound=Callable)
+
+# Name of the attribute used to mark methods as cacheable.
+_CACHE_MODE_ATTRIBUTE = "_shimmer_cache_mode"
+
+
+class CacheMode(Enum):
+    """How long the result of a method may be cached for."""
+
+    # Results are re-used until the cache is invalidated.
+    pure = "pure"
+    # Results are re-used until the next tick of the pyglet clock.
+    tick = "tick"
+
+
+def pure(method: _Callable) -> _Callable:
+    """Mark a method as only depending on its arguments, so its results can be re-used."""
+    setattr(method, _CACHE_MODE_ATTRIBUTE, CacheMode.pure)
+    return method
+
+
+def tick_cached(method: _Callable) -> _Callable:
+    """Mark a method as returning the same result for the same arguments within a tick."""
+    setattr(method, _CACHE_MODE_ATTRIBUTE, CacheMode.tick)
+    return method
+
+
+def cache_mode(method: Callable) -> Optional[CacheMode]:
+    """Get how the method has been marked as cacheable, or None if it hasn't been."""
+    # Bound methods look up attributes on the underlying function.
+    mode = getattr(method, _CACHE_MODE_ATTRIBUTE, None)
+    return mode if isinstance(mode, CacheMode) else None
+
+
+class _InstructionCache:
+    """
+    Cache of the results of methods marked with `pure` or `tick_cached`, keyed by arguments.
+
+    Results of `tick_cached` methods are discarded at the start of the next tick of the pyglet
+    clock. Calls with unhashable arguments are not cached.
+
+    Results of `pure` methods are kept until they are invalidated, with two limits so that a
+    long running game doesn't keep growing the cache:
+      - Only the `max_pure_results` most recently used results of each method are kept.
+      - Results of bound methods are only weakly linked to the object the method is bound to,
+        and are discarded when that object is garbage collected. Objects that can't be weakly
+        referenced, and plain functions, keep their results until they are invalidated.
+
+    The global singleton `InstructionCache` is used by `Instruction.execute`.
+    """
+
+    def __init__(self, max_pure_results: int = 128):
+        """
+        Create a new InstructionCache.
+
+        Typically to be used as a singleton.
+
+        :param max_pure_results: Maximum number of results to keep for each `pure` method.
+        """
+        self.max_pure_results = max_pure_results
+        self._tick_results: Dict[Callable, Dict[Tuple, Any]] = {}
+        # Results of pure methods, keyed by the id of the object a method is bound to (or None
+        # for functions) and then by the function.
+        self._pure_results: Dict[
+            Optional[int], Dict[Callable, "OrderedDict[Tuple, Any]"]
+        ] = {}
+        # Weak references to the objects the pure methods are bound to, by their id.
+        self._owners: Dict[int, weakref.ref] = {}
+        self._is_clear_scheduled: bool = False
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        """Number of results in the cache."""
+        return sum(len(results) for results in self._tick_results.values()) + sum(
+            len(results)
+            for method_results in self._pure_results.values()
+            for results in method_results.values()
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of cacheable calls that re-used a cached result."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def call(self, method: Callable, args: Tuple) -> Any:
+        """
+        Call the method with the given arguments, re-using a cached result if possible.
+
+        :param method: The method to call.
+        :param args: Positional arguments to call the method with.
+        :return: The result of the method.
+        """
+        mode = cache_mode(method)
+        if mode is None or not isinstance(args, Hashable):
+            return method(*args)
+
+        results: Dict[Tuple, Any]
+        if mode is CacheMode.tick:
+            results = self._tick_results.setdefault(method, {})
+        else:
+            owner_id, function = self._pure_key(method, track_owner=True)
+            results = self._pure_results.setdefault(owner_id, {}).setdefault(
+                function, OrderedDict()
+            )
+
+        try:
+            result = results[args]
+        except KeyError:
+            pass
+        except TypeError:
+            # Tuples containing unhashable objects fail to hash.
+            return method(*args)
+        else:
+            self.hits += 1
+            if mode is CacheMode.pure:
+                cast("OrderedDict[Tuple, Any]", results).move_to_end(args)
+            return result
+
+        self.misses += 1
+        result = results[args] = method(*args)
+        if mode is CacheMode.tick and not self._is_clear_scheduled:
+            self._is_clear_scheduled = True
+            pyglet.clock.schedule_once(self._end_tick, 0)
+        elif mode is CacheMode.pure and len(results) > self.max_pure_results:
+            cast("OrderedDict[Tuple, Any]", results).popitem(last=False)
+        return result
+
+    def invalidate(self, method: Optional[Callable] = None) -> None:
+        """
+        Discard cached results.
+
+        :param method: Only discard the results of this method. If None, discard all results.
+        """
+        if method is None:
+            self._tick_results.clear()
+            self._pure_results.clear()
+            self._owners.clear()
+            return
+
+        self._tick_results.pop(method, None)
+        owner_id, function = self._pure_key(method, track_owner=False)
+        self._pure_results.get(owner_id, {}).pop(function, None)
+
+    def end_tick(self) -> None:
+        """Discard the results of `tick_cached` methods. Called automatically each tick."""
+        self._tick_results.clear()
+        if self._is_clear_scheduled:
+            self._is_clear_scheduled = False
+            pyglet.clock.unschedule(self._end_tick)
+
+    def _end_tick(self, dt: float) -> None:
+        """Discard the results of `tick_cached` methods at the start of the next tick."""
+        self.end_tick()
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counters."""
+        self.hits = self.misses = 0
+
+    def _pure_key(
+        self, method: Callable, track_owner: bool
+    ) -> Tuple[Optional[int], Callable]:
+        """
+        Get the key of the results of a pure method in `_pure_results`.
+
+        :param method: The method to get the key of.
+        :param track_owner: If True, start tracking the object the method is bound to, so its
+            results are discarded when it is garbage collected.
+        :return: Tuple of (id of the object the method is bound to, the unbound function), or
+            (None, method) if the method isn't bound to an object that can be weakly referenced.
+        """
+        owner = getattr(method, "__self__", None)
+        function = getattr(method, "__func__", None)
+        if owner is None or function is None:
+            return None, method
+
+        owner_id = id(owner)
+        if owner_id not in self._owners:
+            if not track_owner:
+                return None, method
+            try:
+                self._owners[owner_id] = weakref.ref(
+                    owner, partial(self._forget_owner, owner_id)
+                )
+            except TypeError:
+                # Objects without a __weakref__ slot can't be tracked.
+                return None, method
+        return owner_id, function
+
+    def _forget_owner(self, owner_id: int, _: weakref.ref) -> None:
+        """Discard the results of the methods of an object that has been garbage collected."""
+        self._owners.pop(owner_id, None)
+        self._pure_results.pop(owner_id, None)
+
+
+# The global instruction cache.
+InstructionCache = _InstructionCache()
@@ -0,0 +1,175 @@
+"""
+Compiler of Programs into single Python functions.
+
+`Program.run` walks the tree of instructions, checking for callbacks and unpacking arguments for
+every instruction each time it is run. Compiling a Program generates the equivalent Python code
+once, so running it is just a single function call with the same effects:
+  - The `result` of every instruction that is run is recorded.
+  - The `on_execute_start` and `on_execute_complete` callbacks are called at the same points.
+  - Results of methods marked as cacheable are re-used from the `InstructionCache`.
+
+Callbacks are only included for instructions that have them when the Program is compiled, so
+Programs without an attached display run with no instrumentation overhead. The Program must
+be compiled again if its instructions change or displays are attached or removed.
+"""
+
+from textwrap import indent
+from typing import Dict, Any, List, Callable, Type, Tuple, cast
+
+from .cache import cache_mode
+from .definition import (
+    Program,
+    CodeBlock,
+    Instruction,
+    InstructionWithCodeBlock,
+    If,
+    Elif,
+    Else,
+    IfElifElse,
+)
+
+# Instruction types whose `execute` is exactly `Instruction.execute`.
+_PLAIN_TYPES = (Instruction, InstructionWithCodeBlock)
+# Instruction types whose `execute` is exactly `If.execute`.
+_IF_TYPES = (If, Elif, Else)
+
+
+class CompiledProgram:
+    """
+    A Program compiled into a single Python function.
+
+    Call `run` to run the program. `source` contains the generated code, for debugging.
+    """
+
+    def __init__(self, program: Program):
+        """
+        Compile the given Program.
+
+        :param program: The Program to compile.
+        """
+        self.program = program
+        compiler = _Compiler()
+        body = compiler.compile_code_block(program.code_block)
+        self.source = "def run():\n" + indent(body, "    ")
+
+        exec(compile(self.source, f"<program {program.name}>", "exec"), compiler.names)
+        self.run: Callable[[], None] = compiler.names["run"]
+
+    def __str__(self) -> str:
+        """The generated source code of the program."""
+        return self.source
+
+
+def compile_program(program: Program) -> CompiledProgram:
+    """
+    Compile a Program into a single Python function.
+
+    :param program: The Program to compile.
+    :return: The CompiledProgram. Call its `run` method to run the program.
+    """
+    return CompiledProgram(program)
+
+
+class _Compiler:
+    """Generates the source code of a Program, and the names that the code refers to."""
+
+    def __init__(self):
+        """Create a new _Compiler."""
+        self.names: Dict[str, Any] = {}
+        self._counter = 0
+
+    def _new_name(self, prefix: str) -> str:
+        """Create a unique name for use in the generated code."""
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _bind(self, prefix: str, value: Any) -> str:
+        """Make the value available to the generated code with a unique name."""
+        name = self._new_name(prefix)
+        self.names[name] = value
+        return name
+
+    def compile_code_block(self, code_block: CodeBlock) -> str:
+        """Generate the code to run every instruction in the code block in order."""
+        lines = [self.compile_instruction(ins) for ins in code_block.instructions]
+        return "\n".join(lines) if lines else "pass"
+
+    def compile_instruction(self, instruction: Instruction) -> str:
+        """Generate the code to run the instruction, equivalent to `instruction.execute()`."""
+        instruction_type: Type[Instruction] = type(instruction)
+        if instruction_type in _PLAIN_TYPES:
+            return self._compile_execute(instruction)[0]
+        if instruction_type in _IF_TYPES:
+            return self._compile_if(cast(If, instruction))[0]
+        if instruction_type is IfElifElse:
+            return self._compile_if_elif_else(cast(IfElifElse, instruction))
+
+        # Unknown subclasses may do anything in `execute`, so just call it.
+        return f"{self._bind('ins', instruction)}.execute()"
+
+    def _compile_callbacks(self, instruction: Instruction) -> List[str]:
+        """Generate the lines calling the start and complete callbacks, if they are set."""
+        callbacks = []
+        for callback in (instruction.on_execute_start, instruction.on_execute_complete):
+            if callback is not None:
+                callbacks.append(f"{self._bind('cb', callback)}()")
+            else:
+                callbacks.append("")
+        return callbacks
+
+    def _compile_execute(self, instruction: Instruction) -> Tuple[str, str]:
+        """
+        Generate the code equivalent to `Instruction.execute`.
+
+        :return: Tuple of (code, name of the local variable holding the result).
+        """
+        ins = self._bind("ins", instruction)
+        result = self._new_name("result")
+        if cache_mode(instruction.method) is None:
+            method = self._bind("method", instruction.method)
+            args = ", ".join(self._bind("arg", arg) for arg in instruction.args)
+            call = f"{method}({args})"
+        else:
+            call = f"{ins}.call_method()"
+
+        start, complete = self._compile_callbacks(instruction)
+        lines = [
+            start,
+            f"{result} = {call}",
+            f"{ins}.result = {result}",
+            complete,
+        ]
+        return "\n".join(line for line in lines if line), result
+
+    def _compile_if(self, instruction: If) -> Tuple[str, str]:
+        """
+        Generate the code equivalent to `If.execute`.
+
+        :return: Tuple of (code, name of the local variable holding the result of the condition).
+        """
+        condition, result = self._compile_execute(instruction)
+        start, complete = self._compile_callbacks(instruction)
+        body = "\n".join(
+            line
+            for line in (
+                start,
+                self.compile_code_block(instruction.code_block),
+                complete,
+            )
+            if line
+        )
+        return f"{condition}\nif {result}:\n{indent(body, '    ')}", result
+
+    def _compile_if_elif_else(self, instruction: IfElifElse) -> str:
+        """Generate the code equivalent to `IfElifElse.execute`."""
+        code, matched = self._compile_if(instruction)
+        lines = [code]
+        for elif_ in instruction.elifs:
+            elif_code, elif_result = self._compile_if(elif_)
+            lines.append(
+                f"if not {matched}:\n{indent(elif_code, '    ')}\n"
+                f"    {matched} = {elif_result}"
+            )
+        else_code = self.compile_instruction(instruction.else_)
+        lines.append(f"if not {matched}:\n{indent(else_code, '    ')}")
+        return "\n".join(lines)
@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from textwrap import indent
 from typing import List, Callable, Any, Optional, Tuple
 
+from .cache import InstructionCache
 
 NOT_YET_RUN = object()
 
@@ -28,10 +29,19 @@ class Instruction:
         """Run the instruction."""
         if self.on_execute_start is not None:
             self.on_execute_start()
-        self.result = self.method(*self.args)
+        self.result = self.call_method()
         if self.on_execute_complete is not None:
             self.on_execute_complete()
 
+    def call_method(self) -> Any:
+        """
+        Call the method of this instruction with its arguments, and return the result.
+
+        Results of methods marked with `pure` or `tick_cached` are re-used from the
+        `InstructionCache` where possible.
+        """
+        return InstructionCache.call(self.method, self.args)
+
     def method_str(self) -> str:
         """Return the string representation of the instruction."""
         result_str = f" -> {self.result}" if self.result is not NOT_YET_RUN else ""
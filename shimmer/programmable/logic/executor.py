@@ -0,0 +1,226 @@
+"""
+Executor that runs Programs a few instructions at a time, in between rendering frames.
+
+`Program.run` runs every instruction in a single call, so a long program, or one that calls
+slow methods, stops the game from rendering until it completes. A ProgramExecutor instead runs
+the program as a generator, advancing it by a limited number of instructions, or for a limited
+time, on each tick of the pyglet clock.
+
+Instructions are run with the same semantics as `Program.run`. The execute complete callback of
+the current instruction is only called once the next step starts, so displays of the program
+show which instruction is being run between frames.
+"""
+
+import logging
+import time
+from typing import Optional, Callable, Generator
+
+import pyglet
+
+from shimmer.log_utils import log_exceptions
+from .definition import (
+    Program,
+    CodeBlock,
+    Instruction,
+    InstructionWithCodeBlock,
+    If,
+    IfElifElse,
+    Elif,
+    Else,
+)
+
+log = logging.getLogger(__name__)
+
+# Instruction types whose `execute` is implemented by `instruction_steps`.
+_KNOWN_TYPES = (Instruction, InstructionWithCodeBlock, If, Elif, Else, IfElifElse)
+
+# Generator that runs a program, yielding after each instruction is run.
+_Steps = Generator[Instruction, None, None]
+
+
+def _run_callback(callback: Optional[Callable]) -> None:
+    """Call the callback if there is one."""
+    if callback is not None:
+        callback()
+
+
+def code_block_steps(code_block: CodeBlock) -> _Steps:
+    """Run every instruction in the code block, yielding after each instruction is run."""
+    for instruction in code_block.instructions:
+        yield from instruction_steps(instruction)
+
+
+def instruction_steps(instruction: Instruction) -> _Steps:
+    """Run the instruction, yielding after it and any instructions it contains are run."""
+    if type(instruction) not in _KNOWN_TYPES:
+        # Unknown subclasses may do anything in `execute`, so run it as a single step.
+        instruction.execute()
+        yield instruction
+        return
+
+    # Complete callbacks are called even if the program is stopped part way through, so that
+    # displays of the program don't show instructions as still running.
+    _run_callback(instruction.on_execute_start)
+    instruction.result = instruction.call_method()
+    try:
+        yield instruction
+    finally:
+        _run_callback(instruction.on_execute_complete)
+
+    if isinstance(instruction, If) and instruction.result:
+        _run_callback(instruction.on_execute_start)
+        try:
+            yield from code_block_steps(instruction.code_block)
+        finally:
+            _run_callback(instruction.on_execute_complete)
+
+    if isinstance(instruction, IfElifElse) and not instruction.result:
+        for elif_ in instruction.elifs:
+            yield from instruction_steps(elif_)
+            if elif_.result:
+                break
+        else:
+            yield from instruction_steps(instruction.else_)
+
+
+class ProgramExecutor:
+    """
+    Runs a Program over multiple frames, so the game keeps rendering while it runs.
+
+    On each tick of the pyglet clock the program is advanced by up to `instructions_per_frame`
+    instructions, and for up to `time_budget` seconds. At least one instruction is run per tick.
+
+    The program can be paused, resumed, and advanced one instruction at a time with `step`.
+
+    If an instruction raises an exception, the program stops and the exception is stored as
+    `error`. `on_complete` is not called, and the program isn't run again until it is restarted
+    with `start`.
+    """
+
+    def __init__(
+        self,
+        program: Program,
+        instructions_per_frame: Optional[int] = None,
+        time_budget: Optional[float] = 0.005,
+        on_complete: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Create a new ProgramExecutor.
+
+        :param program: The Program to run.
+        :param instructions_per_frame: Maximum number of instructions to run each tick.
+            If None then there is no limit.
+        :param time_budget: Maximum number of seconds to spend running instructions each tick.
+            If None then there is no limit.
+        :param on_complete: Called once the program has finished running.
+        """
+        self.program = program
+        self.instructions_per_frame = instructions_per_frame
+        self.time_budget = time_budget
+        self.on_complete = on_complete
+
+        self._steps: Optional[_Steps] = None
+        self._is_scheduled: bool = False
+        # The instruction that was run most recently, whose complete callback is pending.
+        self.current_instruction: Optional[Instruction] = None
+        # The exception raised by the program, if it failed.
+        self.error: Optional[Exception] = None
+
+    @property
+    def is_running(self) -> bool:
+        """True if the program has been started and hasn't finished yet, even if paused."""
+        return self._steps is not None
+
+    @property
+    def is_paused(self) -> bool:
+        """True if the program is part way through running, but isn't being advanced."""
+        return self.is_running and not self._is_scheduled
+
+    @property
+    def has_failed(self) -> bool:
+        """True if the program was stopped by an instruction raising an exception."""
+        return self.error is not None
+
+    def start(self) -> None:
+        """Start running the program from the beginning, stopping it first if needed."""
+        self.stop()
+        self.error = None
+        self._steps = code_block_steps(self.program.code_block)
+        self.resume()
+
+    def pause(self) -> None:
+        """Stop advancing the program until it is resumed or stepped."""
+        if self._is_scheduled:
+            self._is_scheduled = False
+            pyglet.clock.unschedule(self._on_tick)
+
+    def resume(self) -> None:
+        """Continue advancing the program on each tick of the pyglet clock."""
+        if self.is_running and not self._is_scheduled:
+            self._is_scheduled = True
+            pyglet.clock.schedule(self._on_tick)
+
+    def step(self) -> bool:
+        """
+        Run the next instruction of the program, starting the program if it isn't running.
+
+        Typically used while the program is paused, to step through it one instruction at a time.
+        Exceptions raised by the instruction are re-raised, after stopping the program.
+
+        :return: True if an instruction was run, or False if the program has finished or failed.
+        """
+        if self.has_failed:
+            return False
+        if self._steps is None:
+            self._steps = code_block_steps(self.program.code_block)
+
+        try:
+            self.current_instruction = next(self._steps)
+        except StopIteration:
+            self._finish()
+            return False
+        except Exception as exc:
+            self.stop()
+            self.error = exc
+            raise
+        return True
+
+    def stop(self) -> None:
+        """Stop running the program. It will start from the beginning if started again."""
+        self.pause()
+        if self._steps is not None:
+            self._steps.close()
+            self._steps = None
+        self.current_instruction = None
+
+    def run_to_completion(self) -> None:
+        """Run all the remaining instructions of the program immediately."""
+        while self.step():
+            pass
+
+    @log_exceptions(log)
+    def _on_tick(self, dt: float) -> None:
+        """Advance the program within the limits for a single frame."""
+        deadline = (
+            time.perf_counter() + self.time_budget
+            if self.time_budget is not None
+            else None
+        )
+        count = 0
+        while self.step():
+            count += 1
+            if (
+                self.instructions_per_frame is not None
+                and count >= self.instructions_per_frame
+            ):
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+    def _finish(self) -> None:
+        """Clean up once the program has finished and report that it completed."""
+        self.pause()
+        self._steps = None
+        self.current_instruction = None
+        if self.on_complete is not None:
+            self.on_complete()
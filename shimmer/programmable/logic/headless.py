@@ -0,0 +1,431 @@
+"""
+Runner of Programs in worker processes, for headless simulations.
+
+Used to run large numbers of programs outside of the game, such as for AI training or balance
+tuning, using every CPU core. Programs are encoded with `serialization` and sent to a pool of
+worker processes, along with the methods they use, run there with a time limit and a limit on
+the number of instructions, and the results of their instructions are sent back to the parent
+process.
+
+The methods of programs must be picklable, so must be module level functions, or methods of
+picklable objects, and the arguments of their instructions must be JSON serializable. Any
+changes the methods make to those objects are made to the copies in the worker process, so the
+results of the instructions are the output of the program.
+"""
+
+import itertools
+import multiprocessing
+import pickle
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing.queues import Queue
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from . import serialization
+from .base import MethodRegistry
+from .cache import InstructionCache
+from .definition import Program, Else
+from .executor import code_block_steps
+from .profiler import iter_instructions
+
+# Longest time the parent waits for a result before checking for programs that are stuck.
+_POLL_INTERVAL = 0.05
+
+# A program encoded with `serialization`, and the pickled list of methods it may use.
+_Payload = Tuple[str, bytes]
+
+# Queue that a worker process puts the key of each program on as it starts running it.
+_started_queue: Optional["Queue[int]"] = None
+
+
+@dataclass
+class ProgramResult:
+    """The outcome of running a program in a worker process."""
+
+    name: str
+    # True if the program ran to completion without error.
+    completed: bool = False
+    # Number of instructions that were run, including conditions.
+    instructions_run: int = 0
+    # Time taken to run the program in the worker, in seconds.
+    duration: float = 0
+    # Results of the instructions that were run, keyed by the index of the instruction in the
+    # order of `iter_instructions`. Results that can't be pickled are replaced by their repr.
+    results: Dict[int, Any] = field(default_factory=dict)
+    # Description of the error raised by the program, if any.
+    error: Optional[str] = None
+    timed_out: bool = False
+    hit_instruction_limit: bool = False
+
+
+@dataclass
+class RunSummary:
+    """Summary of the results of running many programs."""
+
+    total: int = 0
+    completed: int = 0
+    timed_out: int = 0
+    hit_instruction_limit: int = 0
+    errors: int = 0
+    instructions_run: int = 0
+    # Total time taken by all the programs in the workers, in seconds.
+    duration: float = 0
+
+    @classmethod
+    def from_results(cls, results: Iterable[ProgramResult]) -> "RunSummary":
+        """Summarise the given results."""
+        summary = cls()
+        for result in results:
+            summary.total += 1
+            summary.completed += result.completed
+            summary.timed_out += result.timed_out
+            summary.hit_instruction_limit += result.hit_instruction_limit
+            summary.errors += result.error is not None
+            summary.instructions_run += result.instructions_run
+            summary.duration += result.duration
+        return summary
+
+
+def _picklable(value: Any) -> Any:
+    """Return the value if it can be pickled, otherwise its repr."""
+    try:
+        pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return repr(value)
+    return value
+
+
+def _describe(exc: BaseException) -> str:
+    """Describe an error raised by a program."""
+    return f"{exc.__class__.__name__}: {exc}"
+
+
+def run_program(
+    program: Program, timeout: Optional[float], max_instructions: Optional[int]
+) -> ProgramResult:
+    """
+    Run a program within the given limits.
+
+    The limits are checked between instructions, so a single instruction that never returns
+    can't be stopped by this function. `HeadlessRunner` stops the worker process instead.
+
+    Cached results of `pure` and `tick_cached` methods are discarded before and after the program
+    is run, as the pyglet clock doesn't tick in worker processes, so results would otherwise be
+    shared between the programs run by a worker.
+
+    :param program: The program to run.
+    :param timeout: Maximum number of seconds to run the program for. None for no limit.
+    :param max_instructions: Maximum number of instructions to run. None for no limit.
+    :return: The outcome of running the program.
+    """
+    result = ProgramResult(program.name)
+    start = time.perf_counter()
+    deadline = start + timeout if timeout is not None else None
+    indexes = {
+        id(instruction): index
+        for index, (instruction, _) in enumerate(iter_instructions(program.code_block))
+    }
+
+    InstructionCache.invalidate()
+    steps = code_block_steps(program.code_block)
+    try:
+        for instruction in steps:
+            result.instructions_run += 1
+            result.results[indexes[id(instruction)]] = instruction.result
+            if deadline is not None and time.perf_counter() >= deadline:
+                result.timed_out = True
+                break
+            if (
+                max_instructions is not None
+                and result.instructions_run >= max_instructions
+            ):
+                result.hit_instruction_limit = True
+                break
+        else:
+            result.completed = True
+    except Exception as exc:
+        result.error = _describe(exc)
+    finally:
+        steps.close()
+        InstructionCache.invalidate()
+
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _init_worker(started_queue: "Queue[int]") -> None:
+    """Initialise a worker process with the queue to report programs being started on."""
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _run_encoded_program(
+    payload: _Payload,
+    key: int,
+    timeout: Optional[float],
+    max_instructions: Optional[int],
+) -> ProgramResult:
+    """Run an encoded program in a worker process, returning a result that can be pickled."""
+    if _started_queue is not None:
+        _started_queue.put(key)
+    encoded, pickled_methods = payload
+    registry = MethodRegistry(pickle.loads(pickled_methods))
+    program = serialization.loads(encoded, registry)
+    result = run_program(program, timeout, max_instructions)
+    result.results = {
+        index: _picklable(value) for index, value in result.results.items()
+    }
+    return result
+
+
+class HeadlessRunner:
+    """
+    Runs programs in a pool of worker processes, with limits on how long each can run for.
+
+    Programs that are still running `grace` seconds after their timeout, such as those stuck in
+    a method that never returns, are reported as timed out, and the worker processes are
+    replaced so that the remaining programs can still be run.
+
+    Can be used as a context manager, which shuts down the worker processes on exit.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = 1.0,
+        max_instructions: Optional[int] = 100000,
+        grace: float = 1.0,
+    ):
+        """
+        Create a new HeadlessRunner. Worker processes are started when first needed.
+
+        :param max_workers: Number of worker processes. Defaults to the number of CPUs.
+        :param timeout: Maximum number of seconds to run each program for. None for no limit.
+        :param max_instructions: Maximum number of instructions to run in each program.
+            None for no limit.
+        :param grace: Number of seconds to wait for a program after its timeout, before its
+            worker process is stopped.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_instructions = max_instructions
+        self.grace = grace
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_queue: Optional["Queue[int]"] = None
+        # Programs that have been submitted, but not yet started, by their unique key.
+        self._submitted: Dict[int, Future] = {}
+        self._keys = itertools.count()
+
+    def __enter__(self) -> "HeadlessRunner":
+        """Use the runner as a context manager."""
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Shut down the worker processes."""
+        self.shutdown()
+
+    def run(
+        self, programs: Iterable[Program], registry: Optional[MethodRegistry] = None
+    ) -> List[ProgramResult]:
+        """
+        Run every program, in parallel, and wait for them all to finish.
+
+        :param programs: The programs to run.
+        :param registry: The registry of the methods the programs may use. If None, a registry
+            of the methods used by each program is created for it.
+        :return: The results of each program, in the same order as the programs.
+        """
+        programs = list(programs)
+        outcomes: List[Optional[ProgramResult]] = [None] * len(programs)
+
+        # Encode the programs here, so that programs that can't be sent to the workers are
+        # reported individually rather than breaking the whole run.
+        shared_methods = None if registry is None else self._pickle_methods(registry)
+        payloads: Dict[int, _Payload] = {}
+        for index, program in enumerate(programs):
+            try:
+                payloads[index] = self._encode(program, registry, shared_methods)
+            except Exception as exc:
+                outcomes[index] = ProgramResult(program.name, error=_describe(exc))
+
+        pending = {self._submit(payload): index for index, payload in payloads.items()}
+        # Time each program was started by a worker.
+        started: Dict[Future, float] = {}
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=self._time_until_deadline(pending, started),
+                return_when=FIRST_COMPLETED,
+            )
+            is_broken = False
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    outcomes[index] = future.result()
+                except Exception as exc:
+                    # A worker that exits, or is killed, breaks the pool and fails every
+                    # program it was given, so the program at fault can't be identified.
+                    is_broken = is_broken or isinstance(exc, BrokenProcessPool)
+                    outcomes[index] = ProgramResult(
+                        programs[index].name, error=_describe(exc)
+                    )
+
+            now = time.perf_counter()
+            late = self._find_late(pending, started, now)
+            for future in late:
+                index = pending.pop(future)
+                outcomes[index] = ProgramResult(
+                    programs[index].name,
+                    timed_out=True,
+                    duration=now - started[future],
+                )
+
+            if late or is_broken:
+                # The workers can't be trusted to finish the programs they were given, so they
+                # are replaced, and the programs that haven't finished are run again.
+                self._stop_workers()
+                pending = {
+                    self._submit(payloads[index]): index for index in pending.values()
+                }
+                started = {}
+
+            self._read_started(started)
+
+        self._submitted.clear()
+        return [outcome for outcome in outcomes if outcome is not None]
+
+    def run_and_summarise(
+        self, programs: Iterable[Program], registry: Optional[MethodRegistry] = None
+    ) -> RunSummary:
+        """Run every program, and summarise the results. See `run`."""
+        return RunSummary.from_results(self.run(programs, registry))
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._close_started_queue()
+
+    def _find_late(
+        self, pending: Dict[Future, int], started: Dict[Future, float], now: float
+    ) -> List[Future]:
+        """Find the programs still running `grace` seconds after their timeout, if there is one."""
+        if self.timeout is None:
+            return []
+
+        stuck_after = self.timeout + self.grace
+        return [
+            future
+            for future in pending
+            if future in started and now >= started[future] + stuck_after
+        ]
+
+    def _time_until_deadline(
+        self, pending: Dict[Future, int], started: Dict[Future, float]
+    ) -> Optional[float]:
+        """Seconds to wait for a result before checking for stuck programs. None to wait forever."""
+        if self.timeout is None:
+            return None
+
+        deadlines = [started[future] for future in pending if future in started]
+        if not deadlines:
+            return _POLL_INTERVAL
+        remaining = min(deadlines) + self.timeout + self.grace - time.perf_counter()
+        return min(max(remaining, 0), _POLL_INTERVAL)
+
+    @staticmethod
+    def _pickle_methods(registry: MethodRegistry) -> bytes:
+        """Pickle the methods in the registry, to be sent to the workers."""
+        methods = [info.method for info in registry.methods]
+        return pickle.dumps(methods, pickle.HIGHEST_PROTOCOL)
+
+    def _encode(
+        self,
+        program: Program,
+        registry: Optional[MethodRegistry],
+        pickled_methods: Optional[bytes],
+    ) -> _Payload:
+        """Encode a program, and the methods it may use, to be sent to a worker."""
+        if registry is None or pickled_methods is None:
+            registry = MethodRegistry(
+                instruction.method
+                for instruction, _ in iter_instructions(program.code_block)
+                if not isinstance(instruction, Else)
+            )
+            pickled_methods = self._pickle_methods(registry)
+        return serialization.dumps(program, registry), pickled_methods
+
+    def _submit(self, payload: _Payload) -> Future:
+        """Send an encoded program to be run by a worker, starting the workers if needed."""
+        if self._executor is None:
+            self._started_queue = multiprocessing.Queue()
+            self._executor = ProcessPoolExecutor(
+                self.max_workers,
+                initializer=_init_worker,
+                initargs=(self._started_queue,),
+            )
+        key = next(self._keys)
+        future = self._executor.submit(
+            _run_encoded_program, payload, key, self.timeout, self.max_instructions
+        )
+        self._submitted[key] = future
+        return future
+
+    def _read_started(self, started: Dict[Future, float]) -> None:
+        """
+        Record the time that the workers started running programs.
+
+        Futures can't be used for this, as they are marked as running when they are queued for
+        a worker, which may still be running another program.
+
+        :param started: Time each program was started, to be updated.
+        """
+        if self._started_queue is None:
+            return
+
+        now = time.perf_counter()
+        while True:
+            try:
+                key = self._started_queue.get_nowait()
+            except queue.Empty:
+                return
+            future = self._submitted.pop(key, None)
+            if future is not None:
+                started[future] = now
+
+    def _close_started_queue(self) -> None:
+        """Close the queue that the workers report programs being started on."""
+        if self._started_queue is not None:
+            self._started_queue.close()
+            self._started_queue = None
+        self._submitted.clear()
+
+    def _stop_workers(self) -> None:
+        """Stop the worker processes immediately, even if they are running programs."""
+        if self._executor is None:
+            return
+
+        # ProcessPoolExecutor has no public way to stop a worker that is running a program.
+        for process in list(self._executor._processes.values()):
+            process.terminate()
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        self._close_started_queue()
+
+
+def apply_results(program: Program, result: ProgramResult) -> None:
+    """
+    Set the results of the instructions of a program to those from running it headless.
+
+    Useful for displaying the outcome of a program that was run in a worker process.
+
+    :param program: The program that was run.
+    :param result: The result of running the program.
+    """
+    for index, (instruction, _) in enumerate(iter_instructions(program.code_block)):
+        if index in result.results:
+            instruction.result = result.results[index]
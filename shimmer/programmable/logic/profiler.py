@@ -0,0 +1,203 @@
+"""
+Profiler of the instructions of Programs.
+
+While a ProgramProfiler is enabled, every instruction in its code block, including those nested
+in If/Elif/Else blocks, records how many times it has been run, how long it took, and what
+results it returned. This can be shown as a text report, or as a heat map over the display of
+the program using `CodeBlockDisplay.show_profile`.
+
+The profiler replaces the `execute` method of each instruction with a timed version while it is
+enabled, and restores it when disabled, so instructions run at full speed while not profiling.
+Only programs run by `Program.run`, `CodeBlock.run` or `Instruction.execute` are profiled.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Union, Iterator, Optional, Hashable
+
+from .definition import (
+    Program,
+    CodeBlock,
+    Instruction,
+    InstructionWithCodeBlock,
+    IfElifElse,
+)
+
+
+@dataclass
+class InstructionStats:
+    """Profile of a single instruction."""
+
+    # Number of times the instruction has been run.
+    calls: int = 0
+    # Total time spent running the instruction, including any nested code blocks, in seconds.
+    cumulative_time: float = 0
+    # Total time spent running the instruction, excluding any nested instructions, in seconds.
+    self_time: float = 0
+    # Number of times each result has been returned by the instruction.
+    results: Counter = field(default_factory=Counter)
+
+    def record_result(self, result: Any) -> None:
+        """Count a result of the instruction. Unhashable results are counted by their repr."""
+        key: Hashable = result if isinstance(result, Hashable) else repr(result)
+        try:
+            self.results[key] += 1
+        except TypeError:
+            # Containers of unhashable objects are Hashable, but fail to hash.
+            self.results[repr(result)] += 1
+
+
+def iter_instructions(
+    code_block: CodeBlock, depth: int = 0
+) -> Iterator[Tuple[Instruction, int]]:
+    """
+    Iterate over every instruction in the code block, including nested instructions.
+
+    :return: Iterator of (instruction, depth of nesting) in the order they appear in the code.
+    """
+    for instruction in code_block.instructions:
+        yield instruction, depth
+        if isinstance(instruction, InstructionWithCodeBlock):
+            yield from iter_instructions(instruction.code_block, depth + 1)
+        if isinstance(instruction, IfElifElse):
+            for elif_ in instruction.elifs:
+                yield elif_, depth
+                yield from iter_instructions(elif_.code_block, depth + 1)
+            yield instruction.else_, depth
+            yield from iter_instructions(instruction.else_.code_block, depth + 1)
+
+
+class ProgramProfiler:
+    """
+    Records how long each instruction of a program takes to run.
+
+    Can be used as a context manager, which enables the profiler for the duration of the block.
+
+    Instructions added to the program while the profiler is enabled are not profiled until it is
+    enabled again.
+    """
+
+    def __init__(self, program: Union[Program, CodeBlock]):
+        """
+        Create a new ProgramProfiler. It starts off disabled.
+
+        :param program: The Program, or CodeBlock, to profile.
+        """
+        self.code_block = (
+            program.code_block if isinstance(program, Program) else program
+        )
+        # Stats of each instruction, keyed by the id of the instruction.
+        self._stats: Dict[int, Tuple[Instruction, InstructionStats]] = {}
+        # Time spent in nested instructions of each instruction that is currently running.
+        self._child_times: List[float] = []
+        self._profiled: List[Instruction] = []
+
+    def __enter__(self) -> "ProgramProfiler":
+        """Enable the profiler."""
+        self.enable()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Disable the profiler."""
+        self.disable()
+
+    @property
+    def is_enabled(self) -> bool:
+        """True if instructions are being profiled."""
+        return bool(self._profiled)
+
+    def enable(self) -> None:
+        """Start profiling every instruction in the code block."""
+        self.disable()
+        for instruction, _ in iter_instructions(self.code_block):
+            self._profile(instruction)
+
+    def disable(self) -> None:
+        """Stop profiling. The recorded stats are kept."""
+        for instruction in self._profiled:
+            # Remove the instance attribute so the class method is used again.
+            instruction.__dict__.pop("execute", None)
+        self._profiled = []
+
+    def reset(self) -> None:
+        """Discard all the recorded stats."""
+        is_enabled = self.is_enabled
+        self.disable()
+        self._stats.clear()
+        if is_enabled:
+            self.enable()
+
+    def stats_for(self, instruction: Instruction) -> InstructionStats:
+        """Get the stats of the given instruction. Empty if it hasn't been run while profiling."""
+        try:
+            return self._stats[id(instruction)][1]
+        except KeyError:
+            return InstructionStats()
+
+    def heat(self, instruction: Instruction) -> Optional[float]:
+        """
+        Get how hot the instruction is, relative to the instruction with the most self time.
+
+        :return: From 0 (no time spent) to 1 (the hottest instruction), or None if the
+            instruction hasn't been run while profiling.
+        """
+        try:
+            stats = self._stats[id(instruction)][1]
+        except KeyError:
+            return None
+        if stats.calls == 0:
+            return None
+
+        hottest = max(other.self_time for _, other in self._stats.values())
+        if hottest <= 0:
+            return 0.0
+        return stats.self_time / hottest
+
+    def report(self) -> str:
+        """
+        Create a text report of the stats of each instruction, hottest first.
+
+        Times are in milliseconds.
+        """
+        rows = sorted(
+            self._stats.values(), key=lambda item: item[1].self_time, reverse=True
+        )
+        lines = [
+            f"{'calls':>8} {'total':>10} {'self':>10}  {'results':<20}  instruction"
+        ]
+        for instruction, stats in rows:
+            results = ", ".join(
+                f"{result}: {count}" for result, count in stats.results.most_common(3)
+            )
+            lines.append(
+                f"{stats.calls:>8} {stats.cumulative_time * 1000:>10.3f} "
+                f"{stats.self_time * 1000:>10.3f}  {results:<20}  {instruction.method_str()}"
+            )
+        return "\n".join(lines)
+
+    def _profile(self, instruction: Instruction) -> None:
+        """Replace the execute method of the instruction with a version that records stats."""
+        _, stats = self._stats.setdefault(
+            id(instruction), (instruction, InstructionStats())
+        )
+        execute = instruction.execute
+        child_times = self._child_times
+
+        def profiled_execute() -> None:
+            child_times.append(0.0)
+            start = time.perf_counter()
+            try:
+                execute()
+            finally:
+                elapsed = time.perf_counter() - start
+                stats.calls += 1
+                stats.cumulative_time += elapsed
+                stats.self_time += elapsed - child_times.pop()
+                stats.record_result(instruction.result)
+                if child_times:
+                    child_times[-1] += elapsed
+
+        # Set as an instance attribute, which takes priority over the method of the class.
+        instruction.__dict__["execute"] = profiled_execute
+        self._profiled.append(instruction)
@@ -0,0 +1,271 @@
+"""
+Compact, versioned, JSON encoding of Programs.
+
+Methods are referenced by their name in a MethodRegistry rather than being pickled, so programs
+can be saved, and loaded again with the methods of a different object, such as another unit.
+Each method used must be the only one in the registry with its name.
+
+Arguments of instructions must be JSON serializable. Tuples within the arguments are encoded as
+`{"__tuple__": [...]}`, so that they are decoded as tuples rather than lists.
+
+Each instruction is encoded as a JSON list, with a tag identifying its type:
+  - ["i", method, args]
+  - ["if", method, args, code_block]
+  - ["elif", method, args, code_block]
+  - ["else", code_block]
+  - ["ifelse", method, args, code_block, [elif, ...], else]
+  - where `code_block` is a list of encoded instructions.
+
+A program is written as a header line, `{"version": 1, "name": "..."}`, followed by one line for
+each instruction of the top level code block. This means that large programs can be decoded
+one instruction at a time as they are read. The instructions of nested code blocks are only
+decoded when they are first accessed.
+"""
+
+import io
+import json
+from typing import Any, List, Iterator, IO, Iterable, Dict, Callable, Optional, cast
+
+from .base import MethodRegistry
+from .definition import (
+    Program,
+    CodeBlock,
+    Instruction,
+    If,
+    Elif,
+    Else,
+    IfElifElse,
+)
+
+FORMAT_VERSION = 1
+
+_Encoded = List[Any]
+
+_TUPLE_KEY = "__tuple__"
+
+
+def _method_name(method: Callable, registry: MethodRegistry) -> str:
+    """Get the registered name of the method, which must identify it in the registry."""
+    if method not in registry:
+        raise ValueError(
+            f"{method!r} is not in the method registry, so can't be encoded."
+        )
+    name = registry[method].display_name
+    if len(registry.all_by_name(name)) > 1:
+        raise ValueError(
+            f"More than one method is registered with the name {name!r}, "
+            f"so {method!r} can't be encoded."
+        )
+    return name
+
+
+def _encode_arg(arg: Any) -> Any:
+    """Encode an argument of an instruction, so that tuples within it can be decoded as tuples."""
+    if isinstance(arg, tuple):
+        return {_TUPLE_KEY: [_encode_arg(item) for item in arg]}
+    if isinstance(arg, list):
+        return [_encode_arg(item) for item in arg]
+    if isinstance(arg, dict):
+        if set(arg) == {_TUPLE_KEY}:
+            raise ValueError(f"Argument {arg!r} would be decoded as a tuple.")
+        return {key: _encode_arg(value) for key, value in arg.items()}
+    return arg
+
+
+def _decode_arg(arg: Any) -> Any:
+    """Decode an argument encoded with `_encode_arg`."""
+    if isinstance(arg, list):
+        return [_decode_arg(item) for item in arg]
+    if isinstance(arg, dict):
+        if set(arg) == {_TUPLE_KEY}:
+            return tuple(_decode_arg(item) for item in arg[_TUPLE_KEY])
+        return {key: _decode_arg(value) for key, value in arg.items()}
+    return arg
+
+
+def encode_instruction(instruction: Instruction, registry: MethodRegistry) -> _Encoded:
+    """
+    Encode an instruction, and any instructions it contains, as a JSON serializable list.
+
+    :param instruction: The instruction to encode.
+    :param registry: The registry of the methods the instruction may use.
+    """
+    if isinstance(instruction, Else):
+        return ["else", encode_code_block(instruction.code_block, registry)]
+
+    method = _method_name(instruction.method, registry)
+    args = [_encode_arg(arg) for arg in instruction.args]
+    if isinstance(instruction, IfElifElse):
+        return [
+            "ifelse",
+            method,
+            args,
+            encode_code_block(instruction.code_block, registry),
+            [encode_instruction(elif_, registry) for elif_ in instruction.elifs],
+            encode_instruction(instruction.else_, registry),
+        ]
+    if isinstance(instruction, (If, Elif)):
+        tag = "elif" if isinstance(instruction, Elif) else "if"
+        return [tag, method, args, encode_code_block(instruction.code_block, registry)]
+    if type(instruction) is not Instruction:
+        raise ValueError(f"Instructions of type {type(instruction)} can't be encoded.")
+    return ["i", method, args]
+
+
+def encode_code_block(code_block: CodeBlock, registry: MethodRegistry) -> _Encoded:
+    """Encode every instruction in the code block as a JSON serializable list."""
+    return [encode_instruction(ins, registry) for ins in code_block.instructions]
+
+
+class _LazyCodeBlock(CodeBlock):
+    """A CodeBlock whose instructions are only decoded when they are first accessed."""
+
+    def __init__(self, encoded: _Encoded, registry: MethodRegistry):
+        """
+        Create a code block from its encoded instructions.
+
+        :param encoded: The encoded instructions of the code block.
+        :param registry: The registry to look up methods in.
+        """
+        # The dataclass __init__ isn't called, as it would set the instructions.
+        self._encoded: Optional[_Encoded] = encoded
+        self._registry = registry
+        self._instructions: List[Instruction] = []
+
+    @property
+    def instructions(self) -> List[Instruction]:
+        """The instructions of the code block, decoded on first access."""
+        if self._encoded is not None:
+            self._instructions = [
+                decode_instruction(ins, self._registry) for ins in self._encoded
+            ]
+            self._encoded = None
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions: List[Instruction]) -> None:
+        """Replace the instructions of the code block."""
+        self._encoded = None
+        self._instructions = instructions
+
+    @property
+    def is_decoded(self) -> bool:
+        """True if the instructions have been decoded."""
+        return self._encoded is None
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the instructions with any other CodeBlock, decoding them if needed."""
+        if not isinstance(other, CodeBlock):
+            return NotImplemented
+        return self.instructions == other.instructions
+
+
+def decode_instruction(encoded: _Encoded, registry: MethodRegistry) -> Instruction:
+    """
+    Decode an instruction that was encoded with `encode_instruction`.
+
+    Nested code blocks are only decoded when they are first accessed.
+
+    :param encoded: The encoded instruction.
+    :param registry: The registry to look up methods in by name.
+    """
+    tag = encoded[0]
+    if tag == "else":
+        return Else(code_block=_LazyCodeBlock(encoded[1], registry))
+
+    name, args = encoded[1], tuple(_decode_arg(arg) for arg in encoded[2])
+    info = registry.by_name(name)
+    if info is None:
+        raise ValueError(f"Method {name!r} is not in the method registry.")
+
+    if tag == "i":
+        return Instruction(method=info.method, args=args)
+    if tag == "if":
+        return If(info.method, args, code_block=_LazyCodeBlock(encoded[3], registry))
+    if tag == "elif":
+        return Elif(info.method, args, code_block=_LazyCodeBlock(encoded[3], registry))
+    if tag == "ifelse":
+        elifs = [decode_instruction(elif_, registry) for elif_ in encoded[4]]
+        else_ = decode_instruction(encoded[5], registry)
+        if not isinstance(else_, Else) or not all(
+            isinstance(elif_, Elif) for elif_ in elifs
+        ):
+            raise ValueError(f"Invalid If/Elif/Else instruction {encoded!r}.")
+        return IfElifElse(
+            info.method,
+            args,
+            code_block=_LazyCodeBlock(encoded[3], registry),
+            elifs=cast(List[Elif], elifs),
+            else_=else_,
+        )
+    raise ValueError(f"Unknown instruction type {tag!r}.")
+
+
+def dump(program: Program, fp: IO[str], registry: MethodRegistry) -> None:
+    """
+    Write a program to a text file.
+
+    :param program: The program to write.
+    :param fp: The file to write to.
+    :param registry: The registry of the methods the program may use.
+    """
+    header: Dict[str, Any] = {"version": FORMAT_VERSION, "name": program.name}
+    fp.write(json.dumps(header, separators=(",", ":")) + "\n")
+    for instruction in program.code_block.instructions:
+        encoded = encode_instruction(instruction, registry)
+        fp.write(json.dumps(encoded, separators=(",", ":")) + "\n")
+
+
+def dumps(program: Program, registry: MethodRegistry) -> str:
+    """Encode a program as a string. See `dump`."""
+    buffer = io.StringIO()
+    dump(program, buffer, registry)
+    return buffer.getvalue()
+
+
+def iter_load(lines: Iterable[str], registry: MethodRegistry) -> Iterator[Instruction]:
+    """
+    Decode the top level instructions of a program one at a time, as they are read.
+
+    :param lines: Lines of the encoded program, such as an open file.
+    :param registry: The registry to look up methods in by name.
+    :return: Iterator of the decoded instructions, after the header has been checked.
+    """
+    lines = iter(lines)
+    _read_header(next(lines, ""))
+    for line in lines:
+        if line.strip():
+            yield decode_instruction(json.loads(line), registry)
+
+
+def load(lines: Iterable[str], registry: MethodRegistry) -> Program:
+    """
+    Decode a program written by `dump`.
+
+    :param lines: Lines of the encoded program, such as an open file.
+    :param registry: The registry to look up methods in by name.
+    """
+    lines = iter(lines)
+    header = _read_header(next(lines, ""))
+    instructions = [
+        decode_instruction(json.loads(line), registry) for line in lines if line.strip()
+    ]
+    return Program(header["name"], CodeBlock(instructions=instructions))
+
+
+def loads(data: str, registry: MethodRegistry) -> Program:
+    """Decode a program from a string. See `load`."""
+    return load(data.splitlines(), registry)
+
+
+def _read_header(line: str) -> Dict[str, Any]:
+    """Decode and validate the header of an encoded program."""
+    if not line.strip():
+        raise ValueError("Encoded program is empty.")
+
+    header = json.loads(line)
+    if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported program format {header!r}, expected version {FORMAT_VERSION}."
+        )
+    return header
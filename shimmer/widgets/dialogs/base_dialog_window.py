@@ -1,12 +1,13 @@
 """Base definition and creation of dialog windows."""
 
 import logging
-from typing import Optional
+from dataclasses import replace
+from typing import Optional, Callable, Any
 
+import pyglet
 from pyglet.window import key
 
 from shimmer.components.box_layout import BoxRow
-from shimmer.components.mouse_box import MouseClickEventCallable
 from shimmer.keyboard import KeyboardHandler, KeyboardHandlerDefinition
 from shimmer.widgets.button import ButtonDefinition, Button
 from shimmer.widgets.question_definition import QuestionDefinition
@@ -15,54 +16,91 @@ from shimmer.widgets.window import Window, WindowDefinition
 log = logging.getLogger(__name__)
 
 
-def create_base_dialog_window(definition: QuestionDefinition) -> Window:
+class DialogWindow(Window):
     """
-    Create a window containing a multiple choice question.
+    A Window asking the user a question.
 
-    If the question allows multiple answers, a submit button will be shown that closes the window.
-    The submit button does not call any additional callback as each answer choice will have called
-    back already.
+    If the question requires confirmation, "Ok" and "Cancel" buttons are shown.
 
-    If confirmation is not required, the window will close as soon as an option is chosen.
-    Otherwise, "Ok" and "Cancel" buttons will be added.
-
-    :param definition: Definition of the question.
+    The question can be replaced with `set_question`, which allows a dialog to be re-used to ask
+    another question of the same shape rather than building a new one. See `DialogPool`.
     """
-    on_close: Optional[MouseClickEventCallable]
-
-    def cancel_on_close() -> MouseClickEventCallable:
-        """Wrapper around the mouse event callback on close that ignores all the arguments."""
-
-        def inner(*_, **__):
-            if definition.on_cancel is not None:
-                definition.on_cancel()
 
-        return inner
+    def __init__(self, question: QuestionDefinition):
+        """
+        Create a DialogWindow.
 
-    if definition.on_cancel is not None:
-        on_close = cancel_on_close()
-    else:
-        on_close = None
+        :param question: Definition of the question.
+        """
+        self.question = question
 
-    window_definition = WindowDefinition(title=definition.text, on_close=on_close,)
-    window = Window(window_definition)
+        # Called once this window has been removed from the scene.
+        self.on_removed: Optional[Callable[["DialogWindow"], None]] = None
 
-    if definition.confirmation_required:
-        # Create "Ok" and "Cancel" buttons
-        # The "Ok" button calls the `on_confirm` callback with the current selection.
-        # The Cancel button is equivalent to clicking the "X".
-        def on_ok(*_, **__):
-            if definition.on_confirm is not None:
-                definition.on_confirm()
-            window.close()
-
-        def on_cancel(*_, **__):
-            # We set the window to call the cancel callback on close above,
-            # so just close the window here.
-            window.close()
+        super(DialogWindow, self).__init__(
+            WindowDefinition(title=question.text, on_close=self._cancel)
+        )
 
-        ok_button = Button(ButtonDefinition(text="Ok", on_press=on_ok))
-        cancel_button = Button(ButtonDefinition(text="Cancel", on_press=on_cancel))
+        if question.confirmation_required:
+            self._add_confirmation_buttons()
+
+    def set_question(self, question: QuestionDefinition) -> None:
+        """
+        Ask a different question using this window.
+
+        The window is moved back to the origin, as if it had just been created.
+
+        :param question: Definition of the new question. Must match the existing question in
+            whether confirmation is required.
+        """
+        if question.confirmation_required != self.question.confirmation_required:
+            raise ValueError(
+                "Cannot change whether a dialog requires confirmation. "
+                f"Existing: {self.question}, new: {question}."
+            )
+
+        self.question = question
+        self.position = 0, 0
+        if self.definition.title != question.text:
+            self.definition = replace(self.definition, title=question.text)
+            self.update_all()
+            # The title may have changed size, so the window may need to as well.
+            self.on_child_size_changed()
+
+    def on_exit(self):
+        """Called when the window leaves the scene. Calls `on_removed` if it is not re-added."""
+        super(DialogWindow, self).on_exit()
+        if self.on_removed is not None:
+            # Wait until the next tick because the window may only be exiting to be re-added,
+            # for example when it changes z value on being focused.
+            pyglet.clock.schedule_once(self._check_removed, 0)
+
+    def _check_removed(self, dt: float) -> None:
+        """Call `on_removed` if this window is no longer in the scene."""
+        if self.on_removed is not None and not self.is_running:
+            self.on_removed(self)
+
+    def _cancel(self, *_: Any, **__: Any) -> None:
+        """Called when the window is closed. Cancels the current question."""
+        if self.question.on_cancel is not None:
+            self.question.on_cancel()
+
+    def _confirm(self, *_: Any, **__: Any) -> None:
+        """Called when the "Ok" button is pressed. Confirms the current question."""
+        if self.question.on_confirm is not None:
+            self.question.on_confirm()
+        self.close()
+
+    def _close_from_button(self, *_: Any, **__: Any) -> None:
+        """Called when the "Cancel" button is pressed. Equivalent to clicking the "X"."""
+        self.close()
+
+    def _add_confirmation_buttons(self) -> None:
+        """Add "Ok" and "Cancel" buttons to the window."""
+        ok_button = Button(ButtonDefinition(text="Ok", on_press=self._confirm))
+        cancel_button = Button(
+            ButtonDefinition(text="Cancel", on_press=self._close_from_button)
+        )
         confirmation_buttons = BoxRow(boxes=(ok_button, cancel_button))
 
         # Add keyboard handler to make Enter/Esc hit Ok/Cancel respectively.
@@ -82,6 +120,17 @@ def create_base_dialog_window(definition: QuestionDefinition) -> Window:
 
         confirmation_buttons.add(keyboard_handler)
 
-        window.add_child_to_body(confirmation_buttons)
+        self.add_child_to_body(confirmation_buttons)
 
-    return window
+
+def create_base_dialog_window(definition: QuestionDefinition) -> DialogWindow:
+    """
+    Create a window asking the given question.
+
+    If confirmation is required, "Ok" and "Cancel" buttons will be added. "Ok" calls the
+    `on_confirm` callback and closes the window. "Cancel" and the close button call the
+    `on_cancel` callback.
+
+    :param definition: Definition of the question.
+    """
+    return DialogWindow(definition)
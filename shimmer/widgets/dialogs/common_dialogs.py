@@ -7,10 +7,8 @@ For example, an "Are you sure" dialog with yes/no answers.
 
 from typing import Optional
 
-from shimmer.widgets.dialogs.multiple_choice import (
-    create_multiple_choice_question_dialog,
-    MultipleChoiceButtonsDefinition,
-)
+from shimmer.widgets.dialogs.multiple_choice import MultipleChoiceButtonsDefinition
+from shimmer.widgets.dialogs.pool import DialogPool
 from shimmer.widgets.question_definition import (
     MultipleChoiceQuestionDefinition,
     NoArgumentsCallback,
@@ -28,11 +26,13 @@ def create_are_you_sure_dialog(
 
     Using the `close` button is equivalent to a `No` answer.
 
+    The dialog is taken from the global `DialogPool`, so asking repeatedly is cheap.
+
     :param on_answer: Method to call when a selection is made.
     :param on_cancel: Method to call if the X button is used instead of answering the question.
     :return: Window containing Yes/No buttons.
     """
-    return create_multiple_choice_question_dialog(
+    return DialogPool.multiple_choice_dialog(
         MultipleChoiceButtonsDefinition(
             question=MultipleChoiceQuestionDefinition(
                 text="Are you sure?",
@@ -7,15 +7,18 @@ For example, this can be used to create:
 """
 
 from dataclasses import replace
-from typing import Any, Optional
+from typing import Any, Optional, Hashable
 
 from shimmer.widgets.multiple_choice_buttons import (
     MultipleChoiceButtonsDefinition,
     MultipleChoiceButtons,
 )
-from shimmer.widgets.question_definition import OnQuestionChangeCallback
+from shimmer.widgets.question_definition import (
+    OnQuestionChangeCallback,
+    MultipleChoiceQuestionDefinition,
+)
 from shimmer.widgets.window import Window
-from .base_dialog_window import create_base_dialog_window
+from .base_dialog_window import DialogWindow
 
 
 def callback_with_answer_and_close_window(
@@ -33,9 +36,70 @@ def callback_with_answer_and_close_window(
     return inner
 
 
+class MultipleChoiceDialog(DialogWindow):
+    """
+    A window containing a multiple choice question.
+
+    If confirmation is not required, the window will close as soon as an option is chosen.
+    Otherwise, "Ok" and "Cancel" buttons will be added.
+    """
+
+    def __init__(self, definition: MultipleChoiceButtonsDefinition):
+        """
+        Create a MultipleChoiceDialog.
+
+        :param definition: Definition of the question and the buttons to show the choices.
+        """
+        super(MultipleChoiceDialog, self).__init__(definition.question)
+        self.buttons = MultipleChoiceButtons(
+            replace(definition, question=self._answer_question(definition.question))
+        )
+        self.add_child_to_body(self.buttons)
+
+    @staticmethod
+    def shape_key(definition: MultipleChoiceButtonsDefinition) -> Hashable:
+        """
+        Key identifying dialogs that can be re-used to show the given definition.
+
+        Dialogs with the same key differ only by the question text and callbacks.
+        """
+        question = definition.question
+        return (
+            definition.button,
+            definition.layout,
+            definition.width,
+            definition.height,
+            definition.background_color,
+            tuple(question.choices),
+            question.allow_multiple,
+            question.confirmation_required,
+        )
+
+    def set_definition(self, definition: MultipleChoiceButtonsDefinition) -> None:
+        """
+        Ask a different question using this dialog.
+
+        :param definition: The new definition. Must have the same `shape_key` as the definition
+            this dialog was created with.
+        """
+        self.set_question(definition.question)
+        self.buttons.set_question(self._answer_question(definition.question))
+
+    def _answer_question(
+        self, question: MultipleChoiceQuestionDefinition
+    ) -> MultipleChoiceQuestionDefinition:
+        """Make the question close this window when answered, if confirmation is not required."""
+        if question.confirmation_required:
+            return question
+        return replace(
+            question,
+            on_change=callback_with_answer_and_close_window(question.on_change, self),
+        )
+
+
 def create_multiple_choice_question_dialog(
     definition: MultipleChoiceButtonsDefinition,
-) -> Window:
+) -> MultipleChoiceDialog:
     """
     Create a window containing a multiple choice question.
 
@@ -48,21 +112,4 @@ def create_multiple_choice_question_dialog(
 
     :param definition: Definition of the question.
     """
-    window = create_base_dialog_window(definition.question)
-
-    if not definition.question.confirmation_required:
-        # If confirmation is not required then close the window when any answer is selected.
-        definition = replace(
-            definition,
-            question=replace(
-                definition.question,
-                on_change=callback_with_answer_and_close_window(
-                    definition.question.on_change, window
-                ),
-            ),
-        )
-
-    buttons = MultipleChoiceButtons(definition)
-    window.add_child_to_body(buttons)
-
-    return window
+    return MultipleChoiceDialog(definition)
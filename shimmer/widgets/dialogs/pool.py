@@ -0,0 +1,224 @@
+"""
+Module defining a pool of dialog windows that can be re-used.
+
+Building a dialog creates a large tree of Boxes, so games that show frequent prompts can instead
+get their dialogs from the pool. Once a pooled dialog is removed from the scene it returns to the
+pool, and is re-used for the next question of the same shape.
+"""
+
+import logging
+import time
+from collections import defaultdict, deque
+from functools import partial
+from typing import (
+    Dict,
+    Deque,
+    Tuple,
+    Hashable,
+    TypeVar,
+    Optional,
+    Union,
+    Iterator,
+    Callable,
+    Type,
+)
+
+import pyglet
+
+from .base_dialog_window import DialogWindow
+from .multiple_choice import MultipleChoiceDialog
+from .text_input import TextInputDialog
+from ..multiple_choice_buttons import MultipleChoiceButtonsDefinition
+from ..question_definition import TextInputQuestionDefinition
+from ...work_queue import WorkQueue, WorkTask
+
+log = logging.getLogger(__name__)
+
+_Dialog = TypeVar("_Dialog", bound=DialogWindow)
+
+
+class _DialogPool:
+    """
+    Pool of dialogs, keyed by the shape of their definition.
+
+    Dialogs of the same shape have the same structure, such as the same choices and button style,
+    and only differ by their text and callbacks. Getting a dialog from the pool re-uses an idle
+    dialog of the same shape if there is one, re-binding it to the new definition.
+
+    Dialogs become idle when they are removed from the scene, for example by being closed.
+    Idle dialogs are discarded once they have been idle for `idle_timeout` seconds.
+
+    The global singleton `DialogPool` is available for use as the default pool.
+    """
+
+    def __init__(self, max_idle_per_shape: int = 2, idle_timeout: float = 60):
+        """
+        Create a new DialogPool.
+
+        Typically to be used as a singleton.
+
+        :param max_idle_per_shape: Maximum number of idle dialogs of each shape to keep.
+        :param idle_timeout: Number of seconds a dialog may be idle for before being discarded.
+        """
+        self.max_idle_per_shape = max_idle_per_shape
+        self.idle_timeout = idle_timeout
+
+        # Mapping of shape key to the idle dialogs and the time they became idle, oldest first.
+        self._idle: Dict[Hashable, Deque[Tuple[float, DialogWindow]]] = defaultdict(
+            deque
+        )
+        self._is_eviction_scheduled: bool = False
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def idle_count(self) -> int:
+        """Number of idle dialogs in the pool."""
+        return sum(len(dialogs) for dialogs in self._idle.values())
+
+    def multiple_choice_dialog(
+        self, definition: MultipleChoiceButtonsDefinition
+    ) -> MultipleChoiceDialog:
+        """
+        Get a dialog showing the given multiple choice question.
+
+        See `create_multiple_choice_question_dialog`.
+        """
+        key = (MultipleChoiceDialog, MultipleChoiceDialog.shape_key(definition))
+        dialog = self._reuse(key)
+        if isinstance(dialog, MultipleChoiceDialog):
+            dialog.set_definition(definition)
+            return dialog
+        return self._track(key, MultipleChoiceDialog(definition))
+
+    def text_input_dialog(
+        self, definition: TextInputQuestionDefinition
+    ) -> TextInputDialog:
+        """
+        Get a dialog asking the user to enter text.
+
+        See `create_text_input_dialog`.
+        """
+        key = (TextInputDialog, TextInputDialog.shape_key(definition))
+        dialog = self._reuse(key)
+        if isinstance(dialog, TextInputDialog):
+            dialog.set_definition(definition)
+            return dialog
+        return self._track(key, TextInputDialog(definition))
+
+    def prewarm(
+        self,
+        definition: Union[MultipleChoiceButtonsDefinition, TextInputQuestionDefinition],
+        count: int = 1,
+        priority: int = 0,
+    ) -> WorkTask:
+        """
+        Create idle dialogs of the shape of the given definition in the background.
+
+        The dialogs are created one at a time by the WorkQueue, so that a later request for a
+        dialog of the same shape re-uses one rather than building it at the time it is needed.
+        Dialogs are only created while there are fewer than `count` idle dialogs of the shape.
+
+        :param definition: Definition of the question the dialogs will be used for.
+        :param count: Number of idle dialogs of this shape to have ready.
+        :param priority: Priority of the task in the WorkQueue.
+        :return: The task, which can be used to cancel it.
+        """
+        key: Tuple[Type[DialogWindow], Hashable]
+        create: Callable[[], DialogWindow]
+        if isinstance(definition, TextInputQuestionDefinition):
+            key = (TextInputDialog, TextInputDialog.shape_key(definition))
+            create = partial(TextInputDialog, definition)
+        else:
+            key = (MultipleChoiceDialog, MultipleChoiceDialog.shape_key(definition))
+            create = partial(MultipleChoiceDialog, definition)
+        count = min(count, self.max_idle_per_shape)
+
+        def create_dialogs() -> Iterator[None]:
+            while len(self._idle.get(key, ())) < count:
+                dialog = self._track(key, create())
+                self._release(key, dialog)
+                yield
+
+        return WorkQueue.add(
+            create_dialogs(),
+            priority=priority,
+            name=f"prewarm {key[0].__name__} dialogs",
+        )
+
+    def _release(self, key: Hashable, dialog: DialogWindow) -> None:
+        """
+        Return a dialog to the pool so that it can be re-used.
+
+        This is called when a dialog from this pool is removed from the scene.
+
+        :param key: Shape key of the dialog.
+        :param dialog: The dialog that is no longer in the scene.
+        """
+        idle = self._idle[key]
+        if any(idle_dialog is dialog for _, idle_dialog in idle):
+            return
+        idle.append((time.monotonic(), dialog))
+        while len(idle) > self.max_idle_per_shape:
+            self._discard(idle.popleft()[1])
+
+        if not self._is_eviction_scheduled:
+            self._is_eviction_scheduled = True
+            pyglet.clock.schedule_interval(self._evict_idle, self.idle_timeout)
+
+    def clear(self) -> None:
+        """Discard all idle dialogs."""
+        for idle in self._idle.values():
+            for _, dialog in idle:
+                self._discard(dialog)
+        self._idle.clear()
+        self._stop_eviction()
+
+    def _reuse(self, key: Hashable) -> Optional[DialogWindow]:
+        """Take the most recently used idle dialog with the given key, if there is one."""
+        idle = self._idle.get(key)
+        if not idle:
+            self.misses += 1
+            return None
+
+        # Re-use the most recently used dialog, leaving older ones to be evicted.
+        self.hits += 1
+        return idle.pop()[1]
+
+    def _track(self, key: Hashable, dialog: _Dialog) -> _Dialog:
+        """Start tracking a new dialog, so that it returns to the pool when removed."""
+
+        def release(removed_dialog: DialogWindow) -> None:
+            self._release(key, removed_dialog)
+
+        dialog.on_removed = release
+        return dialog
+
+    @staticmethod
+    def _discard(dialog: DialogWindow) -> None:
+        """Stop a dialog returning to the pool, so that it can be garbage collected."""
+        log.debug(f"Discarding idle dialog {dialog!r}.")
+        dialog.on_removed = None
+
+    def _evict_idle(self, dt: float) -> None:
+        """Discard dialogs that have been idle for longer than `idle_timeout`."""
+        cutoff = time.monotonic() - self.idle_timeout
+        for key, idle in list(self._idle.items()):
+            while idle and idle[0][0] <= cutoff:
+                self._discard(idle.popleft()[1])
+            if not idle:
+                del self._idle[key]
+
+        if not self._idle:
+            self._stop_eviction()
+
+    def _stop_eviction(self) -> None:
+        """Stop checking for idle dialogs."""
+        if self._is_eviction_scheduled:
+            self._is_eviction_scheduled = False
+            pyglet.clock.unschedule(self._evict_idle)
+
+
+# The global dialog pool.
+DialogPool = _DialogPool()
@@ -1,19 +1,56 @@
 """Module aiding the creation of text input dialogs."""
 
 from dataclasses import replace
+from typing import Hashable
 
-from .base_dialog_window import create_base_dialog_window
+from .base_dialog_window import DialogWindow
 from ..question_definition import TextInputQuestionDefinition
 from ..text_box import EditableTextBox
-from ..window import Window
 
 
-def create_text_input_dialog(definition: TextInputQuestionDefinition) -> Window:
+class TextInputDialog(DialogWindow):
+    """A window asking the user to enter some text."""
+
+    def __init__(self, definition: TextInputQuestionDefinition):
+        """
+        Create a TextInputDialog.
+
+        :param definition: Definition of the question.
+        """
+        super(TextInputDialog, self).__init__(definition)
+        text_box_definition = replace(
+            definition.text_box_definition, on_change=definition.on_change
+        )
+        self.text_box = EditableTextBox(text_box_definition)
+        self.add_child_to_body(self.text_box)
+
+    @staticmethod
+    def shape_key(definition: TextInputQuestionDefinition) -> Hashable:
+        """
+        Key identifying dialogs that can be re-used to show the given definition.
+
+        Dialogs with the same key differ only by the question text, initial text and callbacks.
+        """
+        return replace(definition.text_box_definition, text="", on_change=None)
+
+    def set_definition(self, definition: TextInputQuestionDefinition) -> None:
+        """
+        Ask a different question using this dialog.
+
+        :param definition: The new definition. Must have the same `shape_key` as the definition
+            this dialog was created with.
+        """
+        self.set_question(definition)
+
+        # Reset the text without reporting it, to either the old or the new callbacks.
+        self.text_box.set_text(definition.text_box_definition.text, notify=False)
+        self.text_box.definition = replace(
+            self.text_box.definition, on_change=definition.on_change
+        )
+
+
+def create_text_input_dialog(
+    definition: TextInputQuestionDefinition,
+) -> TextInputDialog:
     """Create a text input dialog window."""
-    window = create_base_dialog_window(definition)
-    text_box_definition = replace(
-        definition.text_box_definition, on_change=definition.on_change
-    )
-    text_box = EditableTextBox(text_box_definition)
-    window.add_child_to_body(text_box)
-    return window
+    return TextInputDialog(definition)
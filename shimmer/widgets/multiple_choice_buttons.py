@@ -1,6 +1,5 @@
 """Module defining a set of Buttons representing a multiple choice question."""
 
-from collections import defaultdict
 from dataclasses import dataclass, field, replace
 from typing import Optional, Union, Dict, Set, Any
 
@@ -41,19 +40,16 @@ class MultipleChoiceButtons(Box):
         self.definition: MultipleChoiceButtonsDefinition = self.definition
         self._layout: Optional[Union[BoxRow, BoxColumn]] = None
         self._buttons: Dict[Union[str, Box], ToggleButton] = {}
-        self._current_selection: Dict[Union[str, Box], bool] = defaultdict(bool)
+        # The currently selected choices, in the order they were selected.
+        # Used as an ordered set, so values are always None.
+        self._current_selection: Dict[Union[str, Box], None] = {}
         self.update_layout()
         self.set_to_defaults()
 
     @property
     def currently_selected(self) -> Set[Union[str, Box]]:
         """Return a set of the currently selected options."""
-        return set(
-            item[0]
-            for item in filter(
-                lambda item: item[1] is True, self._current_selection.items()
-            )
-        )
+        return set(self._current_selection)
 
     def set_to_defaults(self) -> None:
         """
@@ -67,6 +63,30 @@ class MultipleChoiceButtons(Box):
             else:
                 button.is_toggled = False
 
+    def set_question(self, question: MultipleChoiceQuestionDefinition) -> None:
+        """
+        Ask a different question with the same choices, re-using the existing buttons.
+
+        The selection is reset to the defaults of the new question. Only selection changes made
+        to reach the new defaults are reported to the new question.
+
+        :param question: The new question. Must have the same choices as the current question.
+        """
+        if list(question.choices) != list(self.definition.question.choices):
+            raise ValueError(
+                "Cannot change the choices of a question. "
+                f"Existing: {self.definition.question.choices}, new: {question.choices}."
+            )
+
+        # Clear the existing selection without reporting it.
+        self.definition = replace(
+            self.definition, question=replace(question, on_change=None, defaults=set()),
+        )
+        self.set_to_defaults()
+
+        self.definition = replace(self.definition, question=question)
+        self.set_to_defaults()
+
     def _create_choice_callback_wrapper(
         self,
         chosen: Union[str, Box],
@@ -98,19 +118,26 @@ class MultipleChoiceButtons(Box):
         :param chosen: The choice represented by the button.
         :param button: The button that was selected.
         """
-        self._current_selection[chosen] = button.is_toggled
+        previous_selection = []
+        if button.is_toggled:
+            if not self.definition.question.allow_multiple:
+                # Only 1 button is allowed to be selected, so at most 1 is already selected.
+                previous_selection = [
+                    choice for choice in self._current_selection if choice != chosen
+                ]
+            self._current_selection[chosen] = None
+        else:
+            self._current_selection.pop(chosen, None)
 
         if self.definition.question.on_change is not None:
             self.definition.question.on_change(self.currently_selected)
 
-        # If only 1 button is allowed to be selected, deselect all other ones.
-        # This will actually call back into here for each deselection as they will call their
+        # Deselect the previously selected button.
+        # This will actually call back into here for the deselection as it will call its
         # toggle change callback. However, we limit recursion based on whether the button has been
-        # set to True, which every other button won't be.
-        if not self.definition.question.allow_multiple and button.is_toggled:
-            for choice, button in self._buttons.items():
-                if choice != chosen:
-                    button.is_toggled = False
+        # set to True, which the previous button won't be.
+        for choice in previous_selection:
+            self._buttons[choice].is_toggled = False
 
     def _create_buttons(self):
         """Create the set of buttons for each choice."""
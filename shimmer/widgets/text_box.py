@@ -1,16 +1,24 @@
 """A Box that automatically sets its size to fit the given text."""
 
+import re
 from dataclasses import dataclass, replace
-from typing import Optional, Dict, Any, Callable
+from functools import lru_cache
+from typing import Optional, Dict, Any, Callable, List, Tuple, Sequence
 
 import pyglet
 from pyglet import gl
 
 import cocos
 from ..alignment import HorizontalAlignment, LeftBottom
-from ..components.box import Box, bounding_rect_of_rects
+from ..components.batch_box import BatchBox, find_batch_box
+from ..components.box import Box, BoxDefinition, bounding_rect_of_rects
 from ..components.focus import KeyboardFocusBox, FocusBoxDefinition, make_focusable
-from ..components.font import FontDefinition, Calibri
+from ..components.font import (
+    FontDefinition,
+    FontMetrics,
+    FontMetricsCache,
+    Calibri,
+)
 from ..components.mouse_box import (
     MouseBox,
     MouseBoxDefinition,
@@ -73,6 +81,99 @@ class TextBoxDefinition(MouseBoxDefinition):
         }
 
 
+# Maximum number of text measurements to remember.
+MEASURE_TEXT_CACHE_SIZE = 4096
+
+# Characters that pyglet treats as the end of a paragraph in multiline text.
+_PARAGRAPH_SEPARATORS = re.compile("\n|\u2029")
+
+# Splits a paragraph into alternating runs of whitespace and words.
+_WORDS_AND_SPACES = re.compile(r"\S+|\s+")
+
+
+def _wrapped_line_widths(metrics: FontMetrics, paragraph: str, width: int) -> List[int]:
+    """
+    Word-wrap a paragraph to fit within the given width.
+
+    Follows pyglet wrapping rules: lines only break on whitespace, so a single word that is wider
+    than `width` is allowed to overflow its line. Whitespace at the end of a wrapped line does
+    not count towards its width.
+
+    :param metrics: Metrics of the font the text is drawn with.
+    :param paragraph: Text to wrap. Must not contain paragraph separators.
+    :param width: Maximum width of each line.
+    :return: Width of each wrapped line.
+    """
+    line_widths = []
+    # Width of the current line including trailing whitespace.
+    pen_x = 0
+    # Width of the current line up to the end of its last word.
+    line_width = 0
+    for token in _WORDS_AND_SPACES.findall(paragraph):
+        token_width = metrics.text_width(token)
+        if token.isspace():
+            pen_x += token_width
+            continue
+        if line_width > 0 and pen_x + token_width > width:
+            line_widths.append(line_width)
+            pen_x = 0
+        pen_x += token_width
+        line_width = pen_x
+    line_widths.append(line_width)
+    return line_widths
+
+
+@lru_cache(maxsize=MEASURE_TEXT_CACHE_SIZE)
+def _measure_text(
+    text: str,
+    font: FontDefinition,
+    width: Optional[int],
+    multiline: bool,
+    font_metrics_generation: int,
+) -> Tuple[int, int]:
+    """
+    Calculate the size of the given text. See `measure_text`.
+
+    `font_metrics_generation` is only used to invalidate cached results when the font
+    metrics cache is invalidated.
+    """
+    metrics = font.metrics
+    metrics.load_advances(text)
+
+    if not multiline:
+        return metrics.text_width(text), metrics.height
+
+    line_widths: List[int] = []
+    for paragraph in _PARAGRAPH_SEPARATORS.split(text):
+        if width is None:
+            line_widths.append(metrics.text_width(paragraph))
+        else:
+            line_widths.extend(_wrapped_line_widths(metrics, paragraph, width))
+    return max(line_widths), len(line_widths) * metrics.height
+
+
+def measure_text(text: str, definition: TextBoxDefinition) -> Tuple[int, int]:
+    """
+    Calculate the size that the given text would have if displayed using the given definition.
+
+    This matches the `content_width` and `content_height` of the pyglet label that would be
+    created, but without creating the label. Sizes are calculated from the cached font
+    metrics, and results are remembered so repeated measurements are very cheap.
+
+    :param text: The text to measure.
+    :param definition: Definition of the TextBox the text is displayed in. Only the font, width
+        and multiline attributes are used; the text of the definition is ignored.
+    :return: Tuple of (width, height) of the text.
+    """
+    return _measure_text(
+        text,
+        definition.font,
+        definition.width,
+        definition.is_multiline(),
+        FontMetricsCache.generation,
+    )
+
+
 class TextBox(MouseBox):
     """
     A rectangle containing text with an optional background color.
@@ -81,11 +182,24 @@ class TextBox(MouseBox):
     underlying pyglet Label).
 
     A TextBox can be thought of as a Box which contains a pyglet Label.
+
+    The size of the text is measured without creating the Label. The Label itself is only created
+    when the TextBox enters the scene (or when `label` is accessed), so TextBoxes can be created
+    cheaply for layout purposes.
+
+    If the TextBox is a descendant of a BatchBox, then the text is drawn by the BatchBox using a
+    pyglet Label in its shared Batch rather than by a cocos Label. This is much faster when
+    there are lots of TextBoxes. Batched text follows the position, visibility and color of the
+    TextBox, but not its rotation or scale.
     """
 
     def __init__(self, definition: TextBoxDefinition):
         """Create a new TextBox."""
         self._label: Optional[cocos.text.Label] = None
+        self._batch_box: Optional[BatchBox] = None
+        self._batched_label: Optional[pyglet.text.Label] = None
+        self._content_width: int = 0
+        self._content_height: int = 0
         super(TextBox, self).__init__(definition)
         self.definition: TextBoxDefinition = definition
         self._update_label()
@@ -100,45 +214,184 @@ class TextBox(MouseBox):
         """Set the text of the box and update the display."""
         self.set_text(value)
 
+    @property
+    def color(self) -> Color:
+        """Get the color of the text."""
+        return self.definition.font.color
+
+    @color.setter
+    def color(self, value: Color) -> None:
+        """Set the color of the text and update the display."""
+        self.set_color(value)
+
+    @property
+    def label(self) -> cocos.text.Label:
+        """
+        The cocos Label displaying the text. Created on first use.
+
+        Not used to display the text while this TextBox is drawn by a BatchBox.
+        """
+        if self._label is None:
+            self._create_label()
+        return self._label
+
+    @property
+    def is_batched(self) -> bool:
+        """True if the text of this TextBox is currently drawn by a BatchBox."""
+        return self._batch_box is not None
+
     def set_text(self, text: str) -> None:
         """Set the text of the box and update the display."""
         self.definition = replace(self.definition, text=text)
-        self._update_label()
 
-    def _update_label(self):
-        """Update the text of this Box."""
+        # Change the text of the existing label rather than creating a new one.
+        if self._batched_label is not None:
+            self._batched_label.text = text
+        elif self._label is not None:
+            self._label.element.text = text
+        elif not self.is_batched:
+            self._update_label()
+            return
+        self._measure()
+
+    def set_color(self, color: Color) -> None:
+        """Set the color of the text and update the display."""
+        self.definition = replace(
+            self.definition, font=replace(self.definition.font, color=color)
+        )
+
+        # Change the color of the existing label rather than creating a new one.
+        if self._batched_label is not None:
+            self._batched_label.color = color.as_tuple_alpha()
         if self._label is not None:
-            self.remove(self._label)
+            self._label.element.color = color.as_tuple_alpha()
 
-        self._label = cocos.text.Label(**self.definition.to_pyglet_label_kwargs())
+    def reset(self, definition: Optional[BoxDefinition] = None) -> None:
+        """
+        Reinitialise this TextBox with a new definition.
 
-        if self.definition.is_dynamic_sized:
-            width = self._label.element.content_width
-            height = self._label.element.content_height
+        If only the text or the color has changed then the existing label is re-used.
+
+        :param definition: The new definition of the TextBox. Defaults to the current definition.
+        """
+        if isinstance(definition, TextBoxDefinition) and definition == replace(
+            self.definition,
+            text=definition.text,
+            font=replace(self.definition.font, color=definition.font.color),
+        ):
+            super(TextBox, self).reset()
+            self.set_color(definition.font.color)
+            self.set_text(definition.text)
+        else:
+            super(TextBox, self).reset(definition)
+            if definition is not None:
+                self._update_label()
+
+    def on_enter(self):
+        """
+        Prepare to display the text just before entering the scene.
+
+        The text is drawn by the nearest BatchBox if there is one, otherwise the cocos Label
+        is created if it doesn't exist yet.
+        """
+        batch_box = find_batch_box(self)
+        if batch_box is not None:
+            if self._label is not None:
+                self.remove(self._label, no_resize=True)
+                self._label = None
+            self._batch_box = batch_box
+            batch_box.register(self)
+        elif self._label is None:
+            self._create_label()
+        super(TextBox, self).on_enter()
+
+    def on_exit(self):
+        """Stop being drawn by the BatchBox, if any, just before leaving the scene."""
+        super(TextBox, self).on_exit()
+        if self._batch_box is not None:
+            self._batch_box.unregister(self)
+            self._batch_box = None
+        self._delete_batched_label()
+
+    def on_batch_transform_change(
+        self, transform: cocos.euclid.Matrix3, visible: bool
+    ) -> None:
+        """
+        Called by the BatchBox when the position of this TextBox relative to it changes.
+
+        Moves the batched label to match, creating it if needed. The label is removed from
+        the Batch while this TextBox is invisible.
+        """
+        if not visible:
+            self._delete_batched_label()
+            return
+
+        x, y = transform * cocos.euclid.Point2(0, 0)
+        if self._batched_label is None:
+            self._create_batched_label(x, y)
         else:
-            width = self.definition.width
-            height = self.definition.height
+            self._batched_label.x = x
+            self._batched_label.y = y
+
+    def _measure(self) -> None:
+        """Measure the current text and update the size of this Box to match."""
+        self._content_width, self._content_height = measure_text(
+            self.definition.text, self.definition
+        )
+        if self.definition.is_dynamic_sized:
+            self.update_rect()
+
+    def _create_label(self) -> None:
+        """Create the cocos Label to display the text."""
+        self._label = cocos.text.Label(**self.definition.to_pyglet_label_kwargs())
 
-        # Set the position of the label to the center of this Box.
+        # Set the position of the label to the bottom left of this Box.
         # Only attempt to calculate this if the text is not empty, otherwise pyglet gets sad.
         if self.definition.text:
-            self._label.position = LeftBottom.get_coord_in_rect(width, height)
-        self.add(self._label)
+            self._label.position = LeftBottom.get_coord_in_rect(
+                self.rect.width, self.rect.height
+            )
+        self.add(self._label, no_resize=True)
+
+    def _create_batched_label(self, x: float, y: float) -> None:
+        """Create a pyglet Label in the Batch of the BatchBox at the given position."""
+        assert self._batch_box is not None
+        self._batched_label = pyglet.text.Label(
+            x=x,
+            y=y,
+            batch=self._batch_box.batch,
+            group=self._batch_box.group_for(self.get_z_value()),
+            **self.definition.to_pyglet_label_kwargs(),
+        )
+
+    def _delete_batched_label(self) -> None:
+        """Remove the batched label from the Batch, if it exists."""
+        if self._batched_label is not None:
+            self._batched_label.delete()
+            self._batched_label = None
+
+    def _update_label(self):
+        """Update the size of this Box to fit the text, and re-create the label if it exists."""
+        if self._label is not None:
+            self.remove(self._label, no_resize=True)
+            self._label = None
+
+        self._measure()
+        if self._batch_box is not None:
+            # Re-registering makes the BatchBox re-send the position of this TextBox before
+            # the next draw, which re-creates the batched label.
+            self._delete_batched_label()
+            self._batch_box.register(self)
+        elif self.is_running:
+            self._create_label()
 
     def bounding_rect_of_children(self) -> cocos.rect.Rect:
-        """Get the rect containing all of this boxes children and also the pyglet label."""
+        """Get the rect containing all of this boxes children and also the text."""
         rect = super(TextBox, self).bounding_rect_of_children()
-        if self._label is None:
-            return rect
 
         # Pyglet labels are not Boxes, so have to manually calculate the rect of this Box.
         if self.definition.is_dynamic_sized:
-            self_rect = cocos.rect.Rect(
-                0,
-                0,
-                self._label.element.content_width,
-                self._label.element.content_height,
-            )
+            self_rect = cocos.rect.Rect(0, 0, self._content_width, self._content_height)
         else:
             self_rect = self.rect
         return bounding_rect_of_rects((rect, self_rect))
@@ -157,8 +410,19 @@ class EditableTextBoxDefinition(TextBoxDefinition):
     multiline: bool = False
     background_color: Color = White
     font: FontDefinition = FontDefinition("calibri", 16, color=Black)
+
+    # Called with the full text after it changes.
     on_change: Optional[Callable[[str], None]] = None
 
+    # Called with the list of changes made to the text, which is cheaper than `on_change` for
+    # large amounts of text.
+    on_edit: Optional[Callable[[Sequence["TextChange"]], None]] = None
+
+    # Minimum number of seconds between calls to `on_change` and `on_edit`. Changes made in the
+    # meantime are reported together. Set to 0 to report changes at most once per frame, or
+    # None to report every change immediately.
+    edit_interval: Optional[float] = None
+
     @property
     def actual_height(self) -> int:
         """
@@ -169,6 +433,43 @@ class EditableTextBoxDefinition(TextBoxDefinition):
         return self.height if self.height is not None else self.font.height
 
 
+@dataclass(frozen=True)
+class TextChange:
+    """
+    A single change to the text of an EditableTextBox.
+
+    :param offset: Index of the first character that was changed.
+    :param deleted: Text that was removed from `offset`.
+    :param inserted: Text that was inserted at `offset` in its place.
+    """
+
+    offset: int
+    deleted: str = ""
+    inserted: str = ""
+
+    def apply(self, text: str) -> str:
+        """Return the given text with this change made to it."""
+        return (
+            text[: self.offset]
+            + self.inserted
+            + text[self.offset + len(self.deleted) :]
+        )
+
+    def merge(self, other: "TextChange") -> Optional["TextChange"]:
+        """
+        Combine this change with a change that was made immediately afterwards.
+
+        Only insertions directly following the text inserted by this change can be combined,
+        which covers the common case of the user typing.
+
+        :param other: The change made after this one.
+        :return: A single change equivalent to both changes, or None if they can't be combined.
+        """
+        if not other.deleted and other.offset == self.offset + len(self.inserted):
+            return replace(self, inserted=self.inserted + other.inserted)
+        return None
+
+
 class EditableTextBox(MouseBox):
     """
     A text box whose text can be edited by the user.
@@ -192,9 +493,18 @@ class EditableTextBox(MouseBox):
         self.definition: EditableTextBoxDefinition = definition
         self.batch = pyglet.graphics.Batch()
 
-        document = pyglet.text.decode_attributed(self.definition.text)
+        self._document = pyglet.text.decode_attributed(self.definition.text)
+        # Text of the document as of the last change. Strings are immutable so this is only a
+        # reference, but it allows the text removed by a deletion to be reported.
+        self._previous_text: str = self._document.text
+        self._pending_changes: List[TextChange] = []
+        self._is_report_scheduled: bool = False
+        self._document.push_handlers(
+            on_insert_text=self._on_insert_text, on_delete_text=self._on_delete_text
+        )
+
         self._layout = pyglet.text.layout.IncrementalTextLayout(
-            document,
+            self._document,
             self.definition.width,
             self.definition.actual_height,
             multiline=self.definition.multiline,
@@ -211,7 +521,7 @@ class EditableTextBox(MouseBox):
         self._keyboard_handler = KeyboardHandler(
             KeyboardHandlerDefinition(
                 on_text=self.on_text,
-                on_text_motion=self._caret.on_text_motion,
+                on_text_motion=self.on_text_motion,
                 on_text_motion_select=self._caret.on_text_motion_select,
                 logging_name="text_box",
             )
@@ -229,13 +539,89 @@ class EditableTextBox(MouseBox):
     @property
     def text(self) -> str:
         """The current text in the text box."""
-        return self._layout.document.text
+        return self._document.text
+
+    def set_text(self, text: str, notify: bool = True) -> None:
+        """
+        Replace the text in the text box.
+
+        :param text: The new text.
+        :param notify: If True, this is reported as a change like any user edit. If False, then
+            it isn't reported, and any changes that are waiting to be reported are discarded.
+        """
+        self._document.text = text
+        if notify:
+            self._report_changes()
+        else:
+            self._discard_changes()
 
     def on_text(self, text: str) -> Optional[bool]:
         """Called when the user enters text into the text box."""
+        result = self._caret.on_text(text)
+        self._report_changes()
+        return result
+
+    def on_text_motion(self, motion: int) -> Optional[bool]:
+        """Called when the user moves the caret, or deletes text, in the text box."""
+        result = self._caret.on_text_motion(motion)
+        self._report_changes()
+        return result
+
+    def on_exit(self):
+        """Report any outstanding changes before leaving the scene."""
+        super(EditableTextBox, self).on_exit()
+        if self._is_report_scheduled:
+            pyglet.clock.unschedule(self._send_changes)
+            self._send_changes()
+
+    def _on_insert_text(self, start: int, text: str) -> None:
+        """Record text inserted into the document."""
+        self._record_change(TextChange(start, inserted=text))
+
+    def _on_delete_text(self, start: int, end: int) -> None:
+        """Record text deleted from the document."""
+        self._record_change(TextChange(start, deleted=self._previous_text[start:end]))
+
+    def _record_change(self, change: TextChange) -> None:
+        """Add the change to the changes waiting to be reported."""
+        self._previous_text = self._document.text
+        if self._pending_changes:
+            merged = self._pending_changes[-1].merge(change)
+            if merged is not None:
+                self._pending_changes[-1] = merged
+                return
+        self._pending_changes.append(change)
+
+    def _report_changes(self) -> None:
+        """Report the recorded changes now, or schedule them to be reported later."""
+        if not self._pending_changes or self._is_report_scheduled:
+            return
+
+        if self.definition.edit_interval is None:
+            self._send_changes()
+        else:
+            self._is_report_scheduled = True
+            pyglet.clock.schedule_once(
+                self._send_changes, self.definition.edit_interval
+            )
+
+    def _discard_changes(self) -> None:
+        """Discard any changes that are waiting to be reported."""
+        self._pending_changes = []
+        if self._is_report_scheduled:
+            self._is_report_scheduled = False
+            pyglet.clock.unschedule(self._send_changes)
+
+    def _send_changes(self, dt: Optional[float] = None) -> None:
+        """Call `on_edit` and `on_change` with the changes recorded so far."""
+        self._is_report_scheduled = False
+        changes, self._pending_changes = self._pending_changes, []
+        if not changes:
+            return
+        if self.definition.on_edit is not None:
+            self.definition.on_edit(changes)
         if self.definition.on_change is not None:
             self.definition.on_change(self.text)
-        return self._caret.on_text(text)
 
     def take_focus(self):
         """Start capturing keyboard events."""
@@ -258,7 +644,7 @@ class EditableTextBox(MouseBox):
         """Make the text caret visible."""
         self._caret.visible = True
         self._caret.mark = 0
-        self._caret.position = len(self._layout.document.text)
+        self._caret.position = len(self._document.text)
 
     def _hide_caret(self):
         """Make the text caret invisible."""
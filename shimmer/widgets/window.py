@@ -1,7 +1,7 @@
 """Module defining windows."""
 
 from dataclasses import dataclass, replace
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from ..alignment import (
     LeftTop,
@@ -102,6 +102,13 @@ class Window(MouseBox):
         self._title_bar_background: Optional[Box] = None
         self.focus_box: Optional[VisualAndKeyboardFocusBox] = None
 
+        # The (height, on_close) that the current close button was created with.
+        self._close_button_inputs: Optional[Tuple] = None
+
+        # True while the window components are being updated, so that resizing them doesn't
+        # trigger another update.
+        self._is_updating_all: bool = False
+
         # Add the inner box, which is the main body of the window excluding the title bar.
         self.body = BoxColumn()
         self.add(self.body)
@@ -114,13 +121,22 @@ class Window(MouseBox):
             self.focus_box.take_focus()
 
     def update_all(self):
-        """Update or re-create all of the components that make up the window."""
-        self._update_close_button()
-        self._update_title()
-        self._update_title_bar_background()
-        self.update_background()
-        self._update_drag_zone()
-        self._update_focus_box()
+        """
+        Update all of the components that make up the window.
+
+        Components are resized and repositioned in place. They are only re-created if the parts
+        of the definition they are created from have changed.
+        """
+        self._is_updating_all = True
+        try:
+            self._update_close_button()
+            self._update_title()
+            self._update_title_bar_background()
+            self.update_background()
+            self._update_drag_zone()
+            self._update_focus_box()
+        finally:
+            self._is_updating_all = False
 
     def update_rect(self):
         """
@@ -154,6 +170,9 @@ class Window(MouseBox):
 
     def on_child_size_changed(self):
         """Called when a child of the window changes size."""
+        if self._is_updating_all:
+            return
+
         self.update_rect()
         self.update_all()
         self.body.align_anchor_with_other_anchor(
@@ -191,58 +210,72 @@ class Window(MouseBox):
         )
 
     def _update_focus_box(self):
-        """Recreate the focus box of this window, preserving current focus state."""
-        was_focused = False
-        if self.focus_box is not None:
-            was_focused = self.focus_box.is_focused
-            self.remove(self.focus_box, no_resize=True)
-
-        self.focus_box = make_focusable(self)
-
-        if was_focused:
-            self.focus_box.take_focus()
+        """Create the focus box of this window, or resize it to match the window."""
+        if self.focus_box is None:
+            self.focus_box = make_focusable(self)
+        else:
+            # Resizing in place keeps the focus state and position in the focus stack.
+            self.focus_box.set_size(self.rect.width, self.rect.height)
 
     def _update_title(self):
-        """Recreate the title."""
-        if self._title is not None:
+        """Create, update or remove the title to match the definition."""
+        title_height = self.definition.title_bar_height
+        if self._title is not None and (
+            self.definition.title is None
+            or self._title.definition.height != title_height
+        ):
             self.remove(self._title, no_resize=True)
+            self._title = None
 
         if self.definition.title is None:
             return
 
-        title_definition = TextBoxDefinition(
-            text=self.definition.title, height=self.definition.title_bar_height,
-        )
+        if self._title is None:
+            title_definition = TextBoxDefinition(
+                text=self.definition.title, height=title_height,
+            )
+            self._title = TextBox(title_definition)
+            self.add(self._title, no_resize=True)
+        elif self._title.text != self.definition.title:
+            self._title.set_text(self.definition.title)
 
-        self._title = TextBox(title_definition)
-        self.add(self._title, no_resize=True)
         self._title.align_anchor_with_other_anchor(self, LeftTop, spacing=(10, 0))
 
     def _update_title_bar_background(self):
-        """Redefine the background color of the title bar."""
-        if self._title_bar_background is not None:
-            self.remove(self._title_bar_background, no_resize=True)
-
-        self._title_bar_background = Box(
-            BoxDefinition(
-                width=self.rect.width,
-                height=self.title_bar_height,
+        """Create the background of the title bar, or update it to match the window."""
+        if self._title_bar_background is None:
+            self._title_bar_background = Box(
+                BoxDefinition(
+                    width=self.rect.width,
+                    height=self.title_bar_height,
+                    background_color=self.definition.title_bar_color,
+                )
+            )
+            self.add(self._title_bar_background, z=-1, no_resize=True)
+        else:
+            self._title_bar_background.definition = replace(
+                self._title_bar_background.definition,
                 background_color=self.definition.title_bar_color,
             )
-        )
-        self.add(self._title_bar_background, z=-1, no_resize=True)
+            self._title_bar_background.set_size(self.rect.width, self.title_bar_height)
+            # Backgrounds are updated in place, so this is cheap if nothing has changed.
+            self._title_bar_background.update_background()
+
         self._title_bar_background.align_anchor_with_other_anchor(self, LeftTop)
 
     def _update_close_button(self):
-        """Redefine the window close button."""
-        definition = replace(
-            CloseButtonDefinitionBase,
-            width=self._title_bar_button_height,
-            height=self._title_bar_button_height,
-            on_release=self.definition.on_close,
-        )
-        close_button = CloseButton(definition)
-        self._update_title_bar_box("close", close_button)
+        """Create the window close button if needed, and position it."""
+        inputs = (self._title_bar_button_height, self.definition.on_close)
+        if inputs != self._close_button_inputs:
+            definition = replace(
+                CloseButtonDefinitionBase,
+                width=self._title_bar_button_height,
+                height=self._title_bar_button_height,
+                on_release=self.definition.on_close,
+            )
+            self._update_title_bar_box("close", CloseButton(definition))
+            self._close_button_inputs = inputs
+
         self.close_button.align_anchor_with_other_anchor(
             self,
             RightTop,
@@ -264,16 +297,19 @@ class Window(MouseBox):
 
     def _update_drag_zone(self):
         """
-        Redefine the draggable area of the title bar.
+        Create or resize the draggable area of the title bar.
 
-        This creates a draggable area of the window covering the entire title bar to the left of
+        This is a draggable area of the window covering the entire title bar to the left of
         the leftmost title bar button.
         """
-        drag_box_definition = DraggableBoxDefinition(
-            width=self.rect.width - self._leftmost_title_bar_button_position,
-            height=self.title_bar_height,
-        )
-        self._update_title_bar_box("drag", DraggableBox(drag_box_definition))
+        width = self.rect.width - self._leftmost_title_bar_button_position
+        if "drag" in self._title_boxes:
+            self.drag_box.set_size(width, self.title_bar_height)
+        else:
+            drag_box_definition = DraggableBoxDefinition(
+                width=width, height=self.title_bar_height,
+            )
+            self._update_title_bar_box("drag", DraggableBox(drag_box_definition))
         self._title_boxes["drag"].align_anchor_with_other_anchor(
             self, LeftTop,
         )
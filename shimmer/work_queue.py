@@ -0,0 +1,236 @@
+"""
+Queue of background work that is run in small slices on each frame.
+
+Heavy work, such as building a large layout or creating a dialog, causes the frame it happens in
+to take too long if it's all done in a single callback. Instead, the work can be split into
+steps, as a generator or as a list of chunks, and added to the `WorkQueue`. On each tick of the
+pyglet clock, the queue runs steps of the highest priority tasks until its time budget for the
+frame is used up, then continues with them on the next frame.
+
+For example:
+
+    def build_targets(layout, count):
+        for index in range(count):
+            layout.add(create_target(index))
+            yield index
+
+    task = WorkQueue.add(build_targets(layout, 1000), priority=1)
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from typing import Iterator, Callable, Any, Optional, Iterable, List, Tuple
+
+import pyglet
+
+log = logging.getLogger(__name__)
+
+
+class WorkTask:
+    """
+    A task in a WorkQueue, which can be used to cancel it.
+
+    Each step of the task is one iteration of its generator.
+    """
+
+    def __init__(
+        self,
+        steps: Iterator[Any],
+        priority: int = 0,
+        on_complete: Optional[Callable[[], None]] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Create a new WorkTask.
+
+        :param steps: Iterator that does one step of the work each time it is advanced.
+        :param priority: Tasks with a higher priority are run first.
+        :param on_complete: Called once all the steps of the task have been run.
+        :param name: Name of the task, for logging.
+        """
+        self.steps = steps
+        self.priority = priority
+        self.on_complete = on_complete
+        self.name = name or repr(steps)
+        self.steps_run: int = 0
+        self.is_done: bool = False
+        self.is_cancelled: bool = False
+
+    def __repr__(self) -> str:
+        """Identify the task by its name."""
+        return f"<WorkTask {self.name}>"
+
+    @property
+    def is_pending(self) -> bool:
+        """True if this task still has steps to run."""
+        return not self.is_done and not self.is_cancelled
+
+    def cancel(self) -> None:
+        """
+        Stop running this task. Steps that have already been run are not undone.
+
+        Can be called by a step of the task itself, in which case the task is stopped once that
+        step returns.
+        """
+        if not self.is_pending:
+            return
+        self.is_cancelled = True
+        # A generator can't be closed while it is running one of its own steps.
+        if not getattr(self.steps, "gi_running", False):
+            self._close()
+
+    def run_step(self) -> bool:
+        """
+        Run the next step of this task.
+
+        :return: True if there are more steps to run.
+        """
+        try:
+            next(self.steps)
+        except StopIteration:
+            if not self.is_cancelled:
+                self.is_done = True
+                if self.on_complete is not None:
+                    self.on_complete()
+            return False
+        self.steps_run += 1
+        if self.is_cancelled:
+            # The task was cancelled by the step that was just run.
+            self._close()
+            return False
+        return True
+
+    def _close(self) -> None:
+        """Close the steps of this task, if they can be closed, such as a generator."""
+        close = getattr(self.steps, "close", None)
+        if close is not None:
+            close()
+
+
+def _run_chunks(chunks: Iterable[Callable[[], Any]]) -> Iterator[None]:
+    """Call each chunk as a separate step."""
+    for chunk in chunks:
+        chunk()
+        yield
+
+
+class _WorkQueue:
+    """
+    Queue of tasks that are run in slices, within a time budget on each frame.
+
+    Tasks are run highest priority first. Tasks of the same priority are run in the order they
+    were added, with each task being run to completion before the next is started.
+
+    At least one step is run on each frame, so tasks always progress even if a single step takes
+    longer than the budget.
+
+    The global singleton `WorkQueue` is available for use as the default queue.
+    """
+
+    def __init__(self, budget_ms: float = 4):
+        """
+        Create a new WorkQueue.
+
+        Typically to be used as a singleton.
+
+        :param budget_ms: Number of milliseconds of work to do on each frame.
+        """
+        self.budget_ms = budget_ms
+
+        # Heap of (-priority, order added, task), so the first task is the one to run next.
+        self._tasks: List[Tuple[int, int, WorkTask]] = []
+        self._counter = itertools.count()
+        self._is_scheduled: bool = False
+
+    def __len__(self) -> int:
+        """Number of tasks waiting to be run."""
+        return sum(1 for _, _, task in self._tasks if task.is_pending)
+
+    def add(
+        self,
+        steps: Iterable[Any],
+        priority: int = 0,
+        on_complete: Optional[Callable[[], None]] = None,
+        name: Optional[str] = None,
+    ) -> WorkTask:
+        """
+        Add a task, such as a generator, whose steps are run in the background.
+
+        :param steps: Iterable that does one step of the work each time it is advanced.
+        :param priority: Tasks with a higher priority are run first.
+        :param on_complete: Called once all the steps of the task have been run.
+        :param name: Name of the task, for logging.
+        :return: The task, which can be used to cancel it.
+        """
+        task = WorkTask(iter(steps), priority, on_complete, name)
+        heapq.heappush(self._tasks, (-priority, next(self._counter), task))
+        if not self._is_scheduled:
+            self._is_scheduled = True
+            pyglet.clock.schedule(self.run)
+        return task
+
+    def add_chunks(
+        self,
+        chunks: Iterable[Callable[[], Any]],
+        priority: int = 0,
+        on_complete: Optional[Callable[[], None]] = None,
+        name: Optional[str] = None,
+    ) -> WorkTask:
+        """
+        Add a task made of chunks of work, each of which is called as a separate step.
+
+        See `add`.
+        """
+        return self.add(_run_chunks(chunks), priority, on_complete, name)
+
+    def cancel_all(self) -> None:
+        """Cancel every task in the queue."""
+        for _, _, task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        self._stop()
+
+    def run(self, dt: float) -> None:
+        """Run steps of the queued tasks until the time budget for this frame is used up."""
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        ran_step = False
+        while self._tasks:
+            task = self._tasks[0][2]
+            if not task.is_pending:
+                heapq.heappop(self._tasks)
+                continue
+            if ran_step and time.perf_counter() >= deadline:
+                return
+
+            ran_step = True
+            try:
+                has_more = task.run_step()
+            except Exception as e:
+                log.exception(f"Work task {task!r} failed: {e}")
+                task.cancel()
+                has_more = False
+            if not has_more and self._tasks and self._tasks[0][2] is task:
+                heapq.heappop(self._tasks)
+
+        self._stop()
+
+    def run_to_completion(self) -> None:
+        """Run every queued task to completion now, ignoring the time budget."""
+        budget_ms = self.budget_ms
+        self.budget_ms = float("inf")
+        try:
+            self.run(0)
+        finally:
+            self.budget_ms = budget_ms
+
+    def _stop(self) -> None:
+        """Stop running on each frame."""
+        if self._is_scheduled:
+            self._is_scheduled = False
+            pyglet.clock.unschedule(self.run)
+
+
+# The global work queue.
+WorkQueue = _WorkQueue()
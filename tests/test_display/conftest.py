@@ -6,10 +6,12 @@ from typing import Callable, List, Tuple, Any
 import pytest
 
 import cocos
+from shimmer.components.font import FontMetricsCache
 from shimmer.widgets.text_box import TextBox, TextBoxDefinition
 from tests.test_display.mock_window import MockWindow
 from .interactive import PassOrFailInput, SimpleEventLayer
 from .mock_director import MockDirector
+from .mock_font import MockFont
 from .mock_keyboard import MockKeyboard
 from .mock_mouse import MockMouse
 
@@ -31,6 +33,15 @@ def mock_gui(mocker):
     cocos.director.director.init(autoscale=False)
 
 
+@pytest.fixture
+def mock_font(mocker):
+    """Mock out font loading so that text can be measured without a GUI."""
+    load_font = mocker.patch("shimmer.components.font.load_font", side_effect=MockFont)
+    FontMetricsCache.invalidate()
+    yield load_font
+    FontMetricsCache.invalidate()
+
+
 @pytest.fixture
 def mock_mouse():
     """Fixture to provide a mock hardware mouse for tests to simulate mouse events."""
@@ -0,0 +1,39 @@
+"""Definition of a mock pyglet font for use in testing text sizing without a GUI."""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class MockGlyph:
+    """A Mock pyglet glyph."""
+
+    advance: int
+
+
+class MockFont:
+    """
+    A Mock pyglet Font.
+
+    Every character has an advance of half the font size, which makes text widths easy to
+    predict in tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        bold: bool = False,
+        italic: bool = False,
+        dpi: Optional[int] = None,
+    ):
+        """Create a new MockFont."""
+        self.size = size
+        self.ascent = size
+        self.descent = -(size // 4)
+        self.glyph_requests: List[str] = []
+
+    def get_glyphs(self, text: str) -> List[MockGlyph]:
+        """Return a glyph for each character in the text."""
+        self.glyph_requests.append(text)
+        return [MockGlyph(advance=self.size // 2) for _ in text]
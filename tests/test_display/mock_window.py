@@ -18,6 +18,10 @@ class MockWindow:
     def remove_handlers(self, *_, **__):
         """Ignore removing of handlers to the window."""
 
+    def get_system_mouse_cursor(self, *_, **__):
+        """No mouse cursors are available."""
+        return None
+
     def dispatch_event(self, event: str, *args: Any, **kwargs: Any) -> None:
         """Record events that are dispatched."""
         self.received_events.append((event, args, kwargs))
@@ -0,0 +1,264 @@
+"""Tests for the BatchBox component."""
+
+import os
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from mock import MagicMock
+
+from shimmer.components.batch_box import BatchBox, find_batch_box
+from shimmer.components.box import Box, BoxDefinition
+from shimmer.components.font import Calibri
+from shimmer.components.sprite_box import SpriteBox, SpriteBoxDefinition
+from shimmer.data_structures import Color, Black
+from shimmer.widgets.text_box import TextBox, TextBoxDefinition
+
+
+@pytest.fixture
+def kitten_path() -> Path:
+    """Absolute path to kitten.png."""
+    return Path(os.path.join(os.path.dirname(os.path.realpath(__file__)), "kitten.png"))
+
+
+class RecordingBox(Box):
+    """Box that records the transforms it is told about by a BatchBox."""
+
+    def __init__(self):
+        """Create a new RecordingBox."""
+        super(RecordingBox, self).__init__(BoxDefinition(width=10, height=10))
+        self.changes: List[Tuple[Tuple[float, float], bool]] = []
+
+    def on_batch_transform_change(self, transform, visible):
+        """Record the position of this Box relative to the BatchBox."""
+        self.changes.append(((transform.c, transform.g), visible))
+
+
+def test_find_batch_box(mock_gui, subtests):
+    """Test that the nearest BatchBox ancestor is found."""
+    outer = BatchBox()
+    inner = BatchBox()
+    middle = Box()
+    child = Box()
+
+    with subtests.test("No BatchBox is found for a node with no parent."):
+        assert find_batch_box(child) is None
+
+    outer.add(middle)
+    middle.add(inner)
+    inner.add(child)
+
+    with subtests.test("The nearest BatchBox is found."):
+        assert find_batch_box(child) is inner
+        assert find_batch_box(inner) is outer
+
+
+def test_batch_box_update_members(mock_gui, mocker, subtests):
+    """Test that members are only told about their position when it changes."""
+    batch_box = BatchBox()
+    middle = Box()
+    middle.position = 100, 100
+    member = RecordingBox()
+    member.position = 10, 20
+    other = RecordingBox()
+    batch_box.add(middle)
+    batch_box.add(other)
+    middle.add(member)
+    batch_box.on_enter()
+    batch_box.register(member)
+    batch_box.register(other)
+
+    with subtests.test("Member is told its position relative to the BatchBox."):
+        batch_box.update_members()
+        assert member.changes == [((110, 120), True)]
+
+    with subtests.test("Member is not told anything if nothing has changed."):
+        transform_of = mocker.spy(batch_box, "transform_of")
+        batch_box.update_members()
+        assert len(member.changes) == 1
+        transform_of.assert_not_called()
+
+    with subtests.test("Moving a member marks the BatchBox dirty."):
+        batch_box._dirty = False
+        other.position = 5, 5
+        assert batch_box.dirty
+
+    with subtests.test("Only the members that moved are recalculated."):
+        batch_box.update_members()
+        transform_of.assert_called_once_with(other)
+        assert other.changes[-1] == ((5, 5), True)
+        assert not batch_box.dirty
+
+    with subtests.test("Moving the BatchBox itself doesn't affect members."):
+        batch_box.position = 500, 500
+        batch_box.update_members()
+        assert len(member.changes) == 1
+
+    with subtests.test("Moving an ancestor of the member is detected."):
+        middle.position = 0, 0
+        batch_box.update_members()
+        assert member.changes[-1] == ((10, 20), True)
+
+    with subtests.test("Hiding an ancestor of the member is detected."):
+        middle.visible = False
+        batch_box.update_members()
+        assert member.changes[-1] == ((10, 20), False)
+
+    with subtests.test("Unregistered members are not told anything."):
+        batch_box.unregister(member)
+        middle.visible = True
+        batch_box.update_members()
+        assert member.changes[-1] == ((10, 20), False)
+
+
+def test_batch_box_groups(mock_gui):
+    """Test that graphics at the same z-order share a group."""
+    batch_box = BatchBox()
+    assert batch_box.group_for(1) is batch_box.group_for(1)
+    assert batch_box.group_for(None) is batch_box.group_for(0)
+    assert batch_box.group_for(1) is not batch_box.group_for(2)
+
+
+def test_transform_of_non_descendant(mock_gui):
+    """Test that only descendants of a BatchBox can be positioned relative to it."""
+    with pytest.raises(ValueError):
+        BatchBox().transform_of(Box())
+
+
+def test_batched_text_box(mock_gui, mock_font, mocker, subtests):
+    """Test that a TextBox inside a BatchBox draws its text using the shared Batch."""
+    label_type = mocker.patch("shimmer.widgets.text_box.pyglet.text.Label")
+    batch_box = BatchBox()
+    text_box = TextBox(TextBoxDefinition(text="Hello"))
+    text_box.position = 10, 20
+    batch_box.add(text_box, z=3)
+    batch_box.on_enter()
+
+    with subtests.test("TextBox is batched without creating a cocos Label."):
+        assert text_box.is_batched
+        assert text_box in batch_box
+        assert text_box._label is None
+
+    with subtests.test("Batched label is created in the Batch when first positioned."):
+        batch_box.update_members()
+        label_type.assert_called_once()
+        kwargs = label_type.call_args[1]
+        assert kwargs["batch"] is batch_box.batch
+        assert kwargs["group"] is batch_box.group_for(3)
+        assert (kwargs["x"], kwargs["y"]) == (10, 20)
+
+    label = label_type.return_value
+
+    with subtests.test("Moving the TextBox moves the batched label."):
+        text_box.position = 30, 40
+        batch_box.update_members()
+        assert (label.x, label.y) == (30, 40)
+
+    with subtests.test("Setting the text updates the batched label in place."):
+        text_box.set_text("Hello, world")
+        assert label.text == "Hello, world"
+        assert text_box.rect.width == 12 * 8
+        label_type.assert_called_once()
+
+    with subtests.test("Setting the color updates the batched label in place."):
+        text_box.color = Color(1, 2, 3, 4)
+        assert label.color == (1, 2, 3, 4)
+        text_box.reset(replace(text_box.definition, font=replace(Calibri, color=Black)))
+        assert label.color == Black.as_tuple_alpha()
+        assert text_box.color == Black
+        label_type.assert_called_once()
+
+    with subtests.test("Hiding the TextBox removes its label from the Batch."):
+        text_box.visible = False
+        batch_box.update_members()
+        label.delete.assert_called_once()
+        assert text_box._batched_label is None
+
+    with subtests.test("Leaving the scene stops the TextBox being batched."):
+        batch_box.on_exit()
+        assert not text_box.is_batched
+        assert text_box not in batch_box
+
+
+def test_batch_box_text(run_gui):
+    """A grid of 100 numbers drawn by a single BatchBox; every 7th number is hidden."""
+    batch_box = BatchBox(BoxDefinition(width=500, height=500))
+    for i in range(100):
+        text_box = TextBox(TextBoxDefinition(text=str(i)))
+        text_box.position = 50 * (i % 10), 50 * (i // 10)
+        text_box.visible = i % 7 != 0
+        batch_box.add(text_box)
+
+    assert run_gui(test_batch_box_text, batch_box)
+
+
+def test_batched_sprite_box(mock_gui, mocker, subtests):
+    """Test that a SpriteBox inside a BatchBox draws its image using the shared Batch."""
+    mocker.patch(
+        "shimmer.components.sprite_box.Sprite",
+        side_effect=lambda image, **_: MagicMock(image=image),
+    )
+    sprite_type = mocker.patch("shimmer.components.sprite_box.pyglet.sprite.Sprite")
+    image = MagicMock(width=10, height=20)
+    batch_box = BatchBox()
+    middle = Box()
+    middle.scale = 2
+    sprite_box = SpriteBox(SpriteBoxDefinition(image=image, width=20, height=20))
+    sprite_box.position = 10, 20
+    batch_box.add(middle)
+    middle.add(sprite_box, z=3)
+    batch_box.on_enter()
+
+    with subtests.test("SpriteBox is batched without drawing the cocos Sprite."):
+        assert sprite_box.is_batched
+        assert sprite_box in batch_box
+        assert sprite_box.sprite not in sprite_box
+
+    with subtests.test("Batched sprite is created in the Batch when first positioned."):
+        batch_box.update_members()
+        sprite_type.assert_called_once()
+        kwargs = sprite_type.call_args[1]
+        assert kwargs["batch"] is batch_box.batch
+        assert kwargs["group"] is batch_box.group_for(3)
+
+    sprite = sprite_type.return_value
+
+    with subtests.test("Batched sprite is positioned and scaled to fit the SpriteBox."):
+        kwargs = sprite.update.call_args[1]
+        assert (kwargs["x"], kwargs["y"]) == (20, 40)
+        assert (kwargs["scale_x"], kwargs["scale_y"]) == (4, 2)
+        assert kwargs["rotation"] == 0
+
+    with subtests.test("Resizing the SpriteBox rescales the batched sprite."):
+        sprite_box.set_size(10, 10)
+        batch_box.update_members()
+        kwargs = sprite.update.call_args[1]
+        assert (kwargs["scale_x"], kwargs["scale_y"]) == (2, 1)
+
+    with subtests.test("Changing opacity or color updates the batched sprite."):
+        sprite_box.opacity = 128
+        sprite_box.color = (255, 0, 0)
+        assert sprite.opacity == sprite_box.sprite.opacity == 128
+        assert sprite.color == sprite_box.sprite.color == (255, 0, 0)
+
+    with subtests.test("Leaving the scene stops the SpriteBox being batched."):
+        batch_box.on_exit()
+        sprite.delete.assert_called_once()
+        assert not sprite_box.is_batched
+        assert sprite_box not in batch_box
+
+
+def test_batch_box_sprites(run_gui, kitten_path):
+    """A grid of 100 kittens drawn by a single BatchBox; every 7th kitten is hidden."""
+    definition = SpriteBoxDefinition(
+        image=kitten_path, width=40, height=40, use_atlas=True
+    )
+    batch_box = BatchBox(BoxDefinition(width=500, height=500))
+    for i in range(100):
+        sprite_box = SpriteBox(definition)
+        sprite_box.position = 50 * (i % 10), 50 * (i // 10)
+        sprite_box.visible = i % 7 != 0
+        batch_box.add(sprite_box)
+
+    assert run_gui(test_batch_box_sprites, batch_box)
@@ -354,3 +354,19 @@ def test_box_logging(mock_gui, caplog, subtests):
             last_log = caplog.records[-1]
             assert trace_marker in last_log.msg
             assert last_log.levelname == level_name
+
+
+def test_resizing_background(mock_gui, subtests):
+    """Test that the background of a box is resized in place when the box changes size."""
+    box = Box(BoxDefinition(background_color=White, width=10, height=10))
+    background = box._background
+    assert background is not None
+
+    with subtests.test("Background is resized without being re-created."):
+        box.set_size(20, 30)
+        assert box._background is background
+        assert (background.width, background.height) == (20, 30)
+
+    with subtests.test("Background is removed when the box has no area."):
+        box.set_size(0, 30)
+        assert box._background is None
@@ -14,6 +14,7 @@ from shimmer.components.box_layout import (
 )
 from shimmer.data_structures import Color
 from shimmer.widgets.button import ButtonDefinition
+from shimmer.work_queue import _WorkQueue
 
 
 def make_visible_button_definition(
@@ -191,3 +192,44 @@ def test_create_box_layout(
         # Only a single BoxRow or BoxColumn
         assert len(box_layout.get_children()) == exp_inner
         assert isinstance(first_child, Box)
+
+
+def test_set_boxes(mock_gui, subtests):
+    """Test replacing the boxes of a layout only adds and removes the changed boxes."""
+    boxes = [Box(BoxDefinition(width=100, height=10 * i)) for i in range(1, 5)]
+    box_column = BoxColumn(BoxColumnDefinition(spacing=10), boxes[:3])
+
+    box_column.set_boxes([boxes[2], boxes[3], boxes[0]])
+
+    with subtests.test("Boxes are laid out in the new order."):
+        assert boxes[2].position == (0, 0)
+        assert boxes[3].position == (0, 40)
+        assert boxes[0].position == (0, 90)
+        assert box_column.rect.height == 100
+
+    with subtests.test("Only boxes that are no longer included are removed."):
+        assert box_column.get_children() == [boxes[0], boxes[2], boxes[3]]
+
+
+def test_set_boxes_in_background(mock_gui, mocker):
+    """Test that boxes are created using the WorkQueue, then put in the layout all at once."""
+    queue = _WorkQueue()
+    mocker.patch("shimmer.components.box_layout.WorkQueue", new=queue)
+    mocker.patch("pyglet.clock.schedule")
+    mocker.patch("pyglet.clock.unschedule")
+    box_column = BoxColumn(BoxColumnDefinition(spacing=10))
+    created = []
+
+    def create_boxes():
+        for i in range(1, 4):
+            box = Box(BoxDefinition(width=100, height=10 * i))
+            created.append(box)
+            yield box
+
+    task = box_column.set_boxes_in_background(create_boxes())
+    assert box_column.get_children() == []
+
+    queue.run_to_completion()
+    assert task.is_done
+    assert box_column.get_children() == created
+    assert created[2].position == (0, 50)
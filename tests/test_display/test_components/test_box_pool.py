@@ -0,0 +1,88 @@
+"""Tests for re-using Boxes from a BoxPool."""
+
+from cocos.actions import MoveBy
+
+from shimmer.components.box import Box, BoxDefinition
+from shimmer.components.box_pool import BoxPool
+from shimmer.data_structures import Color
+from shimmer.widgets.text_box import TextBox, TextBoxDefinition
+
+
+def test_box_pool(mock_gui, subtests):
+    """Test that released Boxes are detached and re-used with the new definition."""
+    pool: BoxPool[Box, BoxDefinition] = BoxPool(Box)
+    parent = Box()
+    box = pool.acquire(BoxDefinition(width=10, height=10))
+    parent.add(box)
+    box.position = 5, 5
+    box.do(MoveBy((10, 10), 1))
+
+    with subtests.test("New Boxes are created when there are none idle."):
+        assert pool.misses == 1
+        assert box.rect.width == 10
+
+    pool.release(box)
+
+    with subtests.test("Released Boxes are detached and stopped."):
+        assert box not in parent
+        assert box.parent is None
+        assert len(pool) == 1
+        assert all(action.scheduled_to_remove for action in box.actions)
+
+    with subtests.test("Releasing a Box twice has no effect."):
+        pool.release(box)
+        assert len(pool) == 1
+
+    definition = BoxDefinition(width=20, height=30, background_color=Color(1, 2, 3))
+    reused_box = pool.acquire(definition)
+
+    with subtests.test("Idle Boxes are re-used with the new definition."):
+        assert reused_box is box
+        assert box.definition is definition
+        assert (box.rect.width, box.rect.height) == (20, 30)
+        assert box._background is not None
+        assert box.position == (0, 0)
+        assert len(pool) == 0
+
+    with subtests.test("Hit rate is reported."):
+        assert (pool.hits, pool.misses) == (1, 1)
+        assert pool.hit_rate == 0.5
+
+
+def test_box_pool_max_idle(mock_gui, subtests):
+    """Test that the pool only keeps up to the maximum number of idle Boxes."""
+    pool: BoxPool[Box, None] = BoxPool(Box, max_idle=1)
+    boxes = [pool.acquire(None) for _ in range(3)]
+    for box in boxes:
+        pool.release(box)
+
+    with subtests.test("Boxes beyond the maximum are discarded."):
+        assert len(pool) == 1
+        assert pool.discards == 2
+
+    with subtests.test("Clearing discards all idle Boxes."):
+        pool.clear()
+        assert len(pool) == 0
+        assert pool.discards == 3
+
+
+def test_text_box_reset(mock_gui, mock_font, mocker, subtests):
+    """Test that a TextBox can be reset with a new definition."""
+    text_box = TextBox(TextBoxDefinition(text="Hello"))
+    set_text = mocker.spy(text_box, "set_text")
+    update_label = mocker.spy(text_box, "_update_label")
+
+    with subtests.test("Only the text is set if only the text changes."):
+        text_box.reset(TextBoxDefinition(text="Hello, world"))
+        set_text.assert_called_once_with("Hello, world")
+        assert text_box.rect.width == 12 * 8
+
+    set_text.reset_mock()
+    update_label.reset_mock()
+
+    with subtests.test("Label is re-created if the style changes."):
+        text_box.reset(TextBoxDefinition(text="Hi", background_color=Color(1, 2, 3)))
+        set_text.assert_not_called()
+        update_label.assert_called_once()
+        assert text_box.text == "Hi"
+        assert text_box.rect.width == 2 * 8
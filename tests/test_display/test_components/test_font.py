@@ -0,0 +1,105 @@
+"""Tests for font definitions and the font metrics cache."""
+
+from dataclasses import replace
+
+import pyglet
+from mock import MagicMock
+
+from shimmer.components.font import (
+    Calibri,
+    ComicSans,
+    FontMetricsCache,
+    FontPrewarmer,
+    _FontMetricsCache,
+    prewarm_fonts,
+)
+from shimmer.data_structures import Black
+from shimmer.work_queue import WorkQueue
+
+
+def test_font_height_is_cached(mock_font):
+    """Test that the font is only loaded once no matter how often the height is read."""
+    assert Calibri.height == 20
+    assert Calibri.height == 20
+    assert mock_font.call_count == 1
+    assert Calibri in FontMetricsCache
+
+
+def test_font_color_shares_metrics(mock_font):
+    """Test that fonts differing only in color share the same cached metrics."""
+    assert replace(Calibri, color=Black).metrics is Calibri.metrics
+    assert mock_font.call_count == 1
+
+
+def test_font_metrics_advances(mock_font):
+    """Test that character advances are measured once and remembered."""
+    metrics = Calibri.metrics
+    metrics.load_advances("abca")
+    assert metrics.advance("a") == 8
+    assert metrics.advance("d") == 8
+    assert metrics._font.glyph_requests == ["abc", "d"]
+
+
+def test_font_metrics_cache_bounded_and_invalidation(mock_font, subtests):
+    """Test that the cache discards the least recently used font and can be invalidated."""
+    cache = _FontMetricsCache(max_size=1)
+
+    with subtests.test("Least recently used font is discarded when the cache is full."):
+        cache.get(Calibri)
+        cache.get(ComicSans)
+        assert Calibri not in cache
+        assert ComicSans in cache
+        assert len(cache) == 1
+
+    with subtests.test("A single font can be invalidated."):
+        cache.invalidate(ComicSans)
+        assert len(cache) == 0
+
+    with subtests.test("Invalidated fonts are re-loaded on next use."):
+        cache.get(ComicSans)
+        assert mock_font.call_count == 3
+
+
+def test_prewarm_fonts(mock_font):
+    """Test that every character of every font is rendered, and only once."""
+    prewarm_fonts([Calibri, ComicSans, replace(Calibri, color=Black)], "abc")
+    assert Calibri.metrics._font.glyph_requests == ["abc"]
+    assert ComicSans.metrics._font.glyph_requests == ["abc"]
+    assert mock_font.call_count == 2
+
+
+def test_font_prewarmer(mock_font, mocker, subtests):
+    """Test that fonts are pre-warmed in chunks by the WorkQueue."""
+    # With no time budget, one chunk is pre-warmed per frame.
+    mocker.patch.object(WorkQueue, "budget_ms", 0)
+    on_complete = MagicMock()
+    prewarmer = FontPrewarmer(
+        [Calibri, ComicSans], "abcde", chunk_size=3, on_complete=on_complete
+    )
+
+    with subtests.test("Nothing is pre-warmed until started."):
+        pyglet.clock.tick()
+        assert prewarmer.progress == 0
+        assert mock_font.call_count == 0
+
+    prewarmer.start()
+
+    with subtests.test("One chunk is pre-warmed per frame."):
+        pyglet.clock.tick()
+        assert prewarmer.progress == 0.25
+        assert Calibri.metrics._font.glyph_requests == ["abc"]
+
+    with subtests.test("Cancelling stops pre-warming."):
+        prewarmer.cancel()
+        pyglet.clock.tick()
+        assert prewarmer.progress == 0.25
+
+    with subtests.test("Pre-warming can be resumed until complete."):
+        prewarmer.start()
+        for _ in range(3):
+            pyglet.clock.tick()
+        assert prewarmer.is_complete
+        assert not prewarmer.is_running
+        assert Calibri.metrics._font.glyph_requests == ["abc", "de"]
+        assert ComicSans.metrics._font.glyph_requests == ["abc", "de"]
+        on_complete.assert_called_once_with()
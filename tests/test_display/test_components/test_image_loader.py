@@ -0,0 +1,162 @@
+"""Tests for loading images in the background."""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from mock import MagicMock
+
+from shimmer.components.image_loader import _ImageLoader, PendingImage, _ImageCache
+from shimmer.components.sprite_box import SpriteBoxDefinition
+
+
+@pytest.fixture
+def load_image(mocker):
+    """Mock out decoding images, failing for paths named "missing.png"."""
+
+    def decode(source, use_cache=True):
+        if source.name == "missing.png":
+            raise FileNotFoundError(source)
+        return MagicMock(name=str(source))
+
+    return mocker.patch(
+        "shimmer.components.image_loader.load_image", side_effect=decode
+    )
+
+
+@pytest.fixture
+def upload_image(mocker):
+    """Mock out uploading images to the graphics card, which requires a GUI."""
+    return mocker.patch("shimmer.components.image_loader.upload_image")
+
+
+def test_image_loader(load_image, upload_image, subtests):
+    """Test that images are loaded in the background and callbacks called once uploaded."""
+    loader = _ImageLoader()
+    on_loaded = MagicMock()
+    on_idle = MagicMock()
+
+    pending = loader.load(Path("kitten.png"), on_loaded)
+    missing = loader.load(Path("missing.png"))
+    loader.when_idle(on_idle)
+
+    with subtests.test("Progress is reported while loading."):
+        assert loader.is_loading
+        assert loader.total == 2
+        assert not pending.is_done
+
+    loader.wait()
+
+    with subtests.test("Loaded image is uploaded and reported."):
+        assert pending.image is not None
+        upload_image.assert_called_once_with(pending.image)
+        on_loaded.assert_called_once_with(pending)
+
+    with subtests.test("Errors are recorded on the pending image."):
+        assert missing.is_done
+        assert missing.image is None
+        assert isinstance(missing.error, FileNotFoundError)
+
+    with subtests.test("Idle callbacks are called once everything has loaded."):
+        assert not loader.is_loading
+        assert loader.progress == 1
+        on_idle.assert_called_once()
+
+    with subtests.test("Callbacks added after loading are called immediately."):
+        late_callback = MagicMock()
+        pending.add_done_callback(late_callback)
+        late_callback.assert_called_once_with(pending)
+
+
+def test_sprite_box_definition_in_background(
+    mocker, load_image, upload_image, subtests
+):
+    """Test that a SpriteBoxDefinition can load its image in the background."""
+    loader = _ImageLoader()
+    mocker.patch("shimmer.components.sprite_box.ImageLoader", loader)
+    definition = SpriteBoxDefinition(image=Path("kitten.png"), load_in_background=True)
+
+    with subtests.test("Image is pending until it has loaded."):
+        assert isinstance(definition.image, PendingImage)
+        assert not definition.is_loaded
+
+    loader.wait()
+
+    with subtests.test("Image is replaced with the loaded image."):
+        assert definition.is_loaded
+        assert definition.image is upload_image.call_args[0][0]
+
+
+def test_image_cache(mocker, tmp_path, subtests):
+    """Test that images are cached by path and modification time within the memory budget."""
+    load_image_from_path = mocker.patch(
+        "shimmer.components.image_loader.load_image_from_path",
+        side_effect=lambda path: MagicMock(width=10, height=10, name=str(path)),
+    )
+    # Enough memory for two 10x10 images.
+    cache = _ImageCache(max_bytes=2 * 10 * 10 * 4)
+    paths = [tmp_path / f"{index}.png" for index in range(3)]
+    for path in paths:
+        path.touch()
+
+    first = cache.get(paths[0])
+
+    with subtests.test("Images are re-used when the same file is loaded again."):
+        assert cache.get(tmp_path / "." / "0.png") is first
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert load_image_from_path.call_count == 1
+
+    with subtests.test("Modified files are loaded again."):
+        os.utime(paths[0], ns=(0, 0))
+        modified = cache.get(paths[0])
+        assert modified is not first
+        assert len(cache) == 1
+        assert cache.size_in_bytes == 400
+
+    with subtests.test("Least recently used images are evicted over the budget."):
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        assert cache.evictions == 1
+        assert len(cache) == 2
+        assert cache.get(paths[0]) is modified
+        assert cache.misses == 4
+
+    with subtests.test("Invalidating discards cached images."):
+        cache.invalidate(paths[0])
+        assert len(cache) == 1
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.size_in_bytes == 0
+
+
+def test_image_loader_wait_for_slow_callbacks(load_image, upload_image):
+    """Test that waiting uploads images whose decoded callbacks are slow to queue them."""
+    loader = _ImageLoader()
+    decoded = loader._decoded
+
+    class SlowQueue:
+        """Queue that is slow to have images put on it, like a busy worker thread."""
+
+        def put(self, item):
+            time.sleep(0.05)
+            decoded.put(item)
+
+        def get(self):
+            return decoded.get()
+
+        def get_nowait(self):
+            return decoded.get_nowait()
+
+    def slow_decode(source, use_cache=True):
+        time.sleep(0.01)
+        return MagicMock(name=str(source))
+
+    load_image.side_effect = slow_decode
+    loader._decoded = SlowQueue()  # type: ignore
+    pending = loader.load(Path("kitten.png"))
+    loader.wait()
+
+    assert pending.is_done
+    assert not loader.is_loading
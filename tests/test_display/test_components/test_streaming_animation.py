@@ -0,0 +1,102 @@
+"""Tests for animations that decode their frames as they are shown."""
+
+from pathlib import Path
+
+import pytest
+from mock import MagicMock
+
+from shimmer.components.sprite_box import SpriteBoxDefinition
+from shimmer.components.streaming_animation import StreamingAnimation
+
+
+@pytest.fixture
+def decode(mocker):
+    """Mock out Pillow so that a 5 frame GIF is decoded into dummy images."""
+    mocker.patch(
+        "shimmer.components.streaming_animation.PILImage",
+        **{"open.return_value.n_frames": 5},
+    )
+    return mocker.patch.object(
+        StreamingAnimation,
+        "_decode",
+        side_effect=lambda index: (MagicMock(name=f"frame {index}"), 0.1),
+    )
+
+
+def test_streaming_animation(decode, subtests):
+    """Test that frames are only decoded when shown, and a limited number are kept."""
+    animation = StreamingAnimation(Path("animation.gif"), cache_size=2)
+
+    with subtests.test("No frames are decoded up front."):
+        assert len(animation.frames) == 5
+        decode.assert_not_called()
+
+    first = animation.frames[0]
+
+    with subtests.test("Frames are decoded when accessed."):
+        decode.assert_called_once_with(0)
+        assert first.duration == 0.1
+
+    with subtests.test("Recently shown frames are cached."):
+        assert animation.frames[0].image is first.image
+        assert (animation.hits, animation.misses) == (1, 1)
+
+    with subtests.test("Least recently shown frames are discarded."):
+        animation.frames[1]
+        animation.frames[2]
+        assert animation.frames[0].image is not first.image
+        assert decode.call_count == 4
+
+    with subtests.test("Negative indices and slices are supported."):
+        assert len(animation.frames[-2:]) == 2
+        with pytest.raises(IndexError):
+            animation.frames[5]
+
+
+def test_streaming_animation_prefetch(decode):
+    """Test that upcoming frames are decoded in the background."""
+    animation = StreamingAnimation(Path("animation.gif"), prefetch=2)
+    animation.frames[4]
+    animation.close()
+    # Frames after the last one wrap around to the start.
+    assert sorted(call[0][0] for call in decode.call_args_list) == [0, 1, 4]
+
+
+def test_streaming_animation_requires_pillow(mocker):
+    """Test that a helpful error is raised if Pillow is not installed."""
+    mocker.patch("shimmer.components.streaming_animation.PILImage", None)
+    with pytest.raises(ImportError):
+        StreamingAnimation(Path("animation.gif"))
+
+    with pytest.raises(ValueError, match="shimmer\\[streaming\\]"):
+        SpriteBoxDefinition(image=Path("animation.gif"), stream_animation=True)
+
+
+def test_streaming_animation_decodes_gif(tmp_path):
+    """Test that the frames of a real GIF are decoded the right way up, in any order."""
+    pil_image = pytest.importorskip("PIL.Image")
+    red, green, blue = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+    first = pil_image.new("RGB", (2, 3), blue)
+    first.putpixel((0, 0), red)
+    first.putpixel((1, 0), red)
+    path = tmp_path / "animation.gif"
+    first.save(
+        path,
+        save_all=True,
+        append_images=[pil_image.new("RGB", (2, 3), green)],
+        duration=[50, 200],
+    )
+
+    animation = StreamingAnimation(path)
+    # Decode the second frame first, so the decoder has to go back for the first frame.
+    second_frame = animation.frames[1]
+    first_frame = animation.frames[0]
+    animation.close()
+
+    assert (first_frame.duration, second_frame.duration) == (0.05, 0.2)
+    assert (first_frame.image.width, first_frame.image.height) == (2, 3)
+    # pyglet images are stored bottom row first, so the top row of the GIF comes last.
+    data = first_frame.image.get_data("RGB", 2 * 3)
+    assert data[:6] == bytes(blue * 2)
+    assert data[-6:] == bytes(red * 2)
+    assert second_frame.image.get_data("RGB", 2 * 3) == bytes(green * 6)
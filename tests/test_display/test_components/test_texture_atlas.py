@@ -0,0 +1,44 @@
+"""Tests for packing images into the texture atlas."""
+
+from mock import MagicMock
+from pyglet.image import Animation, AnimationFrame
+from pyglet.image.atlas import AllocatorException
+
+from shimmer.components.texture_atlas import _ImageAtlas
+
+
+def test_image_atlas(mocker, subtests):
+    """Test that images and animation frames are packed into the atlas once each."""
+    texture_bin_type = mocker.patch("shimmer.components.texture_atlas.TextureBin")
+    texture_bin = texture_bin_type.return_value
+    texture_bin.add.side_effect = lambda image: MagicMock(name=f"region of {image}")
+    atlas = _ImageAtlas(page_width=512, page_height=256)
+    image = MagicMock(name="image")
+
+    with subtests.test("Atlas pages are only created once needed."):
+        assert atlas.pages == []
+        texture_bin_type.assert_not_called()
+
+    region = atlas.add(image)
+
+    with subtests.test("Images are packed into the atlas."):
+        texture_bin_type.assert_called_once_with(512, 256)
+        texture_bin.add.assert_called_once_with(image)
+        assert region is not image
+
+    with subtests.test("Adding the same image again re-uses its region."):
+        assert atlas.add(image) is region
+        assert texture_bin.add.call_count == 1
+
+    with subtests.test("Every frame of an animation is packed."):
+        frames = [AnimationFrame(MagicMock(name=str(index)), 0.1) for index in range(3)]
+        packed = atlas.add(Animation(frames))
+        assert isinstance(packed, Animation)
+        assert [frame.duration for frame in packed.frames] == [0.1] * 3
+        assert texture_bin.add.call_count == 4
+
+    with subtests.test("Images too large for the atlas are returned unchanged."):
+        texture_bin.add.side_effect = AllocatorException("Too large")
+        large_image = MagicMock(name="large image")
+        assert atlas.add(large_image) is large_image
+        assert large_image not in atlas._packed
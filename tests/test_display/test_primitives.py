@@ -0,0 +1,129 @@
+"""Tests for the updating of UpdatingNodes by the UpdateScheduler."""
+
+from typing import Any
+
+import pytest
+
+from shimmer.primitives import UpdatingNode, _UpdateScheduler
+
+
+class CountingNode(UpdatingNode):
+    """An UpdatingNode that counts how many times it has been updated."""
+
+    def __init__(self):
+        """Create a new CountingNode."""
+        super(CountingNode, self).__init__()
+        self.updates = 0
+
+    def _update(self, dt: float) -> None:
+        """Count the update."""
+        self.updates += 1
+
+
+class PollingNode(CountingNode):
+    """A CountingNode that updates whenever its value changes."""
+
+    def __init__(self):
+        """Create a new PollingNode."""
+        super(PollingNode, self).__init__()
+        self.value = 0
+
+    def _current_indicator_value(self) -> Any:
+        """Update when the value changes."""
+        return self.value
+
+
+class FailingNode(CountingNode):
+    """A CountingNode whose indicator value can't be calculated."""
+
+    def _current_indicator_value(self) -> Any:
+        """Raise an error."""
+        raise ValueError("Failed")
+
+
+@pytest.fixture
+def scheduler(mocker):
+    """Use a fresh UpdateScheduler, and don't schedule it on the pyglet clock."""
+    mocker.patch("pyglet.clock.schedule")
+    mocker.patch("pyglet.clock.unschedule")
+    scheduler = _UpdateScheduler()
+    mocker.patch("shimmer.primitives.UpdateScheduler", new=scheduler)
+    return scheduler
+
+
+def test_dirty_nodes_are_updated_once(mock_gui, scheduler):
+    """Test that only dirty nodes are visited, and only once however often they are marked."""
+    node, other = CountingNode(), CountingNode()
+    node.on_enter()
+    other.on_enter()
+    scheduler.flush(0)
+    assert (node.updates, other.updates) == (1, 1)
+    assert scheduler.polling_count == 0
+
+    node.dirty = True
+    node.dirty = True
+    assert scheduler.dirty_count == 1
+    scheduler.flush(0)
+    scheduler.flush(0)
+    assert (node.updates, other.updates) == (2, 1)
+
+
+def test_polling_nodes_update_when_indicator_changes(mock_gui, scheduler):
+    """Test that nodes implementing an indicator value are polled every frame."""
+    node = PollingNode()
+    node.on_enter()
+    assert node.is_polling
+    scheduler.flush(0)
+    scheduler.flush(0)
+    assert node.updates == 1
+
+    node.value = 1
+    scheduler.flush(0)
+    assert node.updates == 2
+
+
+def test_polling_can_be_disabled(mock_gui, scheduler):
+    """Test that nodes which mark themselves dirty aren't polled."""
+    node = PollingNode()
+    node.poll_indicator = False
+    node.on_enter()
+    scheduler.flush(0)
+    node.value = 1
+    scheduler.flush(0)
+    assert node.updates == 1
+    assert scheduler.polling_count == 0
+
+
+def test_nodes_outside_the_scene_are_not_updated(mock_gui, scheduler):
+    """Test that nodes are only updated while in the scene, and catch up when they enter it."""
+    node = PollingNode()
+    node.dirty = True
+    scheduler.flush(0)
+    assert node.updates == 0
+
+    node.on_enter()
+    scheduler.flush(0)
+    assert node.updates == 1
+
+    node.on_exit()
+    node.value = 1
+    node.dirty = True
+    scheduler.flush(0)
+    assert node.updates == 1
+    assert scheduler.dirty_count == scheduler.polling_count == 0
+
+
+def test_failing_indicators_are_logged(mock_gui, scheduler, caplog):
+    """Test that a node whose indicator raises an error doesn't stop other nodes updating."""
+    failing, polling, dirty = FailingNode(), PollingNode(), CountingNode()
+    for node in (failing, polling, dirty):
+        node.on_enter()
+    scheduler.flush(0)
+    assert (polling.updates, dirty.updates) == (1, 1)
+    assert "Failed" in caplog.text
+
+    polling.value = 1
+    dirty.dirty = True
+    scheduler.flush(0)
+    assert (polling.updates, dirty.updates) == (2, 2)
+    assert scheduler.dirty_count == 0
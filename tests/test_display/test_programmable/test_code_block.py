@@ -4,12 +4,16 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 
 import cocos
+from mock import MagicMock
+
 from shimmer.programmable.code_block import (
     CodeBlockDisplay,
     CodeBlock,
     CodeBlockDisplayDefinition,
 )
+from shimmer.programmable.instruction import InstructionDisplayDefinition
 from shimmer.programmable.logic.definition import Instruction
+from shimmer.programmable.logic.profiler import ProgramProfiler
 
 
 def test_code_block_display(run_gui, dummy_code_block):
@@ -39,3 +43,73 @@ def test_code_block_display_on_loop(run_gui):
         # Start the loop in a thread because `run_gui` blocks.
         executor.submit(loop_code_block, code_block)
         assert run_gui(test_code_block_display_on_loop, layer)
+
+
+def test_code_block_display_update_instructions(mock_gui, mock_font, subtests):
+    """Test that only displays of changed instructions are created or removed."""
+    instructions = [Instruction(method=max, args=(i, 2)) for i in range(3)]
+    code_block = CodeBlock(instructions=list(instructions))
+    display = CodeBlockDisplay(code_block, CodeBlockDisplayDefinition())
+    original_displays = {id(box.instruction): box for box in display._boxes}
+
+    new_instruction = Instruction(method=min, args=(1, 2))
+    code_block.instructions = [instructions[2], new_instruction, instructions[0]]
+    display.update_instructions()
+    # Boxes are arranged from bottom to top.
+    displays = list(reversed(display._boxes))
+
+    with subtests.test("Displays are in the same order as the instructions."):
+        assert [box.instruction for box in displays] == code_block.instructions
+        assert displays[0].y > displays[1].y > displays[2].y
+
+    with subtests.test("Displays of existing instructions are re-used."):
+        assert displays[0] is original_displays[id(instructions[2])]
+        assert displays[2] is original_displays[id(instructions[0])]
+
+    with subtests.test("Displays of removed instructions are removed."):
+        assert original_displays[id(instructions[1])] not in display.get_children()
+        assert len(display.get_children()) == 3
+
+
+def test_code_block_display_instruction_edited(mock_gui, mock_font):
+    """Test that the text of a re-used display is updated if its instruction is edited."""
+    instruction = Instruction(method=max, args=(1, 2))
+    display = CodeBlockDisplay(
+        CodeBlock(instructions=[instruction]), CodeBlockDisplayDefinition()
+    )
+    instruction_display = display._boxes[0]
+
+    instruction.method = min
+    instruction.args = (3, 4)
+    display.update_instructions()
+
+    assert display._boxes[0] is instruction_display
+    assert instruction_display.label is not None
+    assert instruction_display.label.text == "min(3, 4)"
+
+
+def test_code_block_display_show_profile(mock_gui, mock_font):
+    """Test that the heat of each instruction is shown using its mask."""
+    code_block = CodeBlock(
+        instructions=[Instruction(method=max, args=(i, 2)) for i in range(2)]
+    )
+    display = CodeBlockDisplay(code_block, CodeBlockDisplayDefinition())
+    profiler = MagicMock(spec=ProgramProfiler)
+    profiler.heat.side_effect = (
+        lambda instruction: 0.5 if instruction is code_block.instructions[0] else None
+    )
+
+    heat_opacity = InstructionDisplayDefinition().heat_mask.a // 2
+
+    display.show_profile(profiler)
+    first, second = reversed(display._boxes)
+    assert first.executing_mask is not None and second.executing_mask is not None
+    assert first.executing_mask.opacity == heat_opacity
+    assert second.executing_mask.opacity == 0
+
+    first.show_mask()
+    first.hide_mask()
+    assert first.executing_mask.opacity == heat_opacity
+
+    display.show_profile(None)
+    assert first.executing_mask.opacity == 0
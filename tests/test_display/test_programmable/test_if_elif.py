@@ -61,3 +61,32 @@ def test_if_elif_else_display_on_loop(run_gui, dummy_elif):
         # Start the loop in a thread because `run_gui` blocks.
         executor.submit(loop_code_block, dummy_elif)
         assert run_gui(test_if_elif_else_display_on_loop, layer)
+
+
+def test_if_elif_else_display_update_boxes(mock_gui, mock_font, dummy_elif, subtests):
+    """Test that existing displays are re-used when the If/Elif/Else block changes."""
+    display = IfElifElseDisplay(dummy_elif, InstructionWithBlockDisplayDefinition())
+    if_display, first_elif_display = display._boxes[-1], display._boxes[-2]
+    assert if_display.code_block_display is not None
+    code_block_display = if_display.code_block_display
+    instruction_displays = list(code_block_display._boxes)
+
+    dummy_elif.elifs.pop(1)
+    dummy_elif.code_block.instructions.pop(0)
+    display.update_boxes()
+
+    assert [box.instruction for box in reversed(display._boxes)] == [
+        dummy_elif,
+        dummy_elif.elifs[0],
+        dummy_elif.else_,
+    ]
+    assert display._boxes[-1] is if_display
+    assert display._boxes[-2] is first_elif_display
+    assert if_display.code_block_display is code_block_display
+    assert code_block_display._boxes == instruction_displays[:-1]
+
+    with subtests.test("The text of an edited If instruction is updated."):
+        dummy_elif.args = (True,)
+        display.update_boxes()
+        assert if_display.instruction_display is not None
+        assert "True" in if_display.instruction_display.definition.text
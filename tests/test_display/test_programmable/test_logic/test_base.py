@@ -2,7 +2,7 @@
 
 import pytest
 
-from shimmer.programmable.logic.base import Programmable
+from shimmer.programmable.logic.base import Programmable, MethodInfo
 
 
 def return_true() -> bool:
@@ -32,3 +32,70 @@ def test_bool_methods(dummy_programmable: Programmable) -> None:
     assert len(bool_methods) == 2
     assert return_false in bool_methods
     assert return_true in bool_methods
+
+
+def add(a: int, b: int, c: int = 0) -> int:
+    """Add some numbers."""
+    return a + b + c
+
+
+def is_positive(a: "int") -> "bool":
+    """Return True if the number is positive, with string annotations."""
+    return a > 0
+
+
+def test_method_registry(dummy_programmable, mocker, subtests):
+    """Test that method information is calculated once and can be queried."""
+    inspect_method = mocker.spy(MethodInfo, "from_method")
+    dummy_programmable.methods |= {add, is_positive, max}
+    registry = dummy_programmable.registry
+
+    with subtests.test("Methods are inspected once."):
+        assert len(registry) == 6
+        dummy_programmable.registry
+        assert inspect_method.call_count == 6
+
+    with subtests.test("The registry is only updated after the methods change."):
+        update = mocker.spy(registry, "update")
+        dummy_programmable.registry
+        update.assert_not_called()
+
+    with subtests.test("Method information is calculated."):
+        info = registry[add]
+        assert info.display_name == "add"
+        assert info.arity == 2
+        assert info.return_type is int
+        assert registry[max].return_type is None
+
+    with subtests.test("Methods can be queried by name, arity and return type."):
+        assert registry.by_name("is_positive") is registry[is_positive]
+        assert registry.by_name("missing") is None
+        assert registry.all_by_name("add") == [registry[add]]
+        assert {info.method for info in registry.by_arity(0)} == {
+            return_true,
+            return_false,
+            return_str,
+            max,
+        }
+        assert {info.method for info in registry.bool_methods} == {
+            return_true,
+            return_false,
+            is_positive,
+        }
+
+    with subtests.test("Registry is updated when methods are removed."):
+        dummy_programmable.methods -= {is_positive, add}
+        assert is_positive not in dummy_programmable.registry
+        assert registry.by_name("add") is None
+        assert registry.by_arity(2) == []
+        assert len(list(dummy_programmable.bool_methods)) == 2
+        assert inspect_method.call_count == 6
+
+
+def test_method_registry_changed_in_place(dummy_programmable):
+    """Test that the registry is updated after the methods are changed in place."""
+    assert add not in dummy_programmable.registry
+    dummy_programmable.methods.add(add)
+    assert add not in dummy_programmable.registry
+    dummy_programmable.invalidate_registry()
+    assert add in dummy_programmable.registry
@@ -0,0 +1,224 @@
+"""Tests for running many programs together."""
+
+from typing import List, cast
+
+from mock import MagicMock, call
+
+from shimmer.programmable.logic.batch import BatchRunner, compile_batch
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    IfElifElse,
+    Program,
+    Else,
+    Elif,
+)
+
+
+class Unit:
+    """A unit whose program is run as part of a batch."""
+
+    def __init__(self, health: int):
+        """Create a unit with the given health."""
+        self.health = health
+        self.actions: List[str] = []
+
+    def is_healthy(self) -> bool:
+        """Return True if the unit is healthy."""
+        return self.health > 50
+
+    def is_alive(self) -> bool:
+        """Return True if the unit is alive."""
+        return self.health > 0
+
+    def act(self, action: str) -> None:
+        """Record that the unit acted."""
+        self.actions.append(action)
+
+
+def make_unit_program(unit: Unit) -> Program:
+    """Create the program of a unit, which acts differently depending on its health."""
+    return Program(
+        "unit",
+        CodeBlock(
+            instructions=[
+                Instruction(method=unit.act, args=("start",)),
+                IfElifElse(
+                    method=unit.is_healthy,
+                    code_block=CodeBlock([Instruction(unit.act, args=("attack",))]),
+                    elifs=[
+                        Elif(
+                            method=unit.is_alive,
+                            code_block=CodeBlock([Instruction(unit.act, ("flee",))]),
+                        )
+                    ],
+                    else_=Else(code_block=CodeBlock([Instruction(unit.act, ("die",))])),
+                ),
+            ]
+        ),
+    )
+
+
+def test_batch_runner(subtests):
+    """Test that programs run in a batch behave the same as running them individually."""
+    units = [Unit(health) for health in (100, 20, 0, 70)]
+    runner = BatchRunner()
+    programs = [make_unit_program(unit) for unit in units]
+    for program in programs:
+        runner.add(program)
+    other_method = MagicMock(return_value=True)
+    other = Program("other", CodeBlock([If(method=other_method)]))
+    runner.add(other)
+
+    with subtests.test("Programs with the same structure are grouped."):
+        assert len(runner) == 5
+        assert runner.group_count == 2
+
+    runner.run()
+
+    with subtests.test("Each program takes the branch of its own conditions."):
+        assert [unit.actions for unit in units] == [
+            ["start", "attack"],
+            ["start", "flee"],
+            ["start", "die"],
+            ["start", "attack"],
+        ]
+        other_method.assert_called_once_with()
+
+    with subtests.test("Throughput of the run is reported."):
+        assert runner.units_run == 5
+        assert runner.units_per_second > 0
+
+    with subtests.test("Programs can be removed from the batch."):
+        runner.remove(programs[0])
+        runner.remove(other)
+        runner.remove(other)
+        assert len(runner) == 3
+        assert runner.group_count == 1
+        runner.run()
+        assert units[0].actions == ["start", "attack"]
+        assert units[1].actions == ["start", "flee"] * 2
+
+
+def test_batch_runner_callbacks():
+    """Test that callbacks are called the same as running the programs individually."""
+    interpreted_calls = MagicMock()
+    batched_calls = MagicMock()
+    for calls in (interpreted_calls, batched_calls):
+        if_ = If(method=lambda: True, code_block=CodeBlock([Instruction(lambda: 1)]))
+        if_.on_execute_start = calls.start
+        if_.on_execute_complete = calls.complete
+        program = Program("test", CodeBlock([if_]))
+        if calls is interpreted_calls:
+            program.run()
+        else:
+            runner = BatchRunner()
+            runner.add(program)
+            runner.run()
+
+    assert batched_calls.mock_calls == interpreted_calls.mock_calls
+    assert batched_calls.mock_calls == [call.start(), call.complete()] * 2
+
+
+def test_batch_runner_regroup():
+    """Test that programs are grouped again after they change."""
+    runner = BatchRunner()
+    programs = [Program(str(index), CodeBlock()) for index in range(2)]
+    for program in programs:
+        runner.add(program)
+    assert runner.group_count == 1
+
+    programs[0].code_block.instructions.append(Instruction(method=lambda: None))
+    runner.regroup()
+    assert runner.group_count == 2
+
+
+def test_compile_batch(subtests):
+    """Test that a compiled batch gives the same results as running each program."""
+
+    def make_code_block(value: int) -> CodeBlock:
+        return CodeBlock(
+            [
+                If(
+                    method=bool,
+                    args=(value % 2,),
+                    code_block=CodeBlock(
+                        [
+                            If(
+                                method=bool,
+                                args=(value % 3,),
+                                code_block=CodeBlock([Instruction(abs, (-value,))]),
+                            )
+                        ]
+                    ),
+                ),
+                Instruction(method=max, args=(value, 4)),
+            ]
+        )
+
+    interpreted = [make_code_block(value) for value in range(8)]
+    batched = [make_code_block(value) for value in range(8)]
+    for code_block in interpreted:
+        code_block.run()
+    batch = compile_batch(batched)
+    batch.run()
+
+    with subtests.test("Results of every instruction match running them individually."):
+        assert str(batched) == str(interpreted)
+
+    with subtests.test("The generated source is available for debugging."):
+        assert "def run():" in str(batch)
+
+
+def test_batch_runner_failures(caplog, subtests):
+    """Test that a program that raises an exception is stopped without affecting the others."""
+    units = [Unit(health) for health in (100, 20, 70)]
+    programs = [make_unit_program(unit) for unit in units]
+    # The second unit fails when checking its health, and the third when it attacks.
+    error = ValueError("No health")
+    programs[1].code_block.instructions[1].method = MagicMock(side_effect=error)
+    attack = cast(If, programs[2].code_block.instructions[1]).code_block.instructions[0]
+    attack.on_execute_start = MagicMock(side_effect=KeyError("attack"))
+    other_method = MagicMock(return_value=True)
+    other = Program("other", CodeBlock([If(method=other_method)]))
+    runner = BatchRunner()
+    for program in [*programs, other]:
+        runner.add(program)
+
+    runner.run()
+
+    with subtests.test("Failed programs are stopped at the failing instruction."):
+        assert [unit.actions for unit in units] == [
+            ["start", "attack"],
+            ["start"],
+            ["start"],
+        ]
+        assert runner.error_of(programs[1]) is error
+        assert isinstance(runner.error_of(programs[2]), KeyError)
+        assert runner.failed_count == 2
+        assert "Program 'unit' failed" in caplog.text
+
+    with subtests.test("Other programs are unaffected."):
+        assert not runner.has_failed(programs[0])
+        assert runner.error_of(other) is None
+        other_method.assert_called_once_with()
+        assert runner.units_run == 4
+
+    with subtests.test("Failed programs aren't run again."):
+        runner.regroup()
+        runner.run()
+        assert [unit.actions for unit in units] == [
+            ["start", "attack"] * 2,
+            ["start"],
+            ["start"],
+        ]
+        assert runner.units_run == 2
+
+    with subtests.test("Failed programs are run again once they are added again."):
+        programs[1].code_block.instructions[1].method = units[1].is_healthy
+        runner.add(programs[1])
+        runner.run()
+        assert not runner.has_failed(programs[1])
+        assert units[1].actions == ["start", "start", "flee"]
+        assert runner.failed_count == 1
@@ -0,0 +1,135 @@
+"""Tests for caching the results of instruction methods."""
+
+import gc
+
+from mock import MagicMock
+
+from shimmer.programmable.logic.cache import (
+    _InstructionCache,
+    pure,
+    tick_cached,
+    cache_mode,
+    CacheMode,
+)
+from shimmer.programmable.logic.compiler import compile_program
+from shimmer.programmable.logic.definition import Instruction, CodeBlock, Program
+
+
+class Unit:
+    """A unit with methods that can be cached."""
+
+    def __init__(self):
+        """Create a new Unit."""
+        self.calls = 0
+
+    @tick_cached
+    def is_enemy_near(self, distance: int) -> bool:
+        """Count the number of times this is called."""
+        self.calls += 1
+        return distance > 5
+
+    @pure
+    def double(self, value: int) -> int:
+        """Count the number of times this is called."""
+        self.calls += 1
+        return value * 2
+
+
+def test_instruction_cache(mocker, subtests):
+    """Test that results of cacheable methods are re-used until the tick ends."""
+    schedule_once = mocker.patch("pyglet.clock.schedule_once")
+    cache = _InstructionCache()
+    unit = Unit()
+
+    with subtests.test("Methods can be marked as cacheable."):
+        assert cache_mode(unit.is_enemy_near) is CacheMode.tick
+        assert cache_mode(unit.double) is CacheMode.pure
+        assert cache_mode(max) is None
+
+    with subtests.test("Results are re-used for the same arguments."):
+        assert cache.call(unit.is_enemy_near, (10,)) is True
+        assert cache.call(unit.is_enemy_near, (10,)) is True
+        assert cache.call(unit.is_enemy_near, (1,)) is False
+        assert unit.calls == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert cache.hit_rate == 1 / 3
+
+    with subtests.test("Clearing the cache is scheduled for the next tick."):
+        schedule_once.assert_called_once_with(cache._end_tick, 0)
+
+    with subtests.test("Tick cached results are discarded when the tick ends."):
+        cache.call(unit.double, (2,))
+        cache._end_tick(0)
+        assert len(cache) == 1
+        cache.call(unit.is_enemy_near, (10,))
+        assert unit.calls == 4
+
+    with subtests.test("Pure results are kept until invalidated."):
+        cache.call(unit.double, (2,))
+        assert unit.calls == 4
+        cache.invalidate(unit.double)
+        cache.call(unit.double, (2,))
+        assert unit.calls == 5
+        cache.invalidate()
+        assert len(cache) == 0
+
+    with subtests.test(
+        "Methods that aren't marked, or unhashable arguments, aren't cached."
+    ):
+        method = MagicMock()
+        cache.call(method, (1,))
+        cache.call(method, (1,))
+        cache.call(unit.double, ([1],))
+        cache.call(unit.double, ([1],))
+        assert method.call_count == 2
+        assert len(cache) == 0
+
+
+def test_pure_results_are_limited(subtests):
+    """Test that results of pure methods don't keep growing in a long running game."""
+    cache = _InstructionCache(max_pure_results=2)
+    unit = Unit()
+
+    with subtests.test("Only the most recently used results of each method are kept."):
+        for value in (1, 2, 1, 3):
+            cache.call(unit.double, (value,))
+        assert len(cache) == 2
+        cache.call(unit.double, (1,))
+        cache.call(unit.double, (2,))
+        assert unit.calls == 4
+
+    with subtests.test("Results are discarded when the object is garbage collected."):
+        other = Unit()
+        cache.call(other.double, (1,))
+        assert len(cache) == 3
+        del unit
+        gc.collect()
+        assert len(cache) == 1
+
+    with subtests.test(
+        "Results of one object are invalidated without affecting others."
+    ):
+        another = Unit()
+        cache.call(another.double, (1,))
+        cache.invalidate(other.double)
+        assert len(cache) == 1
+        cache.call(another.double, (1,))
+        assert another.calls == 1
+
+
+def test_instruction_uses_cache(mocker):
+    """Test that instructions re-use cached results, whether compiled or not."""
+    mocker.patch("pyglet.clock.schedule_once")
+    cache = _InstructionCache()
+    mocker.patch("shimmer.programmable.logic.definition.InstructionCache", cache)
+    unit = Unit()
+    program = Program(
+        "test_program",
+        CodeBlock([Instruction(unit.is_enemy_near, args=(10,)) for _ in range(3)]),
+    )
+
+    program.run()
+    compile_program(program).run()
+
+    assert unit.calls == 1
+    assert cache.hits == 5
@@ -0,0 +1,103 @@
+"""Tests for compiling programs into Python functions."""
+
+from mock import MagicMock, call
+
+from shimmer.programmable.logic.compiler import compile_program
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    IfElifElse,
+    Program,
+    Else,
+    NOT_YET_RUN,
+)
+from .test_definition import (
+    make_dummy_code_block,
+    make_dummy_elif_block,
+    assert_code_block_called,
+    assert_code_block_not_called,
+    return_false,
+    return_true,
+)
+
+
+def test_compiled_program(subtests):
+    """Test that a compiled program runs the same instructions as the interpreted program."""
+    code_block, elif_block, else_block = (make_dummy_code_block() for _ in range(3))
+    elifs = [make_dummy_elif_block(False), make_dummy_elif_block(True)]
+    program = Program(
+        "test_program",
+        CodeBlock(
+            instructions=[
+                Instruction(method=max, args=(2, 5)),
+                If(method=return_false, code_block=code_block),
+                IfElifElse(
+                    method=return_false,
+                    code_block=elif_block,
+                    elifs=elifs,
+                    else_=Else(code_block=else_block),
+                ),
+            ]
+        ),
+    )
+    compiled = compile_program(program)
+    compiled.run()
+    max_ins, if_, if_elif_else = program.code_block.instructions
+
+    with subtests.test("Results of instructions are recorded."):
+        assert max_ins.result == 5
+        assert if_.result is False
+
+    with subtests.test("Only the code blocks of true conditions are run."):
+        assert_code_block_not_called(code_block)
+        assert_code_block_not_called(elif_block)
+        assert_code_block_not_called(elifs[0].code_block)
+        assert_code_block_called(elifs[1].code_block)
+        assert_code_block_not_called(else_block)
+        assert isinstance(if_elif_else, IfElifElse)
+        assert if_elif_else.else_.result is NOT_YET_RUN
+
+    with subtests.test("Else block is run if no condition is true."):
+        elifs[1].method = return_false
+        compile_program(program).run()
+        assert_code_block_called(else_block)
+
+
+def test_compiled_program_callbacks(subtests):
+    """Test that callbacks are called in the same order as the interpreted program."""
+    if_ = If(method=return_true, code_block=make_dummy_code_block())
+    program = Program("test_program", CodeBlock(instructions=[if_]))
+
+    with subtests.test("Programs without callbacks have no instrumentation."):
+        assert "cb" not in compile_program(program).source
+
+    calls = MagicMock()
+    if_.on_execute_start = calls.start
+    if_.on_execute_complete = calls.complete
+    program.run()
+    interpreted_calls = calls.mock_calls
+    calls.reset_mock()
+
+    compile_program(program).run()
+
+    with subtests.test("Callbacks are called at the same points."):
+        assert calls.mock_calls == interpreted_calls
+        assert calls.mock_calls == [call.start(), call.complete()] * 2
+
+
+def test_compiled_custom_instruction():
+    """Test that unknown instruction types are run by calling their execute method."""
+
+    class CustomInstruction(Instruction):
+        executed = False
+
+        def execute(self):
+            self.executed = True
+
+    instruction = CustomInstruction(method=return_true)
+    compile_program(
+        Program("test_program", CodeBlock(instructions=[instruction]))
+    ).run()
+    assert instruction.executed
+    assert instruction.result is NOT_YET_RUN
@@ -0,0 +1,176 @@
+"""Tests for running programs over multiple frames."""
+
+import pytest
+from mock import MagicMock, call
+
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    IfElifElse,
+    Program,
+    Else,
+    NOT_YET_RUN,
+)
+from shimmer.programmable.logic.executor import ProgramExecutor
+from .test_definition import (
+    make_dummy_code_block,
+    make_dummy_elif_block,
+    assert_code_block_called,
+    assert_code_block_not_called,
+    return_false,
+    return_true,
+)
+
+
+def make_program() -> Program:
+    """Create a program with 8 instructions that are run."""
+    return Program(
+        "test_program",
+        CodeBlock(
+            instructions=[
+                Instruction(method=max, args=(2, 5)),
+                If(method=return_true, code_block=make_dummy_code_block()),
+                IfElifElse(
+                    method=return_false,
+                    code_block=make_dummy_code_block(),
+                    elifs=[make_dummy_elif_block(False)],
+                    else_=Else(code_block=CodeBlock()),
+                ),
+            ]
+        ),
+    )
+
+
+def test_executor_steps(subtests):
+    """Test that stepping runs the program one instruction at a time."""
+    program = make_program()
+    max_ins, if_, if_elif_else = program.code_block.instructions
+    assert isinstance(if_, If) and isinstance(if_elif_else, IfElifElse)
+    on_complete = MagicMock()
+    executor = ProgramExecutor(program, on_complete=on_complete)
+
+    with subtests.test("Each step runs a single instruction."):
+        assert executor.step()
+        assert executor.current_instruction is max_ins
+        assert max_ins.result == 5
+        assert if_.result is NOT_YET_RUN
+        assert executor.is_paused
+
+        assert executor.step()
+        assert executor.current_instruction is if_
+        assert_code_block_not_called(if_.code_block)
+
+    with subtests.test("Code blocks of true conditions are stepped through."):
+        for instruction in if_.code_block.instructions:
+            executor.step()
+            assert executor.current_instruction is instruction
+
+    with subtests.test("Program completes after all instructions are run."):
+        executor.run_to_completion()
+        assert_code_block_not_called(if_elif_else.code_block)
+        assert_code_block_not_called(if_elif_else.elifs[0].code_block)
+        assert if_elif_else.else_.result is True
+        assert not executor.is_running
+        on_complete.assert_called_once_with()
+
+    with subtests.test("Stepping a completed program runs it again."):
+        assert executor.step()
+        assert executor.current_instruction is max_ins
+
+
+def test_executor_callbacks():
+    """Test that callbacks are called in the same order as running the program directly."""
+    if_ = If(method=return_true, code_block=make_dummy_code_block())
+    calls = MagicMock()
+    if_.on_execute_start = calls.start
+    if_.on_execute_complete = calls.complete
+    executor = ProgramExecutor(Program("test_program", CodeBlock(instructions=[if_])))
+
+    executor.step()
+    assert calls.mock_calls == [call.start()]
+
+    executor.run_to_completion()
+    assert calls.mock_calls == [call.start(), call.complete()] * 2
+
+    with_stop = MagicMock()
+    if_.on_execute_complete = with_stop.complete
+    executor.step()
+    executor.stop()
+    with_stop.complete.assert_called_once_with()
+
+
+def test_executor_budget(mocker, subtests):
+    """Test that the program is advanced on each tick within the budget."""
+    schedule = mocker.patch("pyglet.clock.schedule")
+    unschedule = mocker.patch("pyglet.clock.unschedule")
+    program = make_program()
+    if_ = program.code_block.instructions[1]
+    assert isinstance(if_, If)
+    executor = ProgramExecutor(program, instructions_per_frame=3, time_budget=None)
+
+    executor.start()
+
+    with subtests.test("Program is advanced on the pyglet clock."):
+        schedule.assert_called_once_with(executor._on_tick)
+        assert executor.is_running and not executor.is_paused
+
+    with subtests.test("Only the budgeted number of instructions run each tick."):
+        executor._on_tick(0)
+        assert executor.current_instruction is if_.code_block.instructions[0]
+        executor._on_tick(0)
+        assert_code_block_called(if_.code_block)
+
+    with subtests.test("Paused programs are not advanced."):
+        executor.pause()
+        unschedule.assert_called_once_with(executor._on_tick)
+        assert executor.is_paused
+        executor.resume()
+        assert schedule.call_count == 2
+
+    with subtests.test("Program is unscheduled once complete."):
+        executor._on_tick(0)
+        assert not executor.is_running
+        assert unschedule.call_count == 2
+
+    with subtests.test(
+        "At least one instruction is run per tick with any time budget."
+    ):
+        executor = ProgramExecutor(make_program(), time_budget=0)
+        executor.start()
+        executor._on_tick(0)
+        assert (
+            executor.current_instruction is executor.program.code_block.instructions[0]
+        )
+
+
+def test_executor_error(subtests):
+    """Test that the program is stopped, and not reported as complete, if it raises."""
+    on_complete = MagicMock()
+    failing = Instruction(method=max)
+    after = Instruction(method=max, args=(1, 2))
+    executor = ProgramExecutor(
+        Program("test_program", CodeBlock(instructions=[failing, after])),
+        on_complete=on_complete,
+    )
+
+    with subtests.test("The exception is raised and stored."):
+        with pytest.raises(TypeError):
+            executor.step()
+        assert isinstance(executor.error, TypeError)
+        assert executor.has_failed
+        assert not executor.is_running
+
+    with subtests.test("The program doesn't continue or complete once failed."):
+        assert not executor.step()
+        on_complete.assert_not_called()
+        assert after.result is NOT_YET_RUN
+
+    with subtests.test("Starting the program again clears the error."):
+        failing.method = min
+        failing.args = (1, 2)
+        executor.start()
+        executor.pause()
+        executor.run_to_completion()
+        assert not executor.has_failed
+        on_complete.assert_called_once_with()
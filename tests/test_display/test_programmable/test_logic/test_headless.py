@@ -0,0 +1,168 @@
+"""Tests for running programs in worker processes."""
+
+import time
+from typing import Callable
+
+from shimmer.programmable.logic.base import MethodRegistry
+from shimmer.programmable.logic.cache import pure
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    Program,
+    NOT_YET_RUN,
+)
+from shimmer.programmable.logic.headless import (
+    HeadlessRunner,
+    RunSummary,
+    apply_results,
+    run_program,
+)
+from .test_definition import return_true, return_false
+
+
+def slow() -> None:
+    """Take longer than the timeout used in these tests."""
+    time.sleep(0.2)
+
+
+def hang() -> None:
+    """Take far longer than any timeout used in these tests, without returning."""
+    time.sleep(60)
+
+
+def fail() -> None:
+    """Raise an error."""
+    raise ValueError("Failed")
+
+
+calls = 0
+
+
+@pure
+def count_calls() -> int:
+    """Return the number of times this has been called, which is only cached by mistake."""
+    global calls
+    calls += 1
+    return calls
+
+
+def make_program(name: str, *methods: Callable) -> Program:
+    """Create a program that runs the given methods inside an If block."""
+    return Program(
+        name,
+        CodeBlock(
+            [
+                If(
+                    method=return_true,
+                    code_block=CodeBlock([Instruction(method) for method in methods]),
+                )
+            ]
+        ),
+    )
+
+
+def test_run_program_limits(subtests):
+    """Test that programs are stopped once they reach their limits."""
+    with subtests.test("Programs that finish are completed."):
+        result = run_program(make_program("ok", return_true), None, None)
+        assert result.completed
+        assert result.instructions_run == 2
+        assert result.results == {0: True, 1: True}
+
+    with subtests.test("Programs are stopped after the instruction limit."):
+        program = make_program("long", *[return_true] * 5)
+        result = run_program(program, None, 3)
+        assert result.hit_instruction_limit
+        assert not result.completed
+        assert result.instructions_run == 3
+
+    with subtests.test("Programs are stopped after the timeout."):
+        result = run_program(make_program("slow", slow, slow), 0.1, None)
+        assert result.timed_out
+        assert result.instructions_run == 2
+
+    with subtests.test("Errors are reported."):
+        result = run_program(make_program("fail", fail), None, None)
+        assert result.error == "ValueError: Failed"
+        assert not result.completed
+
+    with subtests.test("Cached results aren't shared between programs."):
+        first = run_program(make_program("first", count_calls), None, None)
+        second = run_program(make_program("second", count_calls), None, None)
+        assert first.results[1] + 1 == second.results[1]
+
+
+def test_headless_runner(subtests):
+    """Test that programs are run in worker processes and their results gathered."""
+    programs = [
+        make_program("ok", return_true, return_false),
+        make_program("unpicklable", lambda: None),
+        make_program("fail", fail),
+    ]
+    with HeadlessRunner(max_workers=2, timeout=None) as runner:
+        results = runner.run(programs)
+
+    with subtests.test("Results are returned in the same order as the programs."):
+        assert [result.name for result in results] == ["ok", "unpicklable", "fail"]
+        assert results[0].completed
+        assert results[2].error == "ValueError: Failed"
+
+    with subtests.test("Programs that can't be sent to workers are reported."):
+        assert results[1].error is not None
+        assert results[1].instructions_run == 0
+
+    with subtests.test("Results can be applied to the original programs."):
+        if_ = programs[0].code_block.instructions[0]
+        assert if_.result is NOT_YET_RUN
+        apply_results(programs[0], results[0])
+        assert if_.result is True
+
+    with subtests.test("Results are summarised."):
+        summary = RunSummary.from_results(results)
+        assert (summary.total, summary.completed, summary.errors) == (3, 1, 2)
+        assert summary.instructions_run == 4
+
+
+def test_headless_runner_registry():
+    """Test that programs can be run with a registry of methods shared by every program."""
+    registry = MethodRegistry([return_true, return_false])
+    programs = [make_program(str(index), return_false) for index in range(3)]
+    with HeadlessRunner(max_workers=2, timeout=None) as runner:
+        results = runner.run(programs, registry)
+    assert [result.results for result in results] == [{0: True, 1: False}] * 3
+
+
+def test_headless_runner_without_timeout():
+    """Test that programs can run for any length of time when there is no timeout."""
+    # Each program finishes while the longer ones are still running, so the runner checks
+    # programs that have been reported as started.
+    programs = [
+        Program(str(duration), CodeBlock([Instruction(time.sleep, (duration,))]))
+        for duration in (0.1, 0.5, 1.0)
+    ]
+    with HeadlessRunner(max_workers=3, timeout=None, grace=0) as runner:
+        results = runner.run(programs)
+    assert [result.completed for result in results] == [True, True, True]
+    assert not any(result.timed_out for result in results)
+
+
+def test_headless_runner_stuck_program(subtests):
+    """Test that programs stuck in a method that never returns are stopped."""
+    programs = [make_program("stuck", hang), make_program("ok", return_true)]
+    with HeadlessRunner(max_workers=1, timeout=0.1, grace=0.1) as runner:
+        start = time.perf_counter()
+        results = runner.run(programs)
+
+        with subtests.test("Stuck programs are reported as timed out."):
+            assert time.perf_counter() - start < 10
+            assert results[0].timed_out
+            assert not results[0].completed
+
+        with subtests.test("Programs queued behind the stuck program are still run."):
+            assert results[1].completed
+
+        with subtests.test(
+            "The runner can be used again after its workers are replaced."
+        ):
+            assert runner.run([programs[1]])[0].completed
@@ -0,0 +1,79 @@
+"""Tests for profiling the instructions of programs."""
+
+from itertools import count
+
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    Program,
+)
+from shimmer.programmable.logic.profiler import ProgramProfiler
+from .test_definition import return_false, return_true
+
+
+def make_program() -> Program:
+    """Create a program with an If block containing two instructions."""
+    return Program(
+        "test_program",
+        CodeBlock(
+            instructions=[
+                If(
+                    method=return_true,
+                    code_block=CodeBlock(
+                        instructions=[
+                            Instruction(method=max, args=(1, 2)),
+                            Instruction(method=max, args=(3, 4)),
+                        ]
+                    ),
+                ),
+                Instruction(method=return_false),
+            ]
+        ),
+    )
+
+
+def test_profiler(mocker, subtests):
+    """Test that call counts, times and results are recorded for nested instructions."""
+    # Each time measurement is a second after the previous one.
+    mocker.patch(
+        "shimmer.programmable.logic.profiler.time"
+    ).perf_counter.side_effect = count()
+    program = make_program()
+    if_, false_ins = program.code_block.instructions
+    assert isinstance(if_, If)
+    first_ins, second_ins = if_.code_block.instructions
+
+    with ProgramProfiler(program) as profiler:
+        program.run()
+
+    with subtests.test("Cumulative and self time are recorded."):
+        if_stats = profiler.stats_for(if_)
+        assert if_stats.calls == 1
+        assert if_stats.cumulative_time == 5
+        assert if_stats.self_time == 3
+        assert profiler.stats_for(first_ins).self_time == 1
+
+    with subtests.test("Results are counted."):
+        assert if_stats.results == {True: 1}
+        assert profiler.stats_for(false_ins).results == {False: 1}
+
+    with subtests.test("Heat is relative to the hottest instruction."):
+        assert profiler.heat(if_) == 1
+        assert profiler.heat(second_ins) == 1 / 3
+
+    with subtests.test("Report lists the hottest instructions first."):
+        lines = profiler.report().splitlines()
+        assert len(lines) == 5
+        assert lines[1].endswith("if return_true() -> True:")
+
+    with subtests.test("Instructions are not profiled once disabled."):
+        assert not profiler.is_enabled
+        assert "execute" not in vars(if_)
+        program.run()
+        assert profiler.stats_for(if_).calls == 1
+
+    with subtests.test("Resetting discards the stats."):
+        profiler.reset()
+        assert profiler.stats_for(if_).calls == 0
+        assert profiler.heat(if_) is None
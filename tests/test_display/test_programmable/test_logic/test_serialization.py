@@ -0,0 +1,146 @@
+"""Tests for encoding and decoding programs."""
+
+import io
+
+import pytest
+
+from shimmer.programmable.logic.base import MethodRegistry
+from shimmer.programmable.logic.definition import (
+    Instruction,
+    CodeBlock,
+    If,
+    IfElifElse,
+    Program,
+    Else,
+    Elif,
+)
+from shimmer.programmable.logic.serialization import (
+    dump,
+    dumps,
+    load,
+    loads,
+    iter_load,
+    _LazyCodeBlock,
+)
+from .test_definition import return_false, return_true
+
+
+def make_program() -> Program:
+    """Create a program using every type of instruction."""
+    return Program(
+        "test_program",
+        CodeBlock(
+            instructions=[
+                Instruction(method=max, args=(2, 5)),
+                IfElifElse(
+                    method=return_false,
+                    code_block=CodeBlock([Instruction(method=return_true)]),
+                    elifs=[
+                        Elif(
+                            method=return_true,
+                            code_block=CodeBlock(
+                                [If(method=return_true, code_block=CodeBlock())]
+                            ),
+                        )
+                    ],
+                    else_=Else(
+                        code_block=CodeBlock([Instruction(method=return_false)])
+                    ),
+                ),
+            ]
+        ),
+    )
+
+
+@pytest.fixture
+def registry() -> MethodRegistry:
+    """Registry of the methods used by the test program."""
+    return MethodRegistry([max, return_true, return_false])
+
+
+def test_round_trip(registry, subtests):
+    """Test that programs are the same after being encoded and decoded."""
+    program = make_program()
+    encoded = dumps(program, registry)
+
+    with subtests.test("Program is encoded with a header and a line per instruction."):
+        lines = encoded.splitlines()
+        assert lines[0] == '{"version":1,"name":"test_program"}'
+        assert lines[1] == '["i","max",[2,5]]'
+        assert len(lines) == 3
+
+    decoded = loads(encoded, registry)
+
+    with subtests.test("Nested code blocks are decoded when accessed."):
+        if_elif_else = decoded.code_block.instructions[1]
+        assert isinstance(if_elif_else, IfElifElse)
+        assert isinstance(if_elif_else.code_block, _LazyCodeBlock)
+        assert not if_elif_else.code_block.is_decoded
+        assert if_elif_else.code_block.instructions[0].method is return_true
+        assert if_elif_else.code_block.is_decoded
+
+    with subtests.test("Decoded program is equal to the original."):
+        assert decoded == program
+        decoded.run()
+        assert decoded.code_block.instructions[0].result == 5
+
+    with subtests.test("Programs can be written to and read from files."):
+        file = io.StringIO()
+        dump(program, file, registry)
+        file.seek(0)
+        assert load(file, registry) == program
+
+
+def test_iter_load(registry):
+    """Test that top level instructions are decoded one at a time."""
+    lines = iter(dumps(make_program(), registry).splitlines())
+    instructions = iter_load(lines, registry)
+
+    assert next(instructions).method is max
+    assert next(lines, None) is not None
+    assert list(instructions) == []
+
+
+def test_arguments(registry, subtests):
+    """Test that arguments are decoded with the same types they were encoded with."""
+    args = ((1, [2, (3, "a")]), {"key": (None,)}, [4.5])
+    program = Program("test", CodeBlock([Instruction(method=max, args=args)]))
+
+    with subtests.test("Tuples within arguments are decoded as tuples."):
+        decoded = loads(dumps(program, registry), registry)
+        assert decoded.code_block.instructions[0].args == args
+
+    with subtests.test("Arguments that would be decoded as tuples are rejected."):
+        program.code_block.instructions[0].args = ({"__tuple__": [1]},)
+        with pytest.raises(ValueError):
+            dumps(program, registry)
+
+
+class Unit:
+    """A unit with a method of the same name as that of every other unit."""
+
+    def act(self) -> None:
+        """Do nothing."""
+
+
+def test_invalid_programs(registry, subtests):
+    """Test that programs that can't be encoded or decoded are reported."""
+    with subtests.test("Methods must be registered to be encoded."):
+        with pytest.raises(ValueError):
+            dumps(Program("test", CodeBlock([Instruction(method=min)])), registry)
+
+    with subtests.test("Methods must have a unique name to be encoded."):
+        first, second = Unit(), Unit()
+        units_registry = MethodRegistry([first.act, second.act])
+        program = Program("test", CodeBlock([Instruction(method=first.act)]))
+        with pytest.raises(ValueError):
+            dumps(program, units_registry)
+
+    with subtests.test("Methods must be registered to be decoded."):
+        encoded = dumps(make_program(), registry)
+        with pytest.raises(ValueError):
+            loads(encoded, MethodRegistry([return_true]))
+
+    with subtests.test("Other versions of the format are rejected."):
+        with pytest.raises(ValueError):
+            loads('{"version":0,"name":"old"}\n', registry)
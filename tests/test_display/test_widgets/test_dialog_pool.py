@@ -0,0 +1,106 @@
+"""Tests for re-using dialog windows from a pool."""
+
+from mock import MagicMock
+
+from shimmer.components.box import Box
+from shimmer.widgets.dialogs.pool import _DialogPool
+from shimmer.widgets.multiple_choice_buttons import MultipleChoiceButtonsDefinition
+from shimmer.widgets.question_definition import MultipleChoiceQuestionDefinition
+from shimmer.work_queue import _WorkQueue
+
+
+def make_definition(text, on_change, choices=("Yes", "No")):
+    """Create the definition of a Yes/No dialog."""
+    return MultipleChoiceButtonsDefinition(
+        question=MultipleChoiceQuestionDefinition(
+            text=text, choices=list(choices), on_change=on_change
+        )
+    )
+
+
+def simulate_removal(dialog):
+    """Simulate the dialog being removed from the scene."""
+    assert dialog.on_removed is not None
+    dialog.on_removed(dialog)
+
+
+def test_dialog_pool(mock_gui, mock_font, subtests):
+    """Test that dialogs are re-used, with the new text and callbacks, once removed."""
+    pool = _DialogPool()
+    first_on_change = MagicMock()
+    second_on_change = MagicMock()
+
+    dialog = pool.multiple_choice_dialog(make_definition("First", first_on_change))
+    parent = Box()
+    parent.add(dialog)
+
+    with subtests.test("Dialogs in use are not re-used."):
+        other_dialog = pool.multiple_choice_dialog(make_definition("Other", None))
+        assert other_dialog is not dialog
+        assert pool.misses == 2
+
+    parent.remove(dialog)
+    simulate_removal(dialog)
+
+    with subtests.test("Dialogs of a different shape are not re-used."):
+        different_dialog = pool.multiple_choice_dialog(
+            make_definition("Different", None, choices=("1", "2"))
+        )
+        assert different_dialog is not dialog
+        assert pool.idle_count == 1
+
+    with subtests.test("Removed dialogs are re-used for the same shape."):
+        reused_dialog = pool.multiple_choice_dialog(
+            make_definition("Second", second_on_change)
+        )
+        assert reused_dialog is dialog
+        assert pool.hits == 1
+        assert pool.idle_count == 0
+
+    with subtests.test("Re-used dialogs show the new question."):
+        assert dialog.definition.title == "Second"
+        assert dialog._title is not None and dialog._title.text == "Second"
+
+    with subtests.test("Re-used dialogs call the new callbacks."):
+        parent.add(dialog)
+        dialog.buttons._buttons["Yes"].is_toggled = True
+        second_on_change.assert_called_once_with({"Yes"})
+        first_on_change.assert_not_called()
+        assert dialog not in parent
+
+
+def test_dialog_pool_eviction(mock_gui, mock_font, subtests):
+    """Test that idle dialogs are limited in number and discarded once idle for too long."""
+    pool = _DialogPool(max_idle_per_shape=1, idle_timeout=0)
+    dialogs = [pool.multiple_choice_dialog(make_definition("", None)) for _ in range(2)]
+    for dialog in dialogs:
+        simulate_removal(dialog)
+
+    with subtests.test("Only the maximum number of idle dialogs is kept."):
+        assert pool.idle_count == 1
+        assert dialogs[0].on_removed is None
+
+    with subtests.test("Idle dialogs are discarded after the idle timeout."):
+        pool._evict_idle(0)
+        assert pool.idle_count == 0
+        assert dialogs[1].on_removed is None
+
+
+def test_dialog_pool_prewarm(mock_gui, mock_font, mocker):
+    """Test that idle dialogs can be created in the background, ready to be re-used."""
+    queue = _WorkQueue()
+    mocker.patch("shimmer.widgets.dialogs.pool.WorkQueue", new=queue)
+    mocker.patch("pyglet.clock.schedule")
+    mocker.patch("pyglet.clock.unschedule")
+    mocker.patch("pyglet.clock.schedule_interval")
+    pool = _DialogPool()
+
+    task = pool.prewarm(make_definition("", None), count=2)
+    assert pool.idle_count == 0
+    queue.run_to_completion()
+    assert task.steps_run == 2
+    assert pool.idle_count == 2
+
+    pool.multiple_choice_dialog(make_definition("Question", None))
+    assert pool.hits == 1
+    assert pool.idle_count == 1
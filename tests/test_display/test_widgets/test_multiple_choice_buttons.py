@@ -91,3 +91,49 @@ def test_multiple_choice_with_defaults(
         )
     )
     assert run_gui(test_multiple_choice_with_defaults, multi, text_box)
+
+
+def test_multiple_choice_selection(mock_gui, mock_font, subtests):
+    """Test that the selection is tracked and reported as buttons are toggled."""
+    selections = []
+    question_defn = MultipleChoiceQuestionDefinition(
+        text="",
+        choices=[str(num) for num in range(5)],
+        on_change=lambda selection: selections.append(selection),
+    )
+    multi = MultipleChoiceButtons(
+        MultipleChoiceButtonsDefinition(question=question_defn)
+    )
+
+    with subtests.test("Selecting a button reports it."):
+        multi._buttons["1"].is_toggled = True
+        assert selections == [{"1"}]
+        assert multi.currently_selected == {"1"}
+
+    with subtests.test("Selecting another button deselects the previous one."):
+        selections.clear()
+        multi._buttons["3"].is_toggled = True
+        assert selections == [{"1", "3"}, {"3"}]
+        assert multi.currently_selected == {"3"}
+        assert [
+            choice for choice, button in multi._buttons.items() if button.is_toggled
+        ] == ["3"]
+
+    with subtests.test("Deselecting a button reports an empty selection."):
+        selections.clear()
+        multi._buttons["3"].is_toggled = False
+        assert selections == [set()]
+        assert multi.currently_selected == set()
+
+    multi = MultipleChoiceButtons(
+        MultipleChoiceButtonsDefinition(
+            question=replace(question_defn, allow_multiple=True)
+        )
+    )
+
+    with subtests.test("Multiple buttons can be selected if allowed."):
+        multi._buttons["1"].is_toggled = True
+        multi._buttons["3"].is_toggled = True
+        multi._buttons["1"].is_toggled = False
+        multi._buttons["4"].is_toggled = True
+        assert multi.currently_selected == {"3", "4"}
@@ -2,7 +2,9 @@
 
 from dataclasses import replace
 
+import pyglet
 import pytest
+from mock import MagicMock
 
 from shimmer.alignment import HorizontalAlignment
 from shimmer.components.font import Calibri, ComicSans
@@ -12,6 +14,8 @@ from shimmer.widgets.text_box import (
     TextBoxDefinition,
     EditableTextBox,
     EditableTextBoxDefinition,
+    TextChange,
+    measure_text,
 )
 
 
@@ -99,3 +103,161 @@ def test_editable_text_box_multiline(run_gui):
     )
     text_box = EditableTextBox(defn)
     assert run_gui(test_editable_text_box_multiline, text_box)
+
+
+def test_measure_text(mock_font, subtests):
+    """Test that text is measured correctly without creating a label."""
+    # Each character of the mock font is 8 pixels wide, and each line is 20 pixels tall.
+    with subtests.test("Single line text is as wide as all its characters."):
+        assert measure_text("Hello there", TextBoxDefinition()) == (88, 20)
+
+    with subtests.test("Empty text is one line tall."):
+        assert measure_text("", TextBoxDefinition()) == (0, 20)
+
+    with subtests.test("Multiline text without a width only breaks on new lines."):
+        definition = TextBoxDefinition(multiline=True)
+        assert measure_text("Hello\nthere you", definition) == (72, 40)
+
+    with subtests.test("Multiline text wraps words to fit within the width."):
+        definition = TextBoxDefinition(width=100)
+        assert measure_text("Hello there you", definition) == (88, 40)
+
+    with subtests.test("Words wider than the width overflow their line."):
+        definition = TextBoxDefinition(width=20)
+        assert measure_text("Hello to you", definition) == (40, 60)
+
+
+def test_measure_text_is_cached(mock_font):
+    """Test that repeated measurements don't re-measure the text."""
+    definition = TextBoxDefinition(text="ignored")
+    measure_text("Some cached text", definition)
+    requests = len(definition.font.metrics._font.glyph_requests)
+    measure_text("Some cached text", definition)
+    assert len(definition.font.metrics._font.glyph_requests) == requests
+
+
+def test_text_box_sized_without_label(mock_gui, mock_font, subtests):
+    """Test that a TextBox is sized to fit its text without creating a label."""
+    text_box = TextBox(TextBoxDefinition(text="Hello"))
+
+    with subtests.test("Box is sized to fit the text."):
+        assert (text_box.rect.width, text_box.rect.height) == (40, 20)
+
+    with subtests.test("Label is not created until it is needed."):
+        assert text_box._label is None
+
+    with subtests.test("Box is resized when the text changes."):
+        text_box.set_text("Hello there")
+        assert (text_box.rect.width, text_box.rect.height) == (88, 20)
+
+    with subtests.test("Fixed size TextBoxes ignore the size of the text."):
+        text_box = TextBox(TextBoxDefinition(text="Hello", width=200, height=100))
+        assert (text_box.rect.width, text_box.rect.height) == (200, 100)
+
+
+def test_text_change(subtests):
+    """Test applying and merging changes to text."""
+    with subtests.test("Changes can be applied to text."):
+        assert TextChange(6, "world", "there").apply("Hello world!") == "Hello there!"
+
+    with subtests.test("Consecutive insertions are merged."):
+        change = TextChange(2, "xy", "a").merge(TextChange(3, inserted="b"))
+        assert change == TextChange(2, "xy", "ab")
+
+    with subtests.test("Non-consecutive changes are not merged."):
+        assert TextChange(2, inserted="a").merge(TextChange(2, inserted="b")) is None
+        assert TextChange(2, inserted="a").merge(TextChange(3, deleted="b")) is None
+
+
+@pytest.fixture
+def editable_text_box_factory(mock_gui, mock_font, mocker):
+    """Create EditableTextBoxes whose caret edits the text without a GUI."""
+    # Only the document is needed to test editing, so skip the graphical parts.
+    mocker.patch("pyglet.text.layout.IncrementalTextLayout")
+    mocker.patch("pyglet.text.caret.Caret")
+    mocker.patch(
+        "pyglet.text.decode_attributed", new=pyglet.text.document.FormattedDocument
+    )
+
+    def make_text_box(**kwargs):
+        text_box = EditableTextBox(EditableTextBoxDefinition(**kwargs))
+        document = text_box._document
+
+        def type_text(text):
+            position = len(document.text)
+            document.insert_text(position, text)
+
+        def backspace(motion):
+            document.delete_text(len(document.text) - 1, len(document.text))
+
+        text_box._caret.on_text.side_effect = type_text
+        text_box._caret.on_text_motion.side_effect = backspace
+        return text_box
+
+    return make_text_box
+
+
+def test_editable_text_box_changes(editable_text_box_factory, subtests):
+    """Test that each edit is reported to `on_edit` and `on_change` as it happens."""
+    on_edit = MagicMock()
+    on_change = MagicMock()
+    text_box = editable_text_box_factory(
+        text="Hi", on_edit=on_edit, on_change=on_change
+    )
+
+    with subtests.test("Typed text is reported after it is inserted."):
+        text_box.on_text("!")
+        on_edit.assert_called_once_with([TextChange(2, inserted="!")])
+        on_change.assert_called_once_with("Hi!")
+
+    with subtests.test("Deleted text is reported."):
+        text_box.on_text_motion(pyglet.window.key.MOTION_BACKSPACE)
+        on_edit.assert_called_with([TextChange(2, deleted="!")])
+        on_change.assert_called_with("Hi")
+
+    with subtests.test("Replacing the text is reported as a single change."):
+        text_box.set_text("Hello")
+        on_edit.assert_called_with([TextChange(0, deleted="Hi", inserted="Hello")])
+        on_change.assert_called_with("Hello")
+
+
+def test_editable_text_box_edit_interval(editable_text_box_factory, subtests):
+    """Test that edits are reported together when an edit interval is set."""
+    on_edit = MagicMock()
+    on_change = MagicMock()
+    text_box = editable_text_box_factory(
+        text="", on_edit=on_edit, on_change=on_change, edit_interval=0
+    )
+
+    for character in "abc":
+        text_box.on_text(character)
+    text_box.on_text_motion(pyglet.window.key.MOTION_BACKSPACE)
+
+    with subtests.test("Nothing is reported until the clock ticks."):
+        on_edit.assert_not_called()
+        on_change.assert_not_called()
+
+    pyglet.clock.tick()
+
+    with subtests.test("All edits are reported together on the next tick."):
+        on_edit.assert_called_once_with(
+            [TextChange(0, inserted="abc"), TextChange(2, deleted="c")]
+        )
+        on_change.assert_called_once_with("ab")
+
+
+def test_editable_text_box_set_text_without_notifying(editable_text_box_factory):
+    """Test that text can be replaced without reporting it, discarding pending changes."""
+    on_edit = MagicMock()
+    on_change = MagicMock()
+    text_box = editable_text_box_factory(
+        text="", on_edit=on_edit, on_change=on_change, edit_interval=0
+    )
+
+    text_box.on_text("a")
+    text_box.set_text("Reset", notify=False)
+    pyglet.clock.tick()
+
+    assert text_box.text == "Reset"
+    on_edit.assert_not_called()
+    on_change.assert_not_called()
@@ -1,5 +1,8 @@
 """Graphical tests for the Window widget."""
 
+from dataclasses import replace
+
+from shimmer.components.box import Box, BoxDefinition
 from shimmer.widgets.window import Window, WindowDefinition
 
 
@@ -18,3 +21,54 @@ def test_window_on_close_callback(run_gui, updatable_text_box):
 
     window = Window(WindowDefinition(width=300, height=200, on_close=callback))
     assert run_gui(test_window_on_close_callback, text_box, window)
+
+
+def test_window_resize_keeps_components(mock_gui, mock_font, subtests):
+    """Test that resizing a window updates its components in place."""
+    window = Window(WindowDefinition(title="Title", width=None, height=None))
+    parent = Box()
+    parent.add(window)
+    close_button = window.close_button
+    drag_box = window.drag_box
+    focus_box = window.focus_box
+    title = window._title
+    assert focus_box is not None and title is not None
+    focus_stack = focus_box.definition.focus_stack
+    focus_stack.register_focus_box(focus_box)
+    focus_box.take_focus()
+
+    window.add_child_to_body(Box(BoxDefinition(width=300, height=200)))
+
+    with subtests.test("Window has resized to fit the new child."):
+        assert window.rect.width == 300 + 2 * window.definition.padding
+
+    with subtests.test("Window components are not re-created."):
+        assert window.close_button is close_button
+        assert window.drag_box is drag_box
+        assert window.focus_box is focus_box
+        assert window._title is title
+
+    with subtests.test("Window components are resized to match the window."):
+        assert focus_box.rect.size == window.rect.size
+        assert window._title_bar_background is not None
+        assert window._title_bar_background.rect.width == window.rect.width
+        assert window._background is not None
+        assert window._background.width == window.rect.width
+        # The drag zone covers the title bar up to the close button.
+        assert window.drag_box.rect.width == close_button.x
+
+    with subtests.test("Focus state is kept."):
+        assert focus_box.is_focused
+
+    with subtests.test("Changing the title updates the existing title."):
+        window.definition = replace(window.definition, title="New title")
+        window.update_all()
+        assert window._title is title
+        assert title.text == "New title"
+
+    with subtests.test("Changing the close callback re-creates the close button."):
+        window.definition = replace(window.definition, on_close=lambda *_: None)
+        window.update_all()
+        assert window.close_button is not close_button
+
+    focus_stack.unregister_focus_box(focus_box)
@@ -0,0 +1,115 @@
+"""Tests for running background work in slices using the WorkQueue."""
+
+import time
+from typing import List
+
+import pytest
+from mock import MagicMock
+
+from shimmer.work_queue import _WorkQueue
+
+
+@pytest.fixture
+def queue(mocker):
+    """A fresh WorkQueue, which isn't scheduled on the pyglet clock."""
+    mocker.patch("pyglet.clock.schedule")
+    mocker.patch("pyglet.clock.unschedule")
+    return _WorkQueue(budget_ms=4)
+
+
+def record_steps(log, name, count):
+    """Append the name to the log as each step is run."""
+    for _ in range(count):
+        log.append(name)
+        yield
+
+
+def test_work_queue_priorities(queue):
+    """Test that higher priority tasks run first, and tasks of equal priority run in order."""
+    log: List[str] = []
+    queue.add(record_steps(log, "first", 2))
+    queue.add(record_steps(log, "urgent", 1), priority=1)
+    queue.add(record_steps(log, "second", 1))
+    on_complete = MagicMock()
+    queue.add_chunks([lambda: log.append("chunk")], on_complete=on_complete)
+
+    queue.run(0)
+    assert log == ["urgent", "first", "first", "second", "chunk"]
+    on_complete.assert_called_once_with()
+    assert len(queue) == 0
+
+
+def test_work_queue_budget(queue, subtests):
+    """Test that steps are only run until the budget for the frame is used up."""
+
+    def slow_steps():
+        for _ in range(3):
+            time.sleep(0.005)
+            yield
+
+    task = queue.add(slow_steps())
+
+    with subtests.test("At least one step is run each frame, even if over budget."):
+        queue.run(0)
+        assert task.steps_run == 1
+        assert task.is_pending
+
+    with subtests.test("All steps can be run immediately."):
+        queue.run_to_completion()
+        assert task.is_done
+        assert len(queue) == 0
+
+
+def test_work_queue_cancellation(queue, subtests):
+    """Test that cancelled tasks aren't run any further."""
+    log: List[str] = []
+    task = queue.add(record_steps(log, "cancelled", 3))
+    other = queue.add(record_steps(log, "other", 1))
+
+    with subtests.test("Cancelled tasks are skipped."):
+        task.cancel()
+        queue.run(0)
+        assert log == ["other"]
+        assert task.is_cancelled and not task.is_done
+
+    with subtests.test("Cancelling all tasks empties the queue."):
+        queue.add(record_steps(log, "cancelled", 1))
+        queue.cancel_all()
+        queue.run(0)
+        assert log == ["other"]
+        assert len(queue) == 0
+        assert other.is_done
+
+
+def test_work_queue_failing_task(queue):
+    """Test that a task that raises an error is stopped without affecting other tasks."""
+
+    def failing_steps():
+        yield
+        raise ValueError("Failed")
+
+    log: List[str] = []
+    failing = queue.add(failing_steps())
+    queue.add(record_steps(log, "other", 1))
+
+    queue.run(0)
+    assert failing.is_cancelled
+    assert log == ["other"]
+
+
+def test_work_queue_task_cancels_itself(queue, caplog):
+    """Test that a task can cancel itself from one of its steps."""
+
+    def cancelling_steps():
+        yield
+        task.cancel()
+        yield
+        log.append("after cancel")
+
+    log: List[str] = []
+    task = queue.add(cancelling_steps())
+    queue.run_to_completion()
+    assert task.is_cancelled and not task.is_done
+    assert task.steps_run == 2
+    assert log == []
+    assert "failed" not in caplog.text